@@ -0,0 +1,64 @@
+"""
+gunicorn settings, used by docker-compose: gunicorn -c gunicorn.conf.py urlshortener.wsgi:application
+
+- preload_app (GUNICORN_PRELOAD, on by default): Django, the URLconf and
+  the short code filter snapshot are loaded once in the master, and
+  workers fork with them already in (shared, copy-on-write) memory.
+- The garbage collector stays off in the master and gc.freeze() runs
+  before each fork, so collections in workers do not touch (and copy)
+  the pages of objects inherited from the master.
+- Database connections are closed before forking; workers open their own.
+Command-line flags (--bind, --workers, -k ...) override these values.
+"""
+import gc
+import glob
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("WEB_CONCURRENCY", 3))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+if preload_app:
+    # Garbage freed in the master leaves holes in pages the workers share.
+    gc.disable()
+
+
+def on_starting(server):
+    # Snapshots of the previous run's workers would be summed into /metrics.
+    # Only those: METRICS_DIR may be a mount point or hold other files.
+    metrics_dir = os.environ.get("METRICS_DIR")
+    if metrics_dir:
+        for pattern in ("*.json", "*.json.tmp"):
+            for path in glob.glob(os.path.join(metrics_dir, pattern)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    if not preload_app:
+        return
+    from django.urls import get_resolver
+
+    from shorturl.bloom import code_filter
+
+    # Views are otherwise imported by each worker on its first request.
+    get_resolver().reverse_dict
+    if code_filter.enabled and code_filter.snapshot_path and os.path.exists(code_filter.snapshot_path):
+        try:
+            # Mapped copy-on-write; workers start with it and only sync deltas.
+            code_filter.load()
+        except Exception:
+            server.log.exception("Could not load the short code filter snapshot; workers will build it")
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
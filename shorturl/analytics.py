@@ -0,0 +1,90 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import ClickRollup
+
+DEFAULT_RANGE_DAYS = 7
+MAX_HOURLY_RANGE_DAYS = 31
+TOP_VALUES = 10
+
+
+def parse_bound(value, end=False):
+    """
+    Accept an ISO datetime or a date; a bare end date covers the whole day.
+    """
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        day = parsed = None
+    if day is not None:
+        parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def parse_range(params):
+    """
+    Read start/end/granularity query params; defaults to the last 7 days by day.
+    """
+    granularity = params.get("granularity", ClickRollup.DAY)
+    if granularity not in (ClickRollup.HOUR, ClickRollup.DAY):
+        raise ValueError("granularity must be 'hour' or 'day'")
+    end = parse_bound(params["end"], end=True) if params.get("end") else timezone.now()
+    start = parse_bound(params["start"]) if params.get("start") else end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start >= end:
+        raise ValueError("start must be before end")
+    if granularity == ClickRollup.HOUR and end - start > timedelta(days=MAX_HOURLY_RANGE_DAYS):
+        raise ValueError(f"Hourly ranges are limited to {MAX_HOURLY_RANGE_DAYS} days")
+    return start, end, granularity
+
+
+def click_timeseries(short_url, start, end, granularity):
+    """
+    Click counts per bucket in [start, end), read from the rollups only.
+    """
+    if granularity == ClickRollup.DAY:
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        start = start.replace(minute=0, second=0, microsecond=0)
+    # Rollups live next to their link: same shard, same replica.
+    rows = (
+        ClickRollup.objects.using(short_url._state.db)
+        .filter(short_url=short_url, granularity=granularity, dimension="", bucket_start__gte=start, bucket_start__lt=end)
+        .order_by("bucket_start")
+        .values_list("bucket_start", "count")
+    )
+    return [{"bucket": bucket, "count": count} for bucket, count in rows]
+
+
+def click_breakdowns(short_url, start, end):
+    """
+    Top values per dimension over the days touched by [start, end).
+    """
+    start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = (
+        ClickRollup.objects.using(short_url._state.db)
+        .filter(
+            short_url=short_url,
+            granularity=ClickRollup.DAY,
+            dimension__in=ClickRollup.DIMENSIONS,
+            bucket_start__gte=start,
+            bucket_start__lt=end,
+        )
+        .values("dimension", "value")
+        .annotate(total=Sum("count"))
+        .order_by("dimension", "-total")
+    )
+    breakdowns = defaultdict(list)
+    for row in rows:
+        values = breakdowns[row["dimension"]]
+        if len(values) < TOP_VALUES:
+            values.append({"value": row["value"] or "unknown", "count": row["total"]})
+    return {dimension: breakdowns.get(dimension, []) for dimension in ClickRollup.DIMENSIONS}
@@ -0,0 +1,96 @@
+import asyncio
+import weakref
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+# django-redis's incr(): only an existing key is incremented.
+INCR_EXISTING_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return false
+"""
+
+class AsyncCache:
+    """
+    Async access to the default cache for the redirect hot path.
+
+    - With django-redis, talks to Redis through redis.asyncio using the
+      same key format and serializer, so sync and async code share entries.
+    - With any other backend, falls back to Django's cache.a*() methods.
+    """
+
+    def __init__(self, alias=DEFAULT_CACHE_ALIAS):
+        self.alias = alias
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def backend(self):
+        # Not django.core.cache.cache: that is a proxy, and its type would
+        # never be django-redis's.
+        return caches[self.alias]
+
+    @property
+    def is_redis(self):
+        return type(self.backend).__module__.startswith("django_redis")
+
+    def _client(self):
+        # redis.asyncio connections are bound to the loop that opened them.
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            from redis.asyncio import Redis
+
+            location = self.backend._server
+            if isinstance(location, (list, tuple)):
+                location = location[0]
+            client = Redis.from_url(location.split(",")[0])
+            self._clients[loop] = client
+        return client
+
+    def _key(self, key):
+        return str(self.backend.client.make_key(key))
+
+    async def get(self, key, default=None):
+        if not self.is_redis:
+            return await self.backend.aget(key, default)
+        value = await self._client().get(self._key(key))
+        if value is None:
+            return default
+        return self.backend.client.decode(value)
+
+    async def get_many(self, keys):
+        if not self.is_redis:
+            return await self.backend.aget_many(keys)
+        values = await self._client().mget([self._key(key) for key in keys])
+        return {key: self.backend.client.decode(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set(self, key, value, timeout):
+        if not self.is_redis:
+            return await self.backend.aset(key, value, timeout=timeout)
+        await self._client().set(self._key(key), self.backend.client.encode(value), ex=timeout)
+
+    async def add(self, key, value, timeout):
+        if not self.is_redis:
+            return await self.backend.aadd(key, value, timeout=timeout)
+        return bool(await self._client().set(self._key(key), self.backend.client.encode(value), ex=timeout, nx=True))
+
+    async def incr(self, key):
+        """
+        Raises ValueError for a missing key, like the sync cache.incr().
+        """
+        if not self.is_redis:
+            return await self.backend.aincr(key)
+        # django-redis stores integers unpickled, so INCRBY works on them.
+        value = await self._client().eval(INCR_EXISTING_SCRIPT, 1, self._key(key), 1)
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        return value
+
+    async def delete(self, key):
+        if not self.is_redis:
+            return await self.backend.adelete(key)
+        await self._client().delete(self._key(key))
+
+
+async_cache = AsyncCache()
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .routers import pin_primary, primary_pin_key, replica_aliases
+from .user_cache import local_user_cache, user_cache_key
+
+# Loaded into the cached user; other fields stay deferred, so a save() on
+# a cached user can only ever write these.
+USER_CACHE_FIELDS = ("id", "username", "email", "is_active", "is_staff", "is_superuser")
+
+def revoked_token_key(jti):
+    return f"jwt:revoked:{jti}"
+
+
+def revoke_token(token):
+    """
+    Reject a token (by its jti) until it expires anyway.
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    remaining = int(token["exp"] - time.time())
+    if remaining > 0:
+        cache.set(revoked_token_key(jti), 1, timeout=remaining)
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """
+    simplejwt authentication without per-request SQL.
+
+    - The user row is cached in process memory and in Redis
+      (AUTH_USER_CACHE_SECONDS); User saves and deletes invalidate it.
+    - Access tokens revoked at logout are kept as jwt:revoked:<jti> keys
+      that expire with the token.
+    - Revocation, the cached user and the read-your-writes pin come back
+      in one get_many round trip.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached.
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        revoked_key = revoked_token_key(validated_token.get(api_settings.JTI_CLAIM))
+        user_key = user_cache_key(user_id)
+        pin_key = primary_pin_key(user_id)
+        fields = local_user_cache.get(user_id)
+        keys = [revoked_key]
+        if fields is None:
+            keys.append(user_key)
+        if replica_aliases():
+            keys.append(pin_key)
+        values = cache.get_many(keys)
+
+        if revoked_key in values:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        if pin_key in values:
+            pin_primary()
+
+        if fields is None:
+            fields = values.get(user_key)
+            if fields is None:
+                fields = self.load_user_fields(user_id)
+                cache.set(user_key, fields, timeout=settings.AUTH_USER_CACHE_SECONDS)
+            local_user_cache.set(user_id, fields)
+
+        # from_db() wants the loaded fields in model field order.
+        names = [f.attname for f in self.user_model._meta.concrete_fields if f.attname in fields]
+        user = self.user_model.from_db("default", names, [fields[name] for name in names])
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def load_user_fields(self, user_id):
+        fields = (
+            self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*USER_CACHE_FIELDS)
+            .first()
+        )
+        if fields is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return fields
+
@@ -0,0 +1,306 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import secrets
+import struct
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .async_cache import async_cache
+from .models import ShortURL
+from .routers import use_primary
+from .sharding import fan_out
+
+logger = logging.getLogger(__name__)
+
+# magic, bit count, hash count, items added, delta seq and log epoch covered by the snapshot
+SNAPSHOT_HEADER = struct.Struct("<8sQQQQ16s")
+SNAPSHOT_MAGIC = b"SCFILT02"
+SEQ_KEY = "codefilter:seq"
+# Regenerated whenever SEQ_KEY has to be recreated (Redis restarted or
+# flushed): seq numbers from before it may be reused for other deltas.
+EPOCH_KEY = "codefilter:epoch"
+LOG_KEYS = (EPOCH_KEY, SEQ_KEY)
+BUILD_CHUNK_SIZE = 10_000
+# A delta missing for this long has expired (not merely in flight): rebuild.
+DELTA_GRACE_SECONDS = 10
+
+
+def delta_key(seq):
+    return f"codefilter:added:{seq}"
+
+
+def ensure_delta_log():
+    """
+    Create the delta log's seq, with a fresh epoch, unless it exists.
+    """
+    if cache.add(SEQ_KEY, 0, timeout=None):
+        cache.set(EPOCH_KEY, secrets.token_hex(8), timeout=None)
+    else:
+        # Evicted on its own: still a new epoch, whatever the seq says.
+        cache.add(EPOCH_KEY, secrets.token_hex(8), timeout=None)
+
+
+def log_position(values):
+    """
+    (epoch, seq) from a get_many of EPOCH_KEY and SEQ_KEY.
+    """
+    return values.get(EPOCH_KEY) or "", values.get(SEQ_KEY) or 0
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b).
+
+    - No false negatives: a code that was added is always reported.
+    - The bits live in a bytearray, or in a copy-on-write mmap of a
+      snapshot file so gunicorn workers share the untouched pages.
+    """
+
+    def __init__(self, num_bits, num_hashes, bits=None, items=0):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((num_bits + 7) // 8)
+        self.items = items
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        capacity = max(capacity, 1)
+        num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, key):
+        h1, h2 = struct.unpack("<QQ", hashlib.blake2b(key.encode(), digest_size=16).digest())
+        h2 |= 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def save(self, path, seq, epoch):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, self.num_bits, self.num_hashes, self.items, seq, epoch.encode("ascii"),
+            ))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Map a snapshot file; returns (filter, seq, epoch).
+        """
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, num_bits, num_hashes, items, seq, epoch = SNAPSHOT_HEADER.unpack_from(mapped)
+        if magic != SNAPSHOT_MAGIC or len(mapped) != SNAPSHOT_HEADER.size + (num_bits + 7) // 8:
+            mapped.close()
+            raise ValueError(f"{path} is not a short code filter snapshot")
+        bloom = cls(num_bits, num_hashes, memoryview(mapped)[SNAPSHOT_HEADER.size:], items)
+        return bloom, seq, epoch.rstrip(b"\0").decode("ascii")
+
+
+def build_code_filter(error_rate, min_capacity):
+    """
+    Stream every short_code from the primary into a new filter.
+    Returns (filter, seq, epoch): deltas after seq may be missing from the filter.
+    """
+    # Read the seq first: codes created while streaming are replayed
+    # from the delta log (adding twice is harmless).
+    ensure_delta_log()
+    epoch, seq = log_position(cache.get_many(LOG_KEYS))
+    # Imported here: pagination pulls in DRF, which redirect-only workers never load.
+    from .pagination import approximate_count
+
+    with use_primary():
+        querysets = fan_out(ShortURL.objects.all(), primary=True)
+        capacity = max(min_capacity, int(sum(approximate_count(qs) for qs in querysets) * 1.25))
+        bloom = BloomFilter.for_capacity(capacity, error_rate)
+        for queryset in querysets:
+            for code in queryset.values_list("short_code", flat=True).iterator(chunk_size=BUILD_CHUNK_SIZE):
+                bloom.add(code)
+    return bloom, seq, epoch
+
+
+class CodeFilter:
+    """
+    Per-worker Bloom filter of every existing short code, in front of the
+    redirect lookups.
+
+    - A code that misses the cache and that the filter has never seen is
+      answered 404 without a DB query, but only while the filter has
+      replayed every published delta (same epoch and seq as the cache);
+      a code newer than the filter, or a false positive, takes the normal
+      path.
+    - Loaded from CODE_FILTER_SNAPSHOT (written by snapshot_code_filter)
+      or built by streaming the table, in a background thread. Until it is
+      ready, or whenever it cannot be trusted, every code is a "maybe".
+    - New codes are published to a delta log in the cache
+      (codefilter:seq + codefilter:added:<n>); each worker replays it every
+      CODE_FILTER_SYNC_SECONDS. A gap in the log (deltas expired) or a new
+      codefilter:epoch (Redis restarted or flushed) triggers a rebuild.
+    - Deleted codes stay in the filter until the next rebuild; they only
+      lose the shortcut, lookups still answer 404.
+    """
+
+    def __init__(self):
+        self.enabled = getattr(settings, "CODE_FILTER_ENABLED", True)
+        self.snapshot_path = getattr(settings, "CODE_FILTER_SNAPSHOT", "")
+        self.error_rate = getattr(settings, "CODE_FILTER_ERROR_RATE", 0.001)
+        self.min_capacity = getattr(settings, "CODE_FILTER_MIN_CAPACITY", 1_000_000)
+        self.sync_interval = getattr(settings, "CODE_FILTER_SYNC_SECONDS", 1)
+        self.delta_ttl = getattr(settings, "CODE_FILTER_DELTA_TTL_SECONDS", 60 * 60 * 24)
+        self.max_pending = getattr(settings, "CODE_FILTER_MAX_PENDING_DELTAS", 10_000)
+        self._lock = threading.Lock()
+        self._filter = None
+        self._seq = 0
+        self._epoch = ""
+        self._missing_since = None
+        self._pid = None
+
+    @property
+    def ready(self):
+        return self._filter is not None
+
+    def _snapshot(self, short_code):
+        """
+        (epoch, seq) the filter is current to if short_code is absent from it, else None.
+        """
+        if not self.enabled:
+            return None
+        self._ensure_started()
+        with self._lock:
+            bloom, seq, epoch = self._filter, self._seq, self._epoch
+        if bloom is None or short_code in bloom:
+            return None
+        return epoch, seq
+
+    def log_keys(self, short_code):
+        """
+        Cache keys to fetch along with short_code's record, so that rejects()
+        needs no round trip of its own; empty if the filter cannot reject it.
+        """
+        return LOG_KEYS if self._snapshot(short_code) else ()
+
+    def rejects(self, short_code, log_values=None):
+        """
+        True only if short_code definitely does not exist (ask after a cache miss).
+        log_values: LOG_KEYS as fetched with the record, if they were.
+        """
+        snapshot = self._snapshot(short_code)
+        if snapshot is None:
+            return False
+        if log_values is None:
+            log_values = cache.get_many(LOG_KEYS)
+        # The code may have been published after the filter's last sync.
+        return log_position(log_values) == snapshot
+
+    async def arejects(self, short_code, log_values=None):
+        snapshot = self._snapshot(short_code)
+        if snapshot is None:
+            return False
+        if log_values is None:
+            log_values = await async_cache.get_many(LOG_KEYS)
+        return log_position(log_values) == snapshot
+
+    def publish(self, short_codes):
+        """
+        Announce new codes to every worker's filter (call after the INSERT).
+        Two cache round trips, plus two when the log has to be (re)created.
+        """
+        short_codes = list(short_codes)
+        if not self.enabled or not short_codes:
+            return
+        with self._lock:
+            if self._filter is not None:
+                for code in short_codes:
+                    self._filter.add(code)
+        try:
+            seq = cache.incr(SEQ_KEY)
+        except ValueError:
+            ensure_delta_log()
+            seq = cache.incr(SEQ_KEY)
+        cache.set(delta_key(seq), short_codes, timeout=self.delta_ttl)
+
+    def sync(self):
+        """
+        Replay deltas published since the last sync; False if a rebuild is needed.
+        """
+        bloom = self._filter
+        if bloom is None:
+            return False
+        epoch, seq = log_position(cache.get_many(LOG_KEYS))
+        if epoch != self._epoch or seq < self._seq or seq - self._seq > self.max_pending:
+            return False
+        if seq == self._seq:
+            return True
+        seqs = range(self._seq + 1, seq + 1)
+        deltas = cache.get_many([delta_key(n) for n in seqs])
+        for n in seqs:
+            codes = deltas.get(delta_key(n))
+            if codes is None:
+                # Either still being written by the publisher or gone for good.
+                now = time.monotonic()
+                if self._missing_since is None:
+                    self._missing_since = now
+                return now - self._missing_since < DELTA_GRACE_SECONDS
+            with self._lock:
+                for code in codes:
+                    bloom.add(code)
+                self._seq = n
+        self._missing_since = None
+        return True
+
+    def load(self, rebuild=False):
+        if self.snapshot_path and not rebuild and os.path.exists(self.snapshot_path):
+            bloom, seq, epoch = BloomFilter.load(self.snapshot_path)
+        else:
+            bloom, seq, epoch = build_code_filter(self.error_rate, self.min_capacity)
+        with self._lock:
+            self._filter, self._seq, self._epoch, self._missing_since = bloom, seq, epoch, None
+
+    def _ensure_started(self):
+        # Same fork-safety dance as the click buffer: one thread per worker.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            threading.Thread(target=self._run, name="code-filter", daemon=True).start()
+
+    def _run(self):
+        rebuild = False
+        while True:
+            try:
+                if self._filter is None:
+                    self.load(rebuild=rebuild)
+                rebuild = not self.sync()
+                if rebuild:
+                    logger.warning("Short code filter lost track of the delta log; rebuilding")
+                    self._filter = None
+            except Exception:
+                logger.exception("Short code filter unavailable; lookups bypass it")
+                self._filter = None
+                rebuild = True
+            finally:
+                connections.close_all()
+            time.sleep(self.sync_interval)
+
+code_filter = CodeFilter()
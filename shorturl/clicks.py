@@ -0,0 +1,262 @@
+import atexit
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Case, DateTimeField, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .metrics import metrics
+from .models import ClickEvent, ClickRollup, ShortURL
+from .routers import use_primary
+from .sharding import owner_shards
+
+logger = logging.getLogger(__name__)
+
+# Coarse user agent families; keeps rollup cardinality small.
+USER_AGENT_FAMILIES = [
+    ("bot", re.compile(r"bot|crawl|spider|slurp|preview", re.I)),
+    ("edge", re.compile(r"Edg/", re.I)),
+    ("opera", re.compile(r"OPR/|Opera", re.I)),
+    ("chrome", re.compile(r"Chrome/|CriOS/", re.I)),
+    ("firefox", re.compile(r"Firefox/|FxiOS/", re.I)),
+    ("safari", re.compile(r"Safari/", re.I)),
+    ("curl", re.compile(r"^curl/|^Wget/|python-requests", re.I)),
+]
+
+
+def user_agent_family(user_agent):
+    if not user_agent:
+        return ""
+    for family, pattern in USER_AGENT_FAMILIES:
+        if pattern.search(user_agent):
+            return family
+    return "other"
+
+
+def click_details(request):
+    """
+    The bits of a redirect request kept for analytics.
+    """
+    meta = request.META
+    referrer = urlsplit(meta.get("HTTP_REFERER", "")).netloc.lower()[:255]
+    country_header = getattr(settings, "CLICK_COUNTRY_HEADER", "HTTP_CF_IPCOUNTRY")
+    country = meta.get(country_header, "")[:2].upper() if country_header else ""
+    return {
+        "referrer": referrer,
+        "country": country,
+        "user_agent": user_agent_family(meta.get("HTTP_USER_AGENT", "")),
+    }
+
+
+class ClickBuffer:
+    """
+    Per-process click counter and click event log.
+
+    - Redirects only touch in-memory structures, never the database.
+    - A daemon thread flushes every CLICK_FLUSH_INTERVAL_SECONDS: counts go
+      out as a single bulk UPDATE, events as a bulk INSERT plus rollup upserts.
+    - Counts are applied with F() increments and GREATEST() on
+      last_accessed_at, so concurrent flushes from several workers never
+      overwrite each other.
+    """
+
+    def __init__(self, interval=None, max_pending=None, max_events=None):
+        self.interval = interval or getattr(settings, "CLICK_FLUSH_INTERVAL_SECONDS", 5)
+        self.max_pending = max_pending or getattr(settings, "CLICK_BUFFER_MAX_CODES", 10_000)
+        self.max_events = max_events or getattr(settings, "CLICK_BUFFER_MAX_EVENTS", 50_000)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._events = []
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def add(self, short_code, when=None, referrer="", country="", user_agent=""):
+        when = when or timezone.now()
+        with self._lock:
+            count, _ = self._pending.get(short_code, (0, None))
+            self._pending[short_code] = (count + 1, when)
+            self._events.append((short_code, when, referrer, country, user_agent))
+            full = len(self._pending) >= self.max_pending or len(self._events) >= self.max_events
+        self._ensure_flusher()
+        if full:
+            self._wakeup.set()
+
+    def pending_clicks(self, short_code):
+        """
+        Clicks on short_code counted here but not flushed yet.
+        """
+        with self._lock:
+            return self._pending.get(short_code, (0, None))[0]
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            events, self._events = self._events, []
+        return pending, events
+
+    def flush(self):
+        # Codes created seconds ago may not have reached a replica yet.
+        with use_primary():
+            return self._flush()
+
+    def _flush(self):
+        pending, events = self.drain()
+        if pending:
+            try:
+                apply_clicks(pending)
+            except Exception:
+                # Put the counts back so a transient DB error does not lose clicks.
+                with self._lock:
+                    for code, (count, when) in pending.items():
+                        old_count, old_when = self._pending.get(code, (0, when))
+                        self._pending[code] = (old_count + count, max(old_when, when))
+                    self._events[:0] = events[: self.max_events - len(self._events)]
+                raise
+        if events:
+            try:
+                record_click_events(events)
+            except Exception:
+                # Counters are safe; retry the events unless the backlog is full.
+                with self._lock:
+                    self._events[:0] = events[: self.max_events - len(self._events)]
+                raise
+        return len(pending)
+
+    def _ensure_flusher(self):
+        # Threads do not survive a fork, so gunicorn workers started from a
+        # preloaded master each need their own flusher.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            thread = threading.Thread(target=self._run, name="click-flusher", daemon=True)
+            thread.start()
+            atexit.register(self._flush_quietly)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        # Same as the code filter thread: a connection broken by a DB restart
+        # or failover must not fail every later flush (CONN_MAX_AGE).
+        close_old_connections()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Click flush failed; the clicks stay buffered for the next flush")
+            metrics.inc("shorturl_click_flush_failures_total")
+        finally:
+            connections.close_all()
+
+
+def by_owner_shard(items, code=lambda item: item):
+    """
+    Group items by every shard that may hold their code (two mid-rebalance).
+    """
+    groups = {}
+    for item in items:
+        for alias in owner_shards(code(item)):
+            groups.setdefault(alias, []).append(item)
+    return groups
+
+
+def apply_clicks(pending):
+    """
+    Apply {short_code: (count, last_seen)} to ShortURL in one UPDATE per shard.
+    """
+    for alias, codes in by_owner_shard(pending).items():
+        count_cases = [When(short_code=code, then=Value(pending[code][0])) for code in codes]
+        seen_cases = [When(short_code=code, then=Value(pending[code][1])) for code in codes]
+        increment = Case(*count_cases, default=Value(0), output_field=IntegerField())
+        last_seen = Case(*seen_cases, output_field=DateTimeField())
+        with transaction.atomic(using=alias):
+            ShortURL.objects.using(alias).filter(short_code__in=codes).update(
+                click_count=F("click_count") + increment,
+                last_accessed_at=Greatest(Coalesce(F("last_accessed_at"), last_seen), last_seen),
+            )
+
+
+def record_click_events(events):
+    """
+    Bulk insert raw click events and fold them into the hourly/daily rollups.
+    events: [(short_code, clicked_at, referrer, country, user_agent), ...]
+    """
+    for alias, shard_events in by_owner_shard(events, lambda event: event[0]).items():
+        record_shard_click_events(alias, shard_events)
+
+
+def record_shard_click_events(alias, events):
+    ids = dict(
+        ShortURL.objects.using(alias).filter(short_code__in={e[0] for e in events}).values_list("short_code", "id")
+    )
+    rows = []
+    totals = Counter()
+    for short_code, when, referrer, country, user_agent in events:
+        short_url_id = ids.get(short_code)
+        if short_url_id is None:
+            continue
+        rows.append(ClickEvent(
+            short_url_id=short_url_id,
+            clicked_at=when,
+            referrer=referrer,
+            country=country,
+            user_agent=user_agent,
+        ))
+        hour = when.replace(minute=0, second=0, microsecond=0)
+        day = hour.replace(hour=0)
+        totals[(short_url_id, ClickRollup.HOUR, "", hour, "")] += 1
+        totals[(short_url_id, ClickRollup.DAY, "", day, "")] += 1
+        for dimension, value in zip(ClickRollup.DIMENSIONS, (referrer, country, user_agent)):
+            totals[(short_url_id, ClickRollup.DAY, dimension, day, value)] += 1
+
+    if not rows:
+        return
+    with transaction.atomic(using=alias):
+        ClickEvent.objects.using(alias).bulk_create(rows, batch_size=1000)
+        apply_rollups(totals, alias)
+
+
+def apply_rollups(totals, alias):
+    """
+    Add {(short_url_id, granularity, dimension, bucket_start, value): n} to
+    ClickRollup: insert missing rows, then one UPDATE with F() increments.
+    """
+    ClickRollup.objects.using(alias).bulk_create(
+        [
+            ClickRollup(short_url_id=key[0], granularity=key[1], dimension=key[2], bucket_start=key[3], value=key[4])
+            for key in totals
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    existing = ClickRollup.objects.using(alias).filter(
+        short_url_id__in={key[0] for key in totals},
+        bucket_start__in={key[3] for key in totals},
+    ).values_list("id", "short_url_id", "granularity", "dimension", "bucket_start", "value")
+    increments = {}
+    for row_id, *key in existing:
+        n = totals.get(tuple(key))
+        if n:
+            increments[row_id] = n
+    increment = Case(
+        *[When(id=row_id, then=Value(n)) for row_id, n in increments.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    ClickRollup.objects.using(alias).filter(id__in=list(increments)).update(count=F("count") + increment)
+
+
+click_buffer = ClickBuffer()
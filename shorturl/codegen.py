@@ -0,0 +1,145 @@
+import os
+import string
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+BASE62_ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+GENERATED_CODE_LENGTH = 9
+CODE_SPACE = len(BASE62_ALPHABET) ** GENERATED_CODE_LENGTH  # ~1.35e16 codes
+
+# Odd and not a multiple of 31, so it is coprime with 62**9 and
+# n -> (n * CODE_MULTIPLIER + CODE_OFFSET) % CODE_SPACE is a bijection.
+# It only hides the sequence order; it is not a security boundary.
+CODE_MULTIPLIER = 6744250329306091
+CODE_OFFSET = 3141592653589793
+
+SEQUENCE_NAME = "shorturl_code_seq"
+# Postgres advisory lock: block reservations share it, advance_sequence takes
+# it exclusively, so it sees every value handed out so far.
+SEQUENCE_LOCK_ID = 0x5348_4F52_5453_4551
+
+
+def base62_encode(number: int, length: int = GENERATED_CODE_LENGTH) -> str:
+    chars = []
+    for _ in range(length):
+        number, rem = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+def base62_decode(code: str) -> int:
+    number = 0
+    for char in code:
+        number = number * 62 + BASE62_ALPHABET.index(char)
+    return number
+
+
+def encode_id(number: int) -> str:
+    """
+    Map a unique sequence value to a unique 9-character code.
+    """
+    if not 0 < number < CODE_SPACE:
+        raise ValueError("Short code sequence exhausted")
+    return base62_encode((number * CODE_MULTIPLIER + CODE_OFFSET) % CODE_SPACE)
+
+
+def decode_code(code: str) -> int:
+    """
+    Inverse of encode_id: the sequence value a generated code came from.
+    """
+    inverse = pow(CODE_MULTIPLIER, -1, CODE_SPACE)
+    return (base62_decode(code) - CODE_OFFSET) * inverse % CODE_SPACE
+
+
+def is_generated_code(code: str) -> bool:
+    """
+    Codes of this shape belong to the generator, so custom aliases may not use
+    it; with imports going through advance_sequence that keeps generated codes
+    collision-free.
+    """
+    return len(code) == GENERATED_CODE_LENGTH and all(c in BASE62_ALPHABET for c in code)
+
+
+class SequenceCodeGenerator:
+    """
+    Collision-free codes from a database sequence.
+
+    - Each worker reserves block_size sequence values per round trip and
+      hands them out from memory.
+    - Values are unique, and encode_id is a bijection, so the resulting
+      codes are unique without a retry loop.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or getattr(settings, "SHORT_CODE_BLOCK_SIZE", 100)
+        self._lock = threading.Lock()
+        self._block = []
+        self._pid = None
+
+    def next_code(self, original_url: str | None = None) -> str:
+        with self._lock:
+            # A block inherited from a preloaded master must not be reused by
+            # every forked worker.
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._block = []
+            if not self._block:
+                self._block = self._allocate_block()
+            return encode_id(self._block.pop())
+
+    def _allocate_block(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "WITH lock AS MATERIALIZED (SELECT pg_advisory_xact_lock_shared(%s)) "
+                    f"SELECT nextval('{SEQUENCE_NAME}') FROM lock, generate_series(1, %s)",
+                    [SEQUENCE_LOCK_ID, self.block_size],
+                )
+                values = [row[0] for row in cursor.fetchall()]
+            else:
+                # Local/dev databases without sequences use an AUTOINCREMENT table.
+                values = []
+                for _ in range(self.block_size):
+                    cursor.execute(f"INSERT INTO {SEQUENCE_NAME} DEFAULT VALUES")
+                    values.append(cursor.lastrowid)
+                cursor.execute(f"DELETE FROM {SEQUENCE_NAME}")
+        return sorted(values, reverse=True)
+
+
+def advance_sequence(past: int) -> int:
+    """
+    Make the sequence hand out only values above `past`, so codes imported
+    with their original sequence values are never generated again.
+
+    Returns the highest value handed out before the call. Values up to it
+    may still sit in a worker's reserved block, so an import must not keep
+    codes that decode to them.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            # Waits for block reservations in flight, and holds new ones off.
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [SEQUENCE_LOCK_ID])
+            cursor.execute(f"SELECT last_value - (NOT is_called)::int FROM {SEQUENCE_NAME}")
+            issued = cursor.fetchone()[0]
+            if past > issued:
+                cursor.execute(f"SELECT setval('{SEQUENCE_NAME}', %s)", [past])
+        else:
+            # The first INSERT takes SQLite's write lock until commit; the
+            # value it draws is burnt, so everything below it was handed out.
+            cursor.execute(f"INSERT INTO {SEQUENCE_NAME} DEFAULT VALUES")
+            burnt = cursor.lastrowid
+            issued = burnt - 1
+            if past > burnt:
+                # AUTOINCREMENT continues after the highest id ever inserted.
+                cursor.execute(f"INSERT INTO {SEQUENCE_NAME} (id) VALUES (%s)", [past])
+            cursor.execute(f"DELETE FROM {SEQUENCE_NAME}")
+    return issued
+
+
+@lru_cache(maxsize=None)
+def get_code_generator():
+    return import_string(getattr(settings, "SHORT_CODE_GENERATOR", "shorturl.codegen.SequenceCodeGenerator"))()
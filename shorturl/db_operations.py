@@ -0,0 +1,100 @@
+import copy
+
+from django.db.migrations.operations import AddConstraint, AddIndex
+from django.db.migrations.operations.base import Operation
+
+from .routers import PRIMARY_DB
+from .sharding import all_shard_aliases
+
+
+class AddIndexConcurrently(AddIndex):
+    """
+    AddIndex that uses CREATE INDEX CONCURRENTLY on PostgreSQL, so building
+    it on a large table does not block writes. Other databases get a plain
+    CREATE INDEX. Migrations using it must set atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class AddUniqueConstraintConcurrently(AddConstraint):
+    """
+    AddConstraint for a plain UniqueConstraint that, on PostgreSQL, first
+    builds the index with CREATE UNIQUE INDEX CONCURRENTLY and then attaches
+    it with ADD CONSTRAINT ... USING INDEX, so writes are only blocked for
+    the final catalog update. Migrations using it must set atomic = False.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        quote = schema_editor.quote_name
+        table = model._meta.db_table
+        columns = ", ".join(quote(model._meta.get_field(name).column) for name in self.constraint.fields)
+        name = self.constraint.name
+        schema_editor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {quote(name)} ON {quote(table)} ({columns})")
+        schema_editor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} UNIQUE USING INDEX {quote(name)}")
+
+
+class DropForeignKeyConstraintOnShards(Operation):
+    """
+    Drop a ForeignKey's constraint on the shard databases only (every alias
+    in SHORTURL_SHARDS/SHORTURL_PREVIOUS_SHARDS but the default one), whose
+    copies of the referenced table stay empty. The default database and the
+    model state keep the constraint.
+    """
+
+    reversible = True
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {"model_name": self.model_name, "name": self.name}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._alter(app_label, schema_editor, to_state, drop=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._alter(app_label, schema_editor, to_state, drop=False)
+
+    def _alter(self, app_label, schema_editor, state, drop):
+        alias = schema_editor.connection.alias
+        if alias == PRIMARY_DB or alias not in all_shard_aliases():
+            return
+        model = state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(alias, model):
+            return
+        constrained = model._meta.get_field(self.name)
+        unconstrained = copy.copy(constrained)
+        unconstrained.db_constraint = False
+        if drop:
+            schema_editor.alter_field(model, constrained, unconstrained)
+        else:
+            schema_editor.alter_field(model, unconstrained, constrained)
+
+    def describe(self):
+        return f"Drop the foreign key constraint of {self.model_name}.{self.name} on shard databases"
+
+    @property
+    def migration_name_fragment(self):
+        return f"{self.model_name}_{self.name}_shard_fk"
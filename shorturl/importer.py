@@ -0,0 +1,248 @@
+import csv
+import json
+from datetime import timezone as dt_timezone
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bloom import code_filter
+from .codegen import advance_sequence, decode_code, is_generated_code
+from .models import ShortURL, compute_url_hash
+from .routers import use_primary
+from .sharding import fan_out, group_by_shard
+from .services import (
+    BULK_INSERT_BATCH_SIZE, MAX_CODE_LENGTH, InvalidShortenInput, clean_shorten_item, forget_link_counts,
+    forget_missing_short_urls,
+)
+
+
+# Generated codes decode to their sequence value; one from a real export is
+# far below this, while a random 9-character code almost never is.
+MAX_IMPORTED_SEQUENCE_ID = 2**40
+
+
+def read_rows(path, input_format):
+    """
+    Yield (line_number, dict) from a CSV (with a header) or NDJSON file.
+    Files written by export_links can be read back as they are.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if input_format == "csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                row = {"_error": f"Invalid JSON: {e}"}
+            yield line_number, row
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def clean_import_row(numbered_row):
+    """
+    Validate one row (runs in a worker process), returning
+    (line_number, cleaned_row, error). CPU-only: no DB or cache access.
+    """
+    line_number, row = numbered_row
+    try:
+        if not isinstance(row, dict):
+            raise ImportRowError("Each row must be an object")
+        if "_error" in row:
+            raise ImportRowError(row["_error"])
+
+        user = str(row.get("user") or "").strip()
+        if not user:
+            raise ImportRowError("user is required")
+
+        try:
+            original_url, _, _ = clean_shorten_item({"original_url": row.get("original_url")})
+        except InvalidShortenInput as e:
+            raise ImportRowError(f"original_url: {e}")
+
+        short_code = str(row.get("short_code") or "").strip()
+        if not short_code:
+            raise ImportRowError("short_code is required")
+        if len(short_code) > MAX_CODE_LENGTH:
+            raise ImportRowError(f"short_code too long (max {MAX_CODE_LENGTH} chars)")
+        # Checked against the sequence by LinkImporter.
+        sequence_id = decode_code(short_code) if is_generated_code(short_code) else None
+
+        try:
+            click_count = int(row.get("click_count") or 0)
+        except (TypeError, ValueError):
+            raise ImportRowError("click_count must be an integer")
+        if click_count < 0:
+            raise ImportRowError("click_count must not be negative")
+
+        created_at = _parse_timestamp(row.get("created_at"), "created_at") or timezone.now()
+        last_accessed_at = _parse_timestamp(row.get("last_accessed_at"), "last_accessed_at")
+        # Already expired links are imported too; they answer 410 until purged.
+        expires_at = _parse_timestamp(row.get("expires_at"), "expires_at")
+        try:
+            max_clicks = int(row.get("max_clicks") or 0) or None
+        except (TypeError, ValueError):
+            raise ImportRowError("max_clicks must be an integer")
+        if max_clicks is not None and max_clicks < 0:
+            raise ImportRowError("max_clicks must not be negative")
+    except ImportRowError as e:
+        return line_number, None, str(e)
+
+    return line_number, {
+        "user": user,
+        "original_url": original_url,
+        "url_hash": compute_url_hash(original_url),
+        "short_code": short_code,
+        "sequence_id": sequence_id,
+        "click_count": click_count,
+        "created_at": created_at,
+        "last_accessed_at": last_accessed_at,
+        "expires_at": expires_at,
+        "max_clicks": max_clicks,
+    }, None
+
+
+def _parse_timestamp(value, field):
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ImportRowError(f"{field} must be an ISO datetime")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+class LinkImporter:
+    """
+    Load cleaned rows chunk by chunk with a fixed number of queries each:
+    - usernames resolved with one IN query (and remembered)
+    - taken short codes and existing (user, url_hash) pairs with one IN query each (per shard)
+    - new rows inserted with bulk_create(ignore_conflicts=True) on their
+      shard, then read back by short code to find rows that lost a race
+      with live traffic
+    Rejected rows are returned as (line_number, short_code, reason).
+    """
+
+    def __init__(self, batch_size=BULK_INSERT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.user_ids = {}
+
+    def load(self, rows):
+        # Conflict checks must see rows inserted by earlier chunks.
+        with use_primary():
+            return self._load(rows)
+
+    def _load(self, rows):
+        conflicts = []
+        self._resolve_users({row["user"] for _, row in rows})
+
+        accepted = []
+        for line_number, row in rows:
+            user_id = self.user_ids.get(row["user"])
+            if user_id is None:
+                conflicts.append((line_number, row["short_code"], f"Unknown user: {row['user']}"))
+            else:
+                accepted.append((line_number, user_id, row))
+
+        taken_codes = set()
+        taken_urls = set()
+        codes = ShortURL.objects.filter(short_code__in={row["short_code"] for _, _, row in accepted})
+        for queryset in fan_out(codes, primary=True):
+            taken_codes.update(queryset.values_list("short_code", flat=True))
+        urls = ShortURL.objects.filter(
+            user_id__in={user_id for _, user_id, _ in accepted},
+            url_hash__in={row["url_hash"] for _, _, row in accepted},
+        )
+        for queryset in fan_out(urls, primary=True):
+            taken_urls.update(queryset.values_list("user_id", "url_hash"))
+
+        new_objs = {}  # line_number -> ShortURL
+        for line_number, user_id, row in accepted:
+            if row["sequence_id"] is not None and not 0 < row["sequence_id"] <= MAX_IMPORTED_SEQUENCE_ID:
+                # The generator's shape, but not a value it handed out.
+                conflicts.append((line_number, row["short_code"], "short_code reserved for generated codes"))
+                continue
+            if row["short_code"] in taken_codes:
+                conflicts.append((line_number, row["short_code"], "short_code already in use"))
+                continue
+            if (user_id, row["url_hash"]) in taken_urls:
+                conflicts.append((line_number, row["short_code"], "URL already shortened for this user"))
+                continue
+            taken_codes.add(row["short_code"])
+            taken_urls.add((user_id, row["url_hash"]))
+            new_objs[line_number] = ShortURL(
+                user_id=user_id,
+                original_url=row["original_url"],
+                url_hash=row["url_hash"],
+                short_code=row["short_code"],
+                click_count=row["click_count"],
+                created_at=row["created_at"],
+                last_accessed_at=row["last_accessed_at"],
+                expires_at=row["expires_at"],
+                max_clicks=row["max_clicks"],
+            )
+
+        # Kept only if the sequence has not reached them yet: it is then
+        # moved past them, so they can never be handed out again.
+        sequence_ids = {line_number: row["sequence_id"] for line_number, _, row in accepted
+                        if row["sequence_id"] and line_number in new_objs}
+        if sequence_ids:
+            issued = advance_sequence(max(sequence_ids.values()))
+            for line_number, sequence_id in sequence_ids.items():
+                # The generator may still hold it in a reserved block.
+                if sequence_id <= issued:
+                    obj = new_objs.pop(line_number)
+                    conflicts.append((line_number, obj.short_code, "short_code already issued by the code sequence"))
+
+        inserted = set()
+        for alias, objs in group_by_shard(new_objs.values(), lambda obj: obj.short_code).items():
+            ShortURL.objects.using(alias).bulk_create(objs, batch_size=self.batch_size, ignore_conflicts=True)
+            # Live traffic may have taken a code or URL since the checks above.
+            inserted.update(
+                ShortURL.objects.using(alias)
+                .filter(short_code__in=[obj.short_code for obj in objs])
+                .values_list("short_code", "user_id", "url_hash")
+            )
+        created = []
+        for line_number, obj in new_objs.items():
+            if (obj.short_code, obj.user_id, obj.url_hash) in inserted:
+                created.append(obj)
+            else:
+                conflicts.append((line_number, obj.short_code, "short_code or URL taken during import"))
+        # Live lookups may have cached these codes as missing a moment ago.
+        forget_missing_short_urls(obj.short_code for obj in created)
+        code_filter.publish(obj.short_code for obj in created)
+        # bulk_create fires no signals, so recount these users.
+        forget_link_counts({obj.user_id for obj in created})
+        return len(created), conflicts
+
+    def _resolve_users(self, usernames):
+        missing = usernames - self.user_ids.keys()
+        if not missing:
+            return
+        User = get_user_model()
+        found = dict(
+            User.objects.filter(**{f"{User.USERNAME_FIELD}__in": missing}).values_list(User.USERNAME_FIELD, "id")
+        )
+        for username in missing:
+            self.user_ids[username] = found.get(username)
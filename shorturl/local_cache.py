@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from .async_cache import async_cache
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU cache with a per-entry TTL.
+
+    - Lives inside a single worker, so a hit costs no network round trip.
+    - Evicts the least recently used entry once max_entries is reached.
+    - If version_key is given, the whole cache is dropped whenever that
+      shared (Redis) counter changes. The counter is read at most once
+      every version_check seconds, which bounds how long a worker can serve
+      a changed or deleted entry.
+    """
+
+    def __init__(self, max_entries, ttl, version_key=None, version_check=1):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_key = version_key
+        self.version_check = version_check
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def get(self, key):
+        if not self.max_entries:
+            return None
+        now = time.monotonic()
+        if self._version_due(now):
+            self._apply_version(cache.get(self.version_key))
+        return self._get(key, now)
+
+    async def aget(self, key):
+        if not self.max_entries:
+            return None
+        now = time.monotonic()
+        if self._version_due(now):
+            self._apply_version(await async_cache.get(self.version_key))
+        return self._get(key, now)
+
+    def _get(self, key, now):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        if not self.max_entries:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def bump_version(self):
+        """
+        Tell every worker to drop its local copy.
+        """
+        if not self.version_key:
+            return
+        cache.add(self.version_key, 0, timeout=None)
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 1, timeout=None)
+
+    def _version_due(self, now):
+        if not self.version_key or now - self._version_checked_at < self.version_check:
+            return False
+        self._version_checked_at = now
+        return True
+
+    def _apply_version(self, version):
+        if version != self._version:
+            self._version = version
+            self.clear()
@@ -0,0 +1,219 @@
+import json
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from itertools import accumulate
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from shorturl.clicks import click_buffer
+from shorturl.models import ShortURL
+from shorturl.ratelimit import redirect_rate_limiter
+from shorturl.services import bulk_get_or_create_short_urls
+from shorturl.sharding import fan_out
+
+BENCH_USERNAME = "benchmark"
+ENDPOINTS = ("redirect", "shorten", "analytics")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure redirect, shorten and analytics latency in process: p50/p95/p99, "
+        "requests/s and SQL queries per request. Creates its own user and links; "
+        "rate limits are off for the run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=10_000, help="Measured requests (default 10000)")
+        parser.add_argument("--warmup", type=int, default=500, help="Unmeasured requests sent first")
+        parser.add_argument("--links", type=int, default=1000, help="Links created for synthetic traffic")
+        parser.add_argument(
+            "--mix", default="redirect=90,shorten=5,analytics=5",
+            help="Synthetic traffic weights per endpoint",
+        )
+        parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for redirect popularity")
+        parser.add_argument("--missing", type=float, default=0.01, help="Share of redirects to unknown codes")
+        parser.add_argument(
+            "--replay",
+            help="NDJSON file of {\"method\", \"path\", \"body\"} requests to send instead of synthetic traffic",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark user and links afterwards")
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        user, created = get_user_model().objects.get_or_create(username=BENCH_USERNAME)
+        if not created and not options["keep"]:
+            # Might be a real account: never delete a user this run did not create.
+            raise CommandError(
+                f"User '{BENCH_USERNAME}' already exists; rerun with --keep to benchmark with it and leave it in place"
+            )
+        token = str(RefreshToken.for_user(user).access_token)
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0] or "localhost", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        with throttles_off():
+            try:
+                if options["replay"]:
+                    traffic = self.replay(options["replay"])
+                else:
+                    traffic = self.synthetic(user, options)
+
+                for _ in range(options["warmup"]):
+                    self.send(client, *next(traffic))
+
+                samples = defaultdict(list)
+                queries = defaultdict(list)
+                statuses = defaultdict(Counter)
+                started = time.perf_counter()
+                for _ in range(options["requests"]):
+                    name, method, path, body = next(traffic)
+                    with CaptureQueriesContext(connection) as captured:
+                        t0 = time.perf_counter()
+                        response = self.send(client, name, method, path, body)
+                        samples[name].append(time.perf_counter() - t0)
+                    queries[name].append(len(captured))
+                    statuses[name][response.status_code] += 1
+                elapsed = time.perf_counter() - started
+            finally:
+                # Flush buffered clicks now, while the benchmark rows still exist.
+                click_buffer.flush()
+                if created and not options["keep"]:
+                    user.delete()  # Cascades to the user's links on every shard.
+
+        report = {
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+            "requests": options["requests"],
+            "seconds": round(elapsed, 3),
+            "rps": round(options["requests"] / elapsed, 1) if elapsed else 0,
+            "endpoints": {name: summarize(samples[name], queries[name], statuses[name]) for name in samples},
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+    def synthetic(self, user, options):
+        mix = parse_mix(options["mix"])
+        existing = []
+        for queryset in fan_out(ShortURL.objects.filter(user=user)):
+            existing += queryset.values_list("short_code", flat=True)[: options["links"] - len(existing)]
+        wanted = options["links"] - len(existing)
+        if wanted > 0:
+            start = len(existing)
+            items = [{"original_url": f"https://bench.example.com/{i}"} for i in range(start, start + wanted)]
+            existing += [r["short_code"] for r in bulk_get_or_create_short_urls(items, user) if "short_code" in r]
+        if not existing:
+            raise CommandError("No links to benchmark against")
+
+        # Rank k is requested with probability proportional to 1 / k**s.
+        cum_weights = list(accumulate(1 / rank ** options["zipf"] for rank in range(1, len(existing) + 1)))
+        names, name_weights = zip(*mix.items())
+        serial = 0
+        while True:
+            name = random.choices(names, name_weights)[0]
+            if name == "redirect":
+                if random.random() < options["missing"]:
+                    code = f"zz{random.randrange(10**7)}"
+                else:
+                    code = random.choices(existing, cum_weights=cum_weights)[0]
+                yield name, "GET", f"/api/redirect/{code}/", None
+            elif name == "shorten":
+                serial += 1
+                url = f"https://bench.example.com/new/{time.time_ns()}/{serial}"
+                yield name, "POST", "/api/shorten/", {"original_url": url}
+            else:
+                code = random.choices(existing, cum_weights=cum_weights)[0]
+                yield name, "GET", f"/api/analytics/{code}/", None
+
+    def replay(self, path):
+        with open(path, encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        if not requests:
+            raise CommandError(f"No requests in {path}")
+        while True:
+            for request in requests:
+                method = request.get("method", "GET").upper()
+                yield endpoint_name(request["path"]), method, request["path"], request.get("body")
+
+    def send(self, client, name, method, path, body):
+        if method == "GET":
+            return client.get(path)
+        return client.generic(method, path, json.dumps(body or {}), content_type="application/json")
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{report['requests']} requests in {report['seconds']}s = {report['rps']} req/s "
+            f"({report['database']}, {report['cache']})"
+        )
+        self.stdout.write(f"{'endpoint':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}  status")
+        for name, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<12}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+                f"{stats['queries_per_request']:>9}  {stats['status']}"
+            )
+
+
+@contextmanager
+def throttles_off():
+    """
+    Switch off the API throttles and the redirect rate limit, which would
+    otherwise answer most of the run with 429. Views bind their
+    throttle_classes at import time, so patching the setting alone is not enough.
+    """
+    rest_framework = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_CLASSES": []}
+    with (
+        override_settings(REST_FRAMEWORK=rest_framework),
+        mock.patch.object(APIView, "throttle_classes", []),
+        mock.patch.object(redirect_rate_limiter, "rate", 0),
+    ):
+        yield
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise CommandError(f"Unknown endpoint in --mix: {name}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for {name}: {weight}")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def endpoint_name(path):
+    for name in ENDPOINTS:
+        if f"/{name}/" in path:
+            return name
+    return path
+
+
+def summarize(samples, queries, statuses):
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "queries_per_request": round(statistics.fmean(queries), 2),
+        "status": dict(statuses),
+    }
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from shorturl.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines, export_queryset
+
+
+class Command(BaseCommand):
+    help = "Stream links to CSV or NDJSON without loading the table into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", choices=list(EXPORT_FORMATS), default="csv", help="File format (default csv)")
+        parser.add_argument("--file", help="Write here instead of stdout")
+        parser.add_argument("--user", help="Only export links owned by this username")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows per DB fetch")
+
+    def handle(self, *args, **options):
+        owner = None
+        if options["user"]:
+            try:
+                owner = User.objects.get(username=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"Unknown user: {options['user']}")
+
+        lines = export_lines(options["output"], export_queryset(owner), options["chunk_size"])
+        if not options["file"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        written = 0
+        with open(options["file"], "w", newline="", encoding="utf-8") as out:
+            for line in lines:
+                out.write(line)
+                written += 1
+        if options["output"] == "csv":
+            written -= 1
+        self.stderr.write(self.style.SUCCESS(f"Exported {written} links to {options['file']}"))
@@ -0,0 +1,90 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from shorturl.importer import LinkImporter, chunked, clean_import_row, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import existing links from a CSV/NDJSON file with the columns "
+        "user, original_url, short_code, click_count, created_at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import (export_links output works as is)")
+        parser.add_argument("--input", choices=["csv", "ndjson"], help="File format (default: from the extension)")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows validated and inserted per chunk")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Validation processes (0 = in process)")
+        parser.add_argument("--conflicts", help="Rejected rows are written here (default: <path>.conflicts.csv)")
+        parser.add_argument("--checkpoint", help="Progress file (default: <path>.checkpoint)")
+        parser.add_argument("--resume", action="store_true", help="Skip rows up to the line in the checkpoint file")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"No such file: {path}")
+        input_format = options["input"] or ("ndjson" if path.endswith((".ndjson", ".jsonl")) else "csv")
+        conflicts_path = options["conflicts"] or f"{path}.conflicts.csv"
+        checkpoint_path = options["checkpoint"] or f"{path}.checkpoint"
+
+        resume_after = 0
+        if options["resume"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                resume_after = int(f.read().strip() or 0)
+            self.stderr.write(f"Resuming after line {resume_after}")
+
+        rows = ((n, row) for n, row in read_rows(path, input_format) if n > resume_after)
+        importer = LinkImporter()
+        imported = rejected = 0
+
+        pool = None
+        if options["workers"]:
+            # Workers only validate; they set Django up but never touch the DB.
+            pool = ProcessPoolExecutor(max_workers=options["workers"], initializer=django.setup)
+        clean = (lambda chunk: pool.map(clean_import_row, chunk, chunksize=500)) if pool else (lambda chunk: map(clean_import_row, chunk))
+
+        conflicts_mode = "a" if resume_after else "w"
+        with open(conflicts_path, conflicts_mode, newline="", encoding="utf-8") as conflicts_file:
+            conflicts = csv.writer(conflicts_file)
+            if conflicts_mode == "w":
+                conflicts.writerow(["line", "short_code", "reason"])
+            try:
+                for chunk in chunked(rows, options["chunk_size"]):
+                    raw = dict(chunk)
+                    valid = []
+                    for line_number, row, error in clean(chunk):
+                        if error:
+                            short_code = raw[line_number].get("short_code", "") if isinstance(raw[line_number], dict) else ""
+                            conflicts.writerow([line_number, short_code, error])
+                            rejected += 1
+                        else:
+                            valid.append((line_number, row))
+
+                    created, chunk_conflicts = importer.load(valid)
+                    conflicts.writerows(chunk_conflicts)
+                    conflicts_file.flush()
+                    imported += created
+                    rejected += len(chunk_conflicts)
+
+                    # Every row up to here is either imported or reported.
+                    write_checkpoint(checkpoint_path, chunk[-1][0])
+                    self.stderr.write(f"line {chunk[-1][0]}: {imported} imported, {rejected} rejected")
+            finally:
+                if pool:
+                    pool.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} links, rejected {rejected} (see {conflicts_path})"
+        ))
+
+
+def write_checkpoint(path, line_number):
+    # Write then rename, so a crash never leaves a half-written checkpoint.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(line_number))
+    os.replace(tmp_path, path)
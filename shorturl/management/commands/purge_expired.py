@@ -0,0 +1,122 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from shorturl.export import export_queryset, export_rows, ndjson_lines
+from shorturl.models import ClickEvent, ClickRollup, ShortURL
+from shorturl.services import adjust_link_count, invalidate_caches
+from shorturl.sharding import all_shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete links that expired or used up their clicks, and click events past "
+        "CLICK_EVENT_RETENTION_DAYS, in small chunks (run from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace-days", type=int, default=7, help="Keep expired links this long so they answer 410 (default 7)")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows deleted per transaction")
+        parser.add_argument("--sleep", type=float, default=0.1, help="Pause between chunks, in seconds")
+        parser.add_argument(
+            "--click-event-days", type=int, default=None,
+            help="Keep raw click events this long (default CLICK_EVENT_RETENTION_DAYS; 0 keeps them)",
+        )
+        parser.add_argument("--archive", help="Append purged links to this NDJSON file before deleting them")
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be purged")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["grace_days"])
+        # Each filter walks one of the partial indexes on ShortURL.
+        candidates = [
+            ShortURL.objects.filter(expires_at__lt=cutoff),
+            ShortURL.objects.filter(max_clicks__isnull=False, click_count__gte=F("max_clicks"), last_accessed_at__lt=cutoff),
+        ]
+
+        purged = 0
+        for alias in all_shard_aliases():
+            for queryset in candidates:
+                queryset = queryset.using(alias)
+                if options["dry_run"]:
+                    purged += queryset.count()
+                    continue
+                purged += self.purge(queryset, options)
+        events = 0
+        days = options["click_event_days"]
+        if days is None:
+            days = getattr(settings, "CLICK_EVENT_RETENTION_DAYS", 90)
+        if days:
+            event_cutoff = timezone.now() - timedelta(days=days)
+            for alias in all_shard_aliases():
+                if options["dry_run"]:
+                    events += ClickEvent.objects.using(alias).filter(clicked_at__lt=event_cutoff).count()
+                    continue
+                events += self.purge_click_events(alias, event_cutoff, options)
+        verb = "Would purge" if options["dry_run"] else "Purged"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {purged} links and {events} old click events"))
+
+    def purge(self, queryset, options):
+        purged = 0
+        last_id = 0
+        while True:
+            # Keyset on id: short transactions, and no rescanning of rows
+            # already handled.
+            rows = list(
+                queryset.filter(id__gt=last_id).order_by("id").values_list("id", "short_code", "user_id")[: options["chunk_size"]]
+            )
+            if not rows:
+                return purged
+            ids = [row[0] for row in rows]
+            last_id = ids[-1]
+            db = queryset.db
+            if options["archive"]:
+                self.archive(options["archive"], db, ids)
+            with transaction.atomic(using=db):
+                # Row-level locks only. Raw DELETEs, children first, skip
+                # post_delete: per row that is a cache delete and a version bump.
+                ClickEvent.objects.using(db).filter(short_url_id__in=ids)._raw_delete(db)
+                ClickRollup.objects.using(db).filter(short_url_id__in=ids)._raw_delete(db)
+                ShortURL.objects.using(db).filter(id__in=ids)._raw_delete(db)
+            invalidate_caches(short_code for _, short_code, _ in rows)
+            for user_id, count in Counter(user_id for _, _, user_id in rows).items():
+                adjust_link_count(user_id, -count)
+            purged += len(ids)
+            self.stderr.write(f"{purged} purged")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+    def purge_click_events(self, alias, cutoff, options):
+        """
+        Every stored event is already in the rollups (same transaction), so
+        only the raw rows go. Oldest first along the primary key, which
+        follows insertion time, stopping at the first chunk that holds a
+        newer event: no scan of the recent part of the table.
+        """
+        deleted = 0
+        last_id = 0
+        while True:
+            rows = list(
+                ClickEvent.objects.using(alias).filter(id__gt=last_id).order_by("id")
+                .values_list("id", "clicked_at")[: options["chunk_size"]]
+            )
+            ids = [event_id for event_id, clicked_at in rows if clicked_at < cutoff]
+            if ids:
+                ClickEvent.objects.using(alias).filter(id__in=ids)._raw_delete(alias)
+                deleted += len(ids)
+                self.stderr.write(f"{deleted} click events purged")
+            if not rows or len(ids) < len(rows):
+                return deleted
+            last_id = rows[-1][0]
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+    def archive(self, path, alias, ids):
+        rows = export_rows(export_queryset().using(alias).filter(id__in=ids))
+        with open(path, "a", encoding="utf-8") as out:
+            out.writelines(ndjson_lines(rows))
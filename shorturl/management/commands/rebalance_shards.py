@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from shorturl.models import ClickEvent, ClickRollup, ShortURL
+from shorturl.sharding import all_shard_aliases, shard_for_code
+
+COPY_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Move links (with their click events and rollups) to the shard that owns their short code "
+        "under SHORTURL_SHARDS. Safe to run on a live site and to rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows scanned per step (default 500)")
+        parser.add_argument("--sleep", type=float, default=0.05, help="Pause between steps, in seconds")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the links that would move")
+
+    def handle(self, *args, **options):
+        moved = 0
+        for source in all_shard_aliases():
+            moved += self.rebalance(source, options)
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {moved} links"))
+
+    def rebalance(self, source, options):
+        moved = 0
+        last_id = 0
+        while True:
+            # Keyset on id, like purge_expired: short transactions, no rescans.
+            rows = list(
+                ShortURL.objects.using(source).filter(id__gt=last_id).order_by("id")
+                .values_list("id", "short_code")[: options["chunk_size"]]
+            )
+            if not rows:
+                return moved
+            last_id = rows[-1][0]
+            misplaced = {}
+            for pk, short_code in rows:
+                owner = shard_for_code(short_code)
+                if owner != source:
+                    misplaced.setdefault(owner, []).append(pk)
+            for target, ids in misplaced.items():
+                if not options["dry_run"]:
+                    move_links(source, target, ids)
+                moved += len(ids)
+            if misplaced:
+                self.stderr.write(f"{source}: {moved} moved")
+                if options["sleep"] and not options["dry_run"]:
+                    time.sleep(options["sleep"])
+
+
+def move_links(source, target, ids):
+    """
+    Copy links and their click data from source to target, then delete them
+    from source. Rows get new ids on the target.
+    """
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        # Click flushes for these rows wait until the move commits.
+        originals = list(ShortURL.objects.using(source).select_for_update().filter(id__in=ids).order_by("id"))
+        codes = [obj.short_code for obj in originals]
+        # Leftovers of an interrupted run; the source rows are authoritative.
+        stale = ShortURL.objects.using(target).filter(short_code__in=codes)
+        for model in (ClickEvent, ClickRollup):
+            model.objects.using(target).filter(short_url__in=stale).delete()
+        stale._raw_delete(target)  # No post_delete: the links are moving, not going away.
+
+        fields = [f.attname for f in ShortURL._meta.concrete_fields if not f.primary_key]
+        copies = [ShortURL(**{name: getattr(obj, name) for name in fields}) for obj in originals]
+        ShortURL.objects.using(target).bulk_create(copies)
+        new_ids = {obj.pk: copy.pk for obj, copy in zip(originals, copies)}
+
+        for model in (ClickRollup, ClickEvent):
+            batch = []
+            for row in model.objects.using(source).filter(short_url_id__in=ids).iterator(chunk_size=COPY_BATCH_SIZE):
+                row.pk = None
+                row.short_url_id = new_ids[row.short_url_id]
+                batch.append(row)
+                if len(batch) >= COPY_BATCH_SIZE:
+                    model.objects.using(target).bulk_create(batch)
+                    batch = []
+            if batch:
+                model.objects.using(target).bulk_create(batch)
+            model.objects.using(source).filter(short_url_id__in=ids).delete()
+        ShortURL.objects.using(source).filter(id__in=ids)._raw_delete(source)
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from shorturl.bloom import build_code_filter
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the short code filter to a file that workers memory-map at startup "
+        "(run from cron, more often than CODE_FILTER_DELTA_TTL_SECONDS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=settings.CODE_FILTER_SNAPSHOT, help="Snapshot path (default CODE_FILTER_SNAPSHOT)")
+        parser.add_argument("--error-rate", type=float, default=settings.CODE_FILTER_ERROR_RATE, help="Target false positive rate")
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Set CODE_FILTER_SNAPSHOT or pass --output")
+        started = time.perf_counter()
+        bloom, seq, epoch = build_code_filter(options["error_rate"], settings.CODE_FILTER_MIN_CAPACITY)
+        bloom.save(options["output"], seq, epoch)
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {bloom.items} codes ({len(bloom.bits) // 1024} KiB, {bloom.num_hashes} hashes, seq {seq}) "
+            f"to {options['output']} in {time.perf_counter() - started:.1f}s"
+        ))
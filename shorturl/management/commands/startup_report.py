@@ -0,0 +1,117 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+REDIRECT_PROFILE = "urlshortener.settings_redirect"
+
+# Run in a fresh interpreter: what a gunicorn worker (or a preloading
+# master) does before serving its first request.
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+ready = time.perf_counter()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except (OSError, StopIteration):
+    pass
+print(json.dumps({
+    "setup_ms": (setup - started) * 1000,
+    "urlconf_ms": (ready - setup) * 1000,
+    "modules": len(sys.modules),
+    "rss_kb": rss_kb,
+}))
+"""
+
+# "import time:      self |  cumulative | <indent>module" from -X importtime.
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| *(\S+)")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start per settings module in fresh interpreters: time to load Django, "
+        "the middleware and the URLconf, resident memory, loaded modules and import time per package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile", action="append", dest="profiles", metavar="SETTINGS_MODULE",
+            help=f"Settings module to measure; repeatable (default: the current one and {REDIRECT_PROFILE})",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per profile; the fastest counts (default 3)")
+        parser.add_argument("--top", type=int, default=10, help="Packages listed per profile, slowest first (default 10)")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"] or [settings.SETTINGS_MODULE, REDIRECT_PROFILE]
+        report = {
+            profile: self.measure(profile, max(options["repeat"], 1), options["top"])
+            for profile in dict.fromkeys(profiles)
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+    def measure(self, profile, repeat, top):
+        runs = [self.probe(profile) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run["setup_ms"] + run["urlconf_ms"])
+        # A separate run: -X importtime slows the import it reports on.
+        imports = self.probe(profile, importtime=True)
+        return {
+            "startup_ms": round(best["setup_ms"] + best["urlconf_ms"], 1),
+            "setup_ms": round(best["setup_ms"], 1),
+            "urlconf_ms": round(best["urlconf_ms"], 1),
+            "modules": best["modules"],
+            "rss_mb": round(max(run["rss_kb"] for run in runs) / 1024, 1),
+            "imports_ms": import_time_by_package(imports["importtime"], top),
+        }
+
+    def probe(self, profile, importtime=False):
+        command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", PROBE]
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": profile}
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f"{profile} failed to start:\n{result.stderr[-2000:]}")
+        run = json.loads(result.stdout.strip().splitlines()[-1])
+        run["importtime"] = result.stderr
+        return run
+
+    def print_report(self, report):
+        self.stdout.write(f"{'profile':<34}{'startup ms':>12}{'setup ms':>10}{'urls ms':>9}{'modules':>9}{'RSS MB':>8}")
+        for profile, stats in report.items():
+            self.stdout.write(
+                f"{profile:<34}{stats['startup_ms']:>12}{stats['setup_ms']:>10}{stats['urlconf_ms']:>9}"
+                f"{stats['modules']:>9}{stats['rss_mb']:>8}"
+            )
+        for profile, stats in report.items():
+            self.stdout.write(f"\nImport time by package, {profile} (ms):")
+            for name, ms in stats["imports_ms"].items():
+                self.stdout.write(f"  {ms:>8}  {name}")
+
+
+def import_time_by_package(importtime, top):
+    """
+    Import time summed per top-level package (self time of each module).
+    """
+    totals = {}
+    for line in importtime.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            package = match.group(2).split(".")[0]
+            totals[package] = totals.get(package, 0) + int(match.group(1))
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {name: round(us / 1000, 1) for name, us in ranked}
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from shorturl.models import ShortURL
+from shorturl.services import RECORD_FIELDS, cache_short_urls
+from shorturl.sharding import fan_out
+
+
+class Command(BaseCommand):
+    help = "Preload the redirect cache with the hottest short codes (run after a deploy or Redis restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=100_000, help="Number of codes to load per shard (default 100000)")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per DB fetch and per cache write")
+        parser.add_argument(
+            "--order",
+            choices=["clicks", "recent"],
+            default="clicks",
+            help="Rank by click_count (default) or by last_accessed_at",
+        )
+
+    def handle(self, *args, **options):
+        ordering = {
+            "clicks": ("-click_count", "-last_accessed_at"),
+            "recent": ("-last_accessed_at", "-click_count"),
+        }[options["order"]]
+        chunk_size = options["chunk_size"]
+        loaded = 0
+        for queryset in fan_out(ShortURL.objects.filter(last_accessed_at__isnull=False)):
+            # iterator() streams through a server-side cursor on PostgreSQL.
+            rows = queryset.order_by(*ordering).only(*RECORD_FIELDS)[: options["top"]].iterator(chunk_size=chunk_size)
+            batch = []
+            for obj in rows:
+                batch.append(obj)
+                if len(batch) >= chunk_size:
+                    loaded += cache_short_urls(batch)
+                    batch = []
+            if batch:
+                loaded += cache_short_urls(batch)
+        self.stdout.write(self.style.SUCCESS(f"Warmed {loaded} short codes"))
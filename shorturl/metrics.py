@@ -0,0 +1,213 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Upper bounds in seconds; sized for sub-millisecond cache hits up to slow DB calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRICS = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route and status class."),
+    "http_request_db_queries": ("histogram", "SQL queries per request by route."),
+    "db_query_duration_seconds": ("histogram", "SQL query latency."),
+    "shorturl_cache_lookups_total": ("counter", "Redirect record lookups by cache tier and result."),
+    "shorturl_cache_fills_total": ("counter", "Cache misses filled from the database."),
+    "shorturl_code_filter_rejects_total": ("counter", "Cache misses answered 404 by the short code filter, without SQL."),
+    "shorturl_clicks_recorded_total": ("counter", "Clicks added to the click buffer."),
+    "shorturl_click_flush_failures_total": ("counter", "Click buffer flushes that failed and were retried later."),
+    "shorturl_throttle_duration_seconds": ("histogram", "Time spent in rate limit checks by scope."),
+    "shorturl_throttled_total": ("counter", "Requests rejected by a rate limit, by scope."),
+}
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+# Live workers rewrite their file every few seconds; older files are from
+# workers that exited and are dropped (Prometheus treats that as a reset).
+STALE_SNAPSHOT_SECONDS = 3600
+
+# Queries issued while handling the current request (None outside requests).
+request_queries = ContextVar("request_queries", default=None)
+
+
+class Metrics:
+    """
+    In-process counters and histograms with Prometheus text output.
+
+    - Recording is a dict update under a lock: no I/O on the request path.
+    - With METRICS_DIR set, a daemon thread writes this worker's totals to
+      METRICS_DIR/<pid>.json every METRICS_FLUSH_INTERVAL_SECONDS, and the
+      /metrics view sums the files of all gunicorn workers.
+    """
+
+    def __init__(self, directory=None, interval=None):
+        self.enabled = getattr(settings, "METRICS_ENABLED", True)
+        self.directory = directory if directory is not None else getattr(settings, "METRICS_DIR", "")
+        self.interval = interval or getattr(settings, "METRICS_FLUSH_INTERVAL_SECONDS", 5)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._pid = None
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        self._ensure_flusher()
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        self._ensure_flusher()
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0.0]
+            histogram[1][index] += 1
+            histogram[2] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                "histograms": [
+                    [name, list(labels), list(bounds), list(counts), total]
+                    for (name, labels), (bounds, counts, total) in self._histograms.items()
+                ],
+            }
+
+    def write_snapshot(self):
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def collect(self):
+        """
+        Snapshots of every worker (or just this one without METRICS_DIR).
+        """
+        if not self.directory:
+            return [self.snapshot()]
+        self.write_snapshot()
+        snapshots = []
+        stale_before = time.time() - STALE_SNAPSHOT_SECONDS
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                if os.path.getmtime(path) < stale_before:
+                    os.remove(path)
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        return render_prometheus(merge_snapshots(self.collect()))
+
+    def _ensure_flusher(self):
+        # Same fork-safety dance as the click buffer.
+        pid = os.getpid()
+        if self._pid == pid or not self.directory:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            # A forked worker must not report the master's numbers as its own.
+            self._counters = {}
+            self._histograms = {}
+            threading.Thread(target=self._run, name="metrics-writer", daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write_snapshot()
+            except OSError:
+                pass
+
+
+def merge_snapshots(snapshots):
+    counters = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            if merged is None or merged[0] != bounds:
+                histograms[key] = [bounds, list(counts), total]
+            else:
+                merged[1] = [a + b for a, b in zip(merged[1], counts)]
+                merged[2] += total
+    return counters, histograms
+
+
+def render_prometheus(merged):
+    counters, histograms = merged
+    series = {}
+    for (name, labels), value in sorted(counters.items()):
+        series.setdefault(name, []).append(f"{name}{format_labels(labels)} {value}")
+    for (name, labels), (bounds, counts, total) in sorted(histograms.items()):
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip([*bounds, "+Inf"], counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+
+    out = []
+    for name in sorted(series):
+        kind, help_text = METRICS.get(name, ("untyped", ""))
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(series[name])
+    return "\n".join(out) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def observe_query(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper hook: times every SQL query and counts it
+    against the current request.
+    """
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.observe("db_query_duration_seconds", time.perf_counter() - started)
+        counter = request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+def install_query_observer(sender, connection, **kwargs):
+    # connection_created handler; covers every alias and the async ORM's threads.
+    if observe_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(observe_query)
+
+
+metrics = Metrics()
@@ -0,0 +1,105 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import QUERY_BUCKETS, metrics, request_queries
+from .routers import _use_primary, primary_pin_key, replica_aliases
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class MetricsMiddleware:
+    """
+    Request latency and SQL query count per route, for /metrics.
+    Works for sync and async views without forcing either into the other.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        token = request_queries.set([0])
+        try:
+            response = self.get_response(request)
+            self.record(request, response, started)
+            return response
+        finally:
+            request_queries.reset(token)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        token = request_queries.set([0])
+        try:
+            response = await self.get_response(request)
+            self.record(request, response, started)
+            return response
+        finally:
+            request_queries.reset(token)
+
+    def record(self, request, response, started):
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else "unmatched"
+        status = f"{response.status_code // 100}xx"
+        metrics.observe("http_request_duration_seconds", time.perf_counter() - started, route=route, status=status)
+        metrics.observe("http_request_db_queries", request_queries.get()[0], buckets=QUERY_BUCKETS, route=route)
+
+
+class ReplicaPinMiddleware:
+    """
+    Read-your-writes on top of ReplicaRouter.
+
+    - Writing requests (POST, PUT, PATCH, DELETE) read from the primary.
+    - After a successful write by a logged-in user, that user's reads stay
+      on the primary for REPLICA_PIN_SECONDS (checked by the JWT
+      authentication class), which covers replication lag.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+        token = _use_primary.set(request.method not in SAFE_METHODS)
+        try:
+            response = self.get_response(request)
+            if self.wrote(request, response):
+                cache.set(primary_pin_key(request.user.pk), 1, timeout=settings.REPLICA_PIN_SECONDS)
+            return response
+        finally:
+            _use_primary.reset(token)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+        token = _use_primary.set(request.method not in SAFE_METHODS)
+        try:
+            response = await self.get_response(request)
+            if self.wrote(request, response):
+                await cache.aset(primary_pin_key(request.user.pk), 1, timeout=settings.REPLICA_PIN_SECONDS)
+            return response
+        finally:
+            _use_primary.reset(token)
+
+    def wrote(self, request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return False
+        user = getattr(request, "user", None)
+        return user is not None and user.is_authenticated
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+SEQUENCE_NAME = "shorturl_code_seq"
+
+
+def create_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME}")
+    else:
+        schema_editor.execute(f"CREATE TABLE {SEQUENCE_NAME} (id integer PRIMARY KEY AUTOINCREMENT)")
+
+
+def drop_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE_NAME}")
+    else:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEQUENCE_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorturl', '0002_alter_shorturl_original_url_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sequence, drop_sequence),
+    ]
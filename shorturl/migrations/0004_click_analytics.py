@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorturl', '0003_short_code_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clicked_at', models.DateTimeField()),
+                ('referrer', models.CharField(blank=True, max_length=255)),
+                ('country', models.CharField(blank=True, max_length=2)),
+                ('user_agent', models.CharField(blank=True, max_length=32)),
+                ('short_url', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_events', to='shorturl.shorturl')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('dimension', models.CharField(blank=True, max_length=16)),
+                ('bucket_start', models.DateTimeField()),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('short_url', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_rollups', to='shorturl.shorturl')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('short_url', 'granularity', 'dimension', 'bucket_start', 'value'), name='unique_click_rollup_bucket')],
+            },
+        ),
+    ]
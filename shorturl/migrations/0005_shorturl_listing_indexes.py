@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+from shorturl.db_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('shorturl', '0004_click_analytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='shorturl',
+            index=models.Index(fields=['-created_at', '-id'], name='shorturl_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shorturl',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='shorturl_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorturl', '0005_shorturl_listing_indexes'),
+    ]
+
+    operations = [
+        # Nullable with no default: a catalog-only change, no table rewrite.
+        migrations.AddField(
+            model_name='shorturl',
+            name='url_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,65 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+from django.db import migrations, transaction
+from django.db.models import Count, Min
+
+BATCH_SIZE = 1000
+
+
+def normalize_url(url):
+    # Frozen copy of shorturl.models.normalize_url.
+    parts = urlsplit(url)
+    userinfo, at, host = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}{at}{host.lower()}"
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path, parts.query, parts.fragment))
+
+
+def backfill_url_hash(apps, schema_editor):
+    """
+    Fill url_hash in primary-key batches, one short transaction per batch,
+    so only BATCH_SIZE rows are locked at a time.
+    """
+    ShortURL = apps.get_model("shorturl", "ShortURL")
+    db = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        batch = list(
+            ShortURL.objects.using(db)
+            .filter(id__gt=last_id, url_hash__isnull=True)
+            .order_by("id")
+            .only("id", "original_url")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for obj in batch:
+            obj.url_hash = hashlib.sha256(normalize_url(obj.original_url).encode()).hexdigest()
+        with transaction.atomic(using=db):
+            ShortURL.objects.using(db).bulk_update(batch, ["url_hash"])
+        last_id = batch[-1].id
+
+    # URLs that only differed in scheme/host case now share a hash. Keep the
+    # oldest row as the idempotency target; the others keep a NULL hash.
+    duplicates = (
+        ShortURL.objects.using(db)
+        .values("user_id", "url_hash")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    for dup in duplicates.iterator():
+        ShortURL.objects.using(db).filter(user_id=dup["user_id"], url_hash=dup["url_hash"]).exclude(
+            id=dup["keep"]
+        ).update(url_hash=None)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('shorturl', '0006_shorturl_url_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_url_hash, migrations.RunPython.noop),
+    ]
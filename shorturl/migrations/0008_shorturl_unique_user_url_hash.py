@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations, models
+
+from shorturl.db_operations import AddUniqueConstraintConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('shorturl', '0007_backfill_url_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddUniqueConstraintConcurrently(
+            model_name='shorturl',
+            constraint=models.UniqueConstraint(fields=('user', 'url_hash'), name='unique_user_url_hash'),
+        ),
+        # Drops the wide (user, original_url) B-tree.
+        migrations.AlterUniqueTogether(
+            name='shorturl',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorturl', '0008_shorturl_unique_user_url_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='shorturl',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
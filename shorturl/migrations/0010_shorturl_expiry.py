@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+from shorturl.db_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('shorturl', '0009_shorturl_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shorturl',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shorturl',
+            name='max_clicks',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='shorturl',
+            index=models.Index(condition=models.Q(('expires_at__isnull', False)), fields=['expires_at'], name='shorturl_expires_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='shorturl',
+            index=models.Index(condition=models.Q(('max_clicks__isnull', False)), fields=['id'], name='shorturl_max_clicks_idx'),
+        ),
+    ]
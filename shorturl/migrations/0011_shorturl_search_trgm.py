@@ -0,0 +1,52 @@
+import logging
+
+from django.db import DatabaseError, migrations
+
+logger = logging.getLogger(__name__)
+
+# Expression indexes matching the SQL of the icontains lookups in
+# UserLinksView: UPPER("column"::text) LIKE UPPER('%q%').
+TRIGRAM_INDEXES = {
+    "shorturl_url_trgm_idx": "original_url",
+    "shorturl_code_trgm_idx": "short_code",
+}
+
+
+def add_trigram_indexes(apps, schema_editor):
+    """
+    PostgreSQL only, and optional: without pg_trgm (or the rights to create
+    it) search still works, it just filters the user's rows sequentially.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        logger.warning("pg_trgm is not available; skipping the link search indexes")
+        return
+    table = schema_editor.quote_name(apps.get_model("shorturl", "ShortURL")._meta.db_table)
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {schema_editor.quote_name(name)} "
+            f"ON {table} USING gin ((UPPER({schema_editor.quote_name(column)}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('shorturl', '0010_shorturl_expiry'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_trigram_indexes, drop_trigram_indexes),
+    ]
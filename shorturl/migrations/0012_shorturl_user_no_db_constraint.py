@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import migrations
+
+from shorturl.db_operations import DropForeignKeyConstraintOnShards
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shorturl', '0011_shorturl_search_trgm'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Users only live on the default database; shards hold links only.
+        DropForeignKeyConstraintOnShards(model_name='shorturl', name='user'),
+    ]
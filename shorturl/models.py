@@ -1,6 +1,10 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
 from django.db import models
 from django.db.models.signals import *
 from django.conf import settings
+from django.utils import timezone
 
 class UserProfile(models.Model):
     user=models.OneToOneField(settings.AUTH_USER_MODEL,on_delete=models.CASCADE)
@@ -8,14 +12,90 @@ class UserProfile(models.Model):
     def __str__(self):
         return (self.user.username)
 
+def normalize_url(url):
+    """
+    Scheme and host are case-insensitive; everything else is kept as is.
+    """
+    parts = urlsplit(url)
+    userinfo, at, host = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}{at}{host.lower()}"
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path, parts.query, parts.fragment))
+
+
+def compute_url_hash(url):
+    """
+    Fixed-width key for idempotent shorten lookups: SHA-256 of the normalized URL.
+    """
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+
 class ShortURL(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.CASCADE)
     original_url = models.URLField()
+    # Nullable so the column could be added and backfilled without a table
+    # rewrite. New rows always get it; the 0007 backfill left it NULL on
+    # rows whose URL only differs in case from an older one of the user's.
+    url_hash = models.CharField(max_length=64, null=True, editable=False)
     short_code = models.CharField(max_length=10, unique=True)
     click_count = models.PositiveIntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so imported links keep their dates.
+    created_at = models.DateTimeField(default=timezone.now)
     last_accessed_at = models.DateTimeField(null=True, blank=True)
+    # Optional limits; past either one the link answers 410 Gone.
+    expires_at = models.DateTimeField(null=True, blank=True)
+    max_clicks = models.PositiveIntegerField(null=True, blank=True)
     class Meta:
-        unique_together = ("user", "original_url")
+        constraints = [
+            models.UniqueConstraint(fields=["user", "url_hash"], name="unique_user_url_hash"),
+        ]
+        indexes = [
+            # Keyset pagination, newest first, optionally per user.
+            models.Index(fields=["-created_at", "-id"], name="shorturl_created_id_idx"),
+            models.Index(fields=["user", "-created_at", "-id"], name="shorturl_user_created_idx"),
+            # Partial indexes for purge_expired; most links have no limits.
+            models.Index(fields=["expires_at"], name="shorturl_expires_at_idx", condition=models.Q(expires_at__isnull=False)),
+            models.Index(fields=["id"], name="shorturl_max_clicks_idx", condition=models.Q(max_clicks__isnull=False)),
+        ]
+    def save(self, *args, **kwargs):
+        # A NULL hash stays NULL: the row's hash belongs to an older duplicate.
+        if self._state.adding or self.url_hash is not None:
+            self.url_hash = compute_url_hash(self.original_url)
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return f"{self.user} -> {self.short_code}"
\ No newline at end of file
+        return f"{self.user} -> {self.short_code}"
+
+class ClickEvent(models.Model):
+    """
+    Append-only raw click log, written in bulk by the click buffer.
+    """
+    short_url = models.ForeignKey(ShortURL, on_delete=models.CASCADE, related_name="click_events")
+    clicked_at = models.DateTimeField()
+    referrer = models.CharField(max_length=255, blank=True)
+    country = models.CharField(max_length=2, blank=True)
+    user_agent = models.CharField(max_length=32, blank=True)
+
+
+class ClickRollup(models.Model):
+    """
+    Pre-aggregated click counts per time bucket.
+    dimension "" holds the totals; other dimensions hold breakdowns by value.
+    """
+    HOUR = "hour"
+    DAY = "day"
+    GRANULARITY_CHOICES = [(HOUR, "Hour"), (DAY, "Day")]
+    DIMENSIONS = ("referrer", "country", "user_agent")
+
+    short_url = models.ForeignKey(ShortURL, on_delete=models.CASCADE, related_name="click_rollups")
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    dimension = models.CharField(max_length=16, blank=True)
+    bucket_start = models.DateTimeField()
+    value = models.CharField(max_length=255, blank=True)
+    count = models.PositiveBigIntegerField(default=0)
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["short_url", "granularity", "dimension", "bucket_start", "value"],
+                name="unique_click_rollup_bucket",
+            ),
+        ]
@@ -0,0 +1,132 @@
+import base64
+import json
+from itertools import chain
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .sharding import fan_out, is_sharded
+
+
+class AdminShortURLPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+def approximate_count(queryset):
+    """
+    Planner row estimate on PostgreSQL (no table scan); exact count elsewhere.
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.count()
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (created_at, id), newest first.
+
+    - Each page is an index range scan on (created_at DESC, id DESC); there
+      is no OFFSET and no COUNT(*).
+    - ?count=approx adds the planner's row estimate as "count".
+    - ?page=N still works and falls back to page-number pagination
+      (not across shards).
+    - With sharding, each shard returns its own first page and the pages
+      are merged in memory.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    page_number_class = AdminShortURLPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_number_pagination = None
+        if "page" in request.query_params:
+            if is_sharded():
+                raise NotFound("Page numbers are not supported across shards; follow the cursor")
+            self.page_number_pagination = self.page_number_class()
+            return self.page_number_pagination.paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        querysets = fan_out(queryset)
+        self.count = None
+        if request.query_params.get("count") == "approx":
+            self.count = sum(approximate_count(qs) for qs in querysets)
+        if cursor:
+            created_at, pk = cursor
+            querysets = [qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)) for qs in querysets]
+        pages = [list(qs.order_by(*self.ordering)[: page_size + 1]) for qs in querysets]
+        rows = pages[0] if len(pages) == 1 else sorted(chain(*pages), key=self.sort_key, reverse=True)[: page_size + 1]
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def sort_key(obj):
+        if isinstance(obj, dict):
+            return obj["created_at"], obj["id"]
+        return obj.created_at, obj.pk
+
+    def encode_cursor(self, obj):
+        created_at, pk = self.sort_key(obj)
+        raw = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError
+            return created_at, int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor")
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "count": self.count,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "nullable": True},
+                "results": schema,
+            },
+        }
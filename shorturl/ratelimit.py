@@ -0,0 +1,71 @@
+"""
+In-process rate limiting for the redirect hot path. Plain Python and
+Django only, so the redirect-only profile (settings_redirect) never imports
+DRF; the API throttles live in throttling.py.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LocalTokenBucket:
+    """
+    Per-client token buckets kept in process memory.
+
+    - No cache round trip, so it is cheap enough for the public redirect path.
+    - Each client may burst up to `burst` requests, refilled at `rate` per second.
+    - At most max_clients buckets are kept; the least recently seen is dropped.
+    - Limits are per worker, which is fine for coarse abuse protection.
+    """
+
+    def __init__(self, rate, burst, max_clients=100_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        if not self.rate or not key:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed
+
+    def retry_after(self):
+        return max(1, int(1 / self.rate)) if self.rate else 0
+
+
+redirect_rate_limiter = LocalTokenBucket(
+    rate=getattr(settings, "REDIRECT_RATE_PER_SECOND", 20),
+    burst=getattr(settings, "REDIRECT_RATE_BURST", 100),
+    max_clients=getattr(settings, "REDIRECT_RATE_MAX_CLIENTS", 100_000),
+)
+
+
+def client_ip(request):
+    """
+    Same client identity the DRF throttles use (BaseThrottle.get_ident,
+    honouring REST_FRAMEWORK["NUM_PROXIES"]), without importing DRF.
+    """
+    xff = request.META.get("HTTP_X_FORWARDED_FOR")
+    remote_addr = request.META.get("REMOTE_ADDR")
+    num_proxies = getattr(settings, "REST_FRAMEWORK", {}).get("NUM_PROXIES")
+
+    if num_proxies is not None:
+        if num_proxies == 0 or xff is None:
+            return remote_addr
+        addrs = xff.split(",")
+        return addrs[-min(num_proxies, len(addrs))].strip()
+
+    return "".join(xff.split()) if xff else remote_addr
@@ -0,0 +1,89 @@
+"""
+Plain Django views (no DRF) for the redirect hot path and /metrics.
+Kept apart from views.py so the redirect-only profile (settings_redirect)
+can serve them without importing DRF, simplejwt or drf-spectacular.
+"""
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import redirect
+from django.views import View
+
+from .clicks import click_details
+from .metrics import metrics
+from .services import aresolve_short_url, record_click, resolve_short_url
+from .ratelimit import client_ip, redirect_rate_limiter
+
+
+def redirect_throttled(request):
+    """
+    Cheap per-IP abuse protection for redirects, in place of the DRF throttles.
+    """
+    started = time.perf_counter()
+    allowed = redirect_rate_limiter.allow(client_ip(request))
+    metrics.observe("shorturl_throttle_duration_seconds", time.perf_counter() - started, scope="redirect")
+    if allowed:
+        return None
+    metrics.inc("shorturl_throttled_total", scope="redirect")
+    response = JsonResponse({"error": "Too many requests"}, status=429)
+    response["Retry-After"] = str(redirect_rate_limiter.retry_after())
+    return response
+
+
+class RedirectURLView(View):
+    """
+    Public redirect as a plain Django view: no DRF request wrapping, JWT
+    authentication or cache-backed throttles on the hottest path.
+    """
+
+    def get(self, request, short_code):
+        throttled = redirect_throttled(request)
+        if throttled:
+            return throttled
+
+        record = resolve_short_url(short_code)
+        if record is None:
+            return JsonResponse({"error": "Short URL not found"}, status=404)
+        if record.get("gone"):
+            return JsonResponse({"error": "Short URL has expired"}, status=410)
+
+        record_click(short_code, **click_details(request))
+        return redirect(record["original_url"])
+
+
+class AsyncRedirectURLView(View):
+    """
+    Redirect served natively under ASGI: async Redis for the cache and the
+    async ORM on a miss, so a worker is never blocked on I/O.
+    """
+
+    async def get(self, request, short_code):
+        throttled = redirect_throttled(request)
+        if throttled:
+            return throttled
+
+        record = await aresolve_short_url(short_code)
+        if record is None:
+            return JsonResponse({"error": "Short URL not found"}, status=404)
+        if record.get("gone"):
+            return JsonResponse({"error": "Short URL has expired"}, status=410)
+
+        record_click(short_code, **click_details(request))
+        return redirect(record["original_url"])
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint, summed over all workers sharing METRICS_DIR.
+    - Requires METRICS_TOKEN (Bearer).
+    - Without a token it is only served with DEBUG on, never publicly.
+    """
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if not settings.METRICS_ENABLED or not (token or settings.DEBUG):
+            raise Http404
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return HttpResponse(status=401)
+        return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
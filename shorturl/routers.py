@@ -0,0 +1,79 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DB = "default"
+
+# True while the current request (or block) must read from the primary.
+_use_primary = ContextVar("use_primary", default=False)
+
+
+def replica_aliases():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin_primary():
+    """
+    Send this request's remaining reads to the primary.
+    """
+    _use_primary.set(True)
+
+
+def is_pinned():
+    return _use_primary.get()
+
+
+@contextmanager
+def use_primary():
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def read_database():
+    """
+    Where a read of shorturl data goes: a random replica, or the primary
+    while pinned or without replicas.
+    """
+    replicas = replica_aliases()
+    if not replicas or _use_primary.get():
+        return PRIMARY_DB
+    return random.choice(replicas)
+
+
+def primary_pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+class ReplicaRouter:
+    """
+    Reads of shorturl models go to a random replica; everything else,
+    and every read made while pinned, goes to the primary.
+
+    - Auth, sessions and token blacklist reads stay on the primary, so a
+      lagging replica can never undo a logout or hide a new account.
+    - Replicas are physical copies: migrations only run on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != "shorturl":
+            return PRIMARY_DB
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DB, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,21 @@
+"""
+OpenAPI extensions. Only schema generation imports this module (through
+the PREPROCESSING_HOOKS setting), so request-serving workers never load
+drf-spectacular's contrib extensions for it.
+"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class JWTAuthenticationScheme(SimpleJWTScheme):
+    """
+    OpenAPI bearer scheme: drf-spectacular matches simplejwt's class
+    exactly, so our subclass needs its own extension.
+    """
+    target_class = "shorturl.authentication.JWTAuthentication"
+
+
+def register_extensions(endpoints, **kwargs):
+    """
+    Preprocessing hook; importing it is what registers the extensions above.
+    """
+    return endpoints
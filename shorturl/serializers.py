@@ -28,7 +28,42 @@ class ShortURLSerializer(serializers.ModelSerializer):
         max_length=10,
         write_only=True,
     )
+    max_clicks = serializers.IntegerField(min_value=1, required=False, allow_null=True, write_only=True)
     class Meta:
         model = ShortURL
-        fields = ["short_code", "original_url", "custom_alias"]
-        read_only_fields = ["short_code"]
\ No newline at end of file
+        fields = ["short_code", "original_url", "custom_alias", "expires_at", "max_clicks"]
+        read_only_fields = ["short_code"]
+        extra_kwargs = {
+            "expires_at": {"write_only": True},
+        }
+
+
+def short_url_data(obj):
+    """
+    Output of ShortURLSerializer as a plain dict, without DRF field machinery.
+    Accepts a model instance or a .values() row.
+    """
+    if isinstance(obj, dict):
+        return {"short_code": obj["short_code"], "original_url": obj["original_url"]}
+    return {"short_code": obj.short_code, "original_url": obj.original_url}
+
+
+# Columns of a user's own link listing; id/created_at also feed the cursor.
+LINK_FIELDS = ("id", "short_code", "original_url", "click_count", "created_at", "last_accessed_at", "expires_at", "max_clicks")
+
+
+class LinkSerializer(serializers.ModelSerializer):
+    """
+    Shape of link_data(); documents the user's link listing.
+    """
+    class Meta:
+        model = ShortURL
+        fields = [name for name in LINK_FIELDS if name != "id"]
+        read_only_fields = fields
+
+
+def link_data(row):
+    """
+    A .values(*LINK_FIELDS) row as returned by the user's link listing.
+    """
+    return {name: row[name] for name in LINK_FIELDS if name != "id"}
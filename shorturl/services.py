@@ -1,122 +1,636 @@
-import hashlib
-import random
-import string
+import asyncio
+import math
+import re
+import time
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import URLValidator
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.signals import post_save
 from django.utils import timezone
-from django.db import IntegrityError
-from .models import ShortURL
+from django.utils.dateparse import parse_datetime
+from .models import ShortURL, compute_url_hash
+from django.conf import settings
 from django.core.cache import cache
+from .clicks import click_buffer
+from .codegen import get_code_generator, is_generated_code
+from .local_cache import LocalCache
+from .async_cache import async_cache
+from .bloom import code_filter
+from .metrics import metrics
+from .sharding import fan_out, group_by_shard, is_sharded, lookup_aliases, owner_shards
 
 MAX_CODE_LENGTH = 10
+MAX_URL_LENGTH = ShortURL._meta.get_field("original_url").max_length
+BULK_INSERT_BATCH_SIZE = 1000
+RESERVED_ALIAS_ERROR = (
+    "Aliases of exactly 9 letters/digits are reserved for generated codes; "
+    "use another length or add '-' or '_'"
+)
+CONCURRENT_CHANGE_ERROR = "Short URL changed concurrently, please retry"
+
+validate_url = URLValidator()
+# Strict subset of URLValidator: http(s), DNS host name, optional port and path.
+FAST_URL_RE = re.compile(
+    r"^https?://(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}\.?(?::[0-9]{1,5})?(?:[/?#][^\s]*)?\Z",
+    re.IGNORECASE,
+)
 CACHE_TIMEOUT_SECONDS = 60 * 60 * 24
+NEGATIVE_CACHE_TIMEOUT_SECONDS = 30
+# Cached per-user link counts are adjusted in place; the TTL bounds any drift.
+LINK_COUNT_TIMEOUT_SECONDS = 60 * 60
+FILL_LOCK_TIMEOUT_SECONDS = 5
+FILL_WAIT_SECONDS = 0.2
+
+# Cached stand-in for a short code that does not exist.
+MISSING_RECORD = {"original_url": None}
+# Cached stand-in for a link that expired or used up its clicks.
+GONE_RECORD = {"original_url": None, "gone": True}
+# Columns short_url_record() reads.
+RECORD_FIELDS = ("short_code", "original_url", "expires_at", "max_clicks", "click_count")
+
+# Per-worker tier in front of Redis for hot codes. Only positive records are
+# kept here; edits and deletes bump "url:version" so every worker drops it.
+local_url_cache = LocalCache(
+    max_entries=getattr(settings, "LOCAL_URL_CACHE_MAX_ENTRIES", 10_000),
+    ttl=getattr(settings, "LOCAL_URL_CACHE_TTL_SECONDS", 60),
+    version_key="url:version",
+    version_check=getattr(settings, "LOCAL_URL_CACHE_VERSION_CHECK_SECONDS", 1),
+)
+
+
+def url_cache_key(short_code):
+    return f"url:{short_code}"
+
+def click_limit_key(short_code):
+    return f"clicks:{short_code}"
+
+def is_gone(short_obj):
+    if short_obj.expires_at and short_obj.expires_at <= timezone.now():
+        return True
+    return bool(short_obj.max_clicks) and short_obj.click_count >= short_obj.max_clicks
+
+def short_url_record(short_obj):
+    """
+    Everything the redirect path needs, so a cache hit never touches the DB.
+    - expires_at is a Unix timestamp, checked on every hit.
+    """
+    if is_gone(short_obj):
+        return GONE_RECORD
+    record = {"original_url": short_obj.original_url}
+    if short_obj.expires_at:
+        record["expires_at"] = short_obj.expires_at.timestamp()
+    if short_obj.max_clicks:
+        record["max_clicks"] = short_obj.max_clicks
+    return record
+
+def record_timeout(record):
+    """
+    Cache TTL: the default, or the link's remaining lifetime if shorter.
+    """
+    expires_at = record.get("expires_at")
+    if not expires_at:
+        return CACHE_TIMEOUT_SECONDS
+    return max(1, min(CACHE_TIMEOUT_SECONDS, math.ceil(expires_at - time.time())))
+
+def is_expired(record):
+    expires_at = record.get("expires_at")
+    return bool(expires_at) and expires_at <= time.time()
 
-def cache_short_url(short_code, url):
-    cache_key = f"url:{short_code}"
-    cache.set(cache_key, url, timeout=CACHE_TIMEOUT_SECONDS)
+def cache_short_url(short_obj):
+    record = short_url_record(short_obj)
+    timeout = record_timeout(record)
+    cache.set(url_cache_key(short_obj.short_code), record, timeout=timeout)
+    if record["original_url"]:
+        local_url_cache.set(short_obj.short_code, record, ttl=min(local_url_cache.ttl, timeout))
+    return record
+
+def cache_short_urls(short_objs):
+    """
+    Cache many records at once (bulk_create does not fire post_save).
+    Records are grouped by TTL, so links without expiry take one set_many.
+    """
+    by_timeout = {}
+    for obj in short_objs:
+        record = short_url_record(obj)
+        by_timeout.setdefault(record_timeout(record), {})[url_cache_key(obj.short_code)] = record
+    for timeout, records in by_timeout.items():
+        # django-redis pipelines this as SET ... EX, one round trip per TTL.
+        cache.set_many(records, timeout=timeout)
+    return sum(len(records) for records in by_timeout.values())
+
+def cache_missing_short_url(short_code):
+    cache.set(url_cache_key(short_code), MISSING_RECORD, timeout=NEGATIVE_CACHE_TIMEOUT_SECONDS)
+
+def forget_missing_short_urls(short_codes):
+    """
+    Drop cached misses for codes inserted without post_save (bulk_create),
+    in one round trip; only the shared cache holds misses.
+    """
+    keys = [url_cache_key(code) for code in short_codes]
+    if keys:
+        cache.delete_many(keys)
 
 def get_cached_url(short_code):
-    cache_key = f"url:{short_code}"
-    return cache.get(cache_key)
+    """
+    Returns (record or None, log_values): the code filter's delta log
+    position comes from the same round trip as the record, so a miss the
+    filter rejects costs one cache round trip (None if it was not fetched).
+    """
+    record = local_url_cache.get(short_code)
+    if record is not None:
+        metrics.inc("shorturl_cache_lookups_total", tier="local", result="hit")
+        return record, None
+
+    key = url_cache_key(short_code)
+    log_keys = code_filter.log_keys(short_code)
+    values = cache.get_many([key, *log_keys])
+    record = values.pop(key, None)
+    metrics.inc("shorturl_cache_lookups_total", tier="redis", result="miss" if record is None else "hit")
+    if isinstance(record, str):
+        # Entries written before records were cached as dicts.
+        record = {"original_url": record}
+    if record and record["original_url"]:
+        local_url_cache.set(short_code, record)
+    return record, values if log_keys else None
 
 def invalidate_cache(short_code):
-    cache_key = f"url:{short_code}"
-    cache.delete(cache_key)
+    invalidate_caches([short_code])
+
+def invalidate_caches(short_codes):
+    """
+    Forget many codes with one cache round trip and one version bump.
+    """
+    short_codes = list(short_codes)
+    cache.delete_many([key for code in short_codes for key in (url_cache_key(code), click_limit_key(code))])
+    for short_code in short_codes:
+        local_url_cache.delete(short_code)
+    local_url_cache.bump_version()
+
+def link_count_key(user_id):
+    return f"links:count:{user_id}"
+
+def user_link_count(user_id):
+    """
+    Number of links a user owns, without a COUNT(*) per request.
+    """
+    key = link_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = sum(qs.count() for qs in fan_out(ShortURL.objects.filter(user_id=user_id)))
+        cache.add(key, count, timeout=LINK_COUNT_TIMEOUT_SECONDS)
+    return count
+
+def adjust_link_count(user_id, delta):
+    try:
+        cache.incr(link_count_key(user_id), delta)
+    except ValueError:
+        pass  # Not cached: the next read counts.
+
+def forget_link_counts(user_ids):
+    cache.delete_many([link_count_key(user_id) for user_id in user_ids])
+
+def load_short_url(short_code):
+    """
+    Read one code from the DB and cache the result, positive or negative.
+    """
+    metrics.inc("shorturl_cache_fills_total")
+    # A replica may not have the row yet, and mid-rebalance it may still sit
+    # on its old shard: never cache a miss before asking every candidate.
+    for alias in lookup_aliases(short_code):
+        short_obj = ShortURL.objects.using(alias).filter(short_code=short_code).only(*RECORD_FIELDS).first()
+        if short_obj is not None:
+            break
+    if short_obj is None:
+        cache_missing_short_url(short_code)
+        return MISSING_RECORD
+    return cache_short_url(short_obj)
+
+def fill_short_url(short_code):
+    """
+    Single-flight cache fill: only the worker that wins the fill lock queries
+    the DB; the others wait briefly for its result instead of piling onto
+    Postgres (e.g. right after a Redis restart).
+    """
+    lock_key = f"lock:{url_cache_key(short_code)}"
+    if cache.add(lock_key, 1, timeout=FILL_LOCK_TIMEOUT_SECONDS):
+        try:
+            return load_short_url(short_code)
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + FILL_WAIT_SECONDS
+    delay = 0.005
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        record = cache.get(url_cache_key(short_code))
+        if record is not None:
+            return record
+        delay = min(delay * 2, 0.05)
+    return load_short_url(short_code)
+
+def used_clicks(short_code):
+    """
+    Clicks a link has used up: its DB count (the higher one mid-rebalance)
+    plus the clicks this worker has not flushed yet. Other workers' unflushed
+    clicks are at most one flush interval old.
+    """
+    counts = [
+        ShortURL.objects.using(alias).filter(short_code=short_code).values_list("click_count", flat=True).first() or 0
+        for alias in owner_shards(short_code)
+    ]
+    return max(counts) + click_buffer.pending_clicks(short_code)
+
+def claim_click(short_code, record):
+    """
+    Count one click against max_clicks in a shared cache counter.
+    Returns False once the limit is used up.
+    - One INCR while the counter exists; an existing counter is never re-seeded.
+    - A missing one (first click, expired or evicted) is seeded from
+      used_clicks(), not from the cached record, whose count lags the DB.
+    """
+    key = click_limit_key(short_code)
+    try:
+        clicks = cache.incr(key)
+    except ValueError:
+        cache.add(key, used_clicks(short_code), timeout=record_timeout(record))
+        clicks = cache.incr(key)
+    return clicks <= record["max_clicks"]
+
+def resolve_short_url(short_code):
+    """
+    Look up the redirect record for a short code.
+    - Cache hit: no SQL at all.
+    - Misses are filled by one worker at a time.
+    - Unknown codes are negatively cached for a short while.
+    - Cache misses the short code filter rules out return None without SQL,
+      in a single cache round trip.
+    - Returns None if the code does not exist, GONE_RECORD if it expired
+      or used up its clicks.
+    """
+    record, log_values = get_cached_url(short_code)
+    if record is None:
+        if code_filter.rejects(short_code, log_values):
+            metrics.inc("shorturl_code_filter_rejects_total")
+            return None
+        record = fill_short_url(short_code)
+
+    if not record["original_url"]:
+        return GONE_RECORD if record.get("gone") else None
+    if is_expired(record):
+        return GONE_RECORD
+    if record.get("max_clicks") and not claim_click(short_code, record):
+        return GONE_RECORD
+    return record
+
+
+async def aget_cached_url(short_code):
+    record = await local_url_cache.aget(short_code)
+    if record is not None:
+        metrics.inc("shorturl_cache_lookups_total", tier="local", result="hit")
+        return record, None
+
+    key = url_cache_key(short_code)
+    log_keys = code_filter.log_keys(short_code)
+    values = await async_cache.get_many([key, *log_keys])
+    record = values.pop(key, None)
+    metrics.inc("shorturl_cache_lookups_total", tier="redis", result="miss" if record is None else "hit")
+    if isinstance(record, str):
+        record = {"original_url": record}
+    if record and record["original_url"]:
+        local_url_cache.set(short_code, record)
+    return record, values if log_keys else None
+
+async def aload_short_url(short_code):
+    metrics.inc("shorturl_cache_fills_total")
+    for alias in lookup_aliases(short_code):
+        short_obj = await ShortURL.objects.using(alias).filter(short_code=short_code).only(*RECORD_FIELDS).afirst()
+        if short_obj is not None:
+            break
+    if short_obj is None:
+        await async_cache.set(url_cache_key(short_code), MISSING_RECORD, timeout=NEGATIVE_CACHE_TIMEOUT_SECONDS)
+        return MISSING_RECORD
+    record = short_url_record(short_obj)
+    timeout = record_timeout(record)
+    await async_cache.set(url_cache_key(short_code), record, timeout=timeout)
+    if record["original_url"]:
+        local_url_cache.set(short_code, record, ttl=min(local_url_cache.ttl, timeout))
+    return record
+
+async def afill_short_url(short_code):
+    lock_key = f"lock:{url_cache_key(short_code)}"
+    if await async_cache.add(lock_key, 1, timeout=FILL_LOCK_TIMEOUT_SECONDS):
+        try:
+            return await aload_short_url(short_code)
+        finally:
+            await async_cache.delete(lock_key)
+
+    deadline = time.monotonic() + FILL_WAIT_SECONDS
+    delay = 0.005
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        record = await async_cache.get(url_cache_key(short_code))
+        if record is not None:
+            return record
+        delay = min(delay * 2, 0.05)
+    return await aload_short_url(short_code)
+
+async def aused_clicks(short_code):
+    counts = [
+        await ShortURL.objects.using(alias).filter(short_code=short_code).values_list("click_count", flat=True).afirst() or 0
+        for alias in owner_shards(short_code)
+    ]
+    return max(counts) + click_buffer.pending_clicks(short_code)
+
+async def aclaim_click(short_code, record):
+    key = click_limit_key(short_code)
+    try:
+        clicks = await async_cache.incr(key)
+    except ValueError:
+        await async_cache.add(key, await aused_clicks(short_code), timeout=record_timeout(record))
+        clicks = await async_cache.incr(key)
+    return clicks <= record["max_clicks"]
+
+async def aresolve_short_url(short_code):
+    """
+    Async twin of resolve_short_url for the ASGI redirect view.
+    """
+    record, log_values = await aget_cached_url(short_code)
+    if record is None:
+        if await code_filter.arejects(short_code, log_values):
+            metrics.inc("shorturl_code_filter_rejects_total")
+            return None
+        record = await afill_short_url(short_code)
+
+    if not record["original_url"]:
+        return GONE_RECORD if record.get("gone") else None
+    if is_expired(record):
+        return GONE_RECORD
+    if record.get("max_clicks") and not await aclaim_click(short_code, record):
+        return GONE_RECORD
+    return record
 
 
 def generate_short_code(original_url: str) -> str:
     """
-    Generate short code:
+    Generate short code with the configured SHORT_CODE_GENERATOR:
     - ≤10 characters
-    - deterministic base for idempotent behavior
-    - random fallback part for collision resistance
+    - unique by construction, no retry needed
     """
-    base_hash = hashlib.sha256(original_url.encode()).hexdigest()[:8]
-    rand = ''.join(random.choices(string.ascii_letters + string.digits, k=2))
-    return (base_hash + rand)[:MAX_CODE_LENGTH]
+    return get_code_generator().next_code(original_url)
 
-def get_or_create_short_url(original_url: str, user, custom_alias: str | None = None):
+def _insert_ignoring_conflicts(obj):
     """
-    - Idempotent per-user for same URL.
-    - Optional custom alias (with collision checks).
-    - Retries on collisions for generated codes.
+    INSERT ... ON CONFLICT DO NOTHING RETURNING id, in one round trip.
+    Returns True (and fills obj.pk) if the row was inserted, False if any
+    unique constraint already had a matching row.
     """
-    existing = ShortURL.objects.filter(original_url=original_url, user=user).first()
-    if existing:
-        if not custom_alias or existing.short_code == custom_alias:
-            return existing, False
+    meta = obj._meta
+    connection = connections[router.db_for_write(type(obj), instance=obj)]
+    quote = connection.ops.quote_name
+    fields = [f for f in meta.concrete_fields if not f.primary_key]
+    values = [f.get_db_prep_save(f.pre_save(obj, True), connection) for f in fields]
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({', '.join(quote(f.column) for f in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))}) "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, values)
+        row = cursor.fetchone()
+    if row is None:
+        return False
+    obj.pk = row[0]
+    obj._state.adding = False
+    obj._state.db = connection.alias
+    return True
 
+
+def get_or_create_short_url(original_url: str, user, custom_alias: str | None = None, expires_at=None, max_clicks=None):
+    """
+    - Idempotent per-user for same URL (an existing link keeps its limits).
+    - Optional custom alias (with collision checks).
+    - Generated codes never collide.
+    - One INSERT ... ON CONFLICT DO NOTHING; a single SELECT only on conflict,
+      so concurrent calls never surface an IntegrityError.
+    """
     if custom_alias:
         custom_alias = custom_alias.strip()
         if len(custom_alias) > MAX_CODE_LENGTH:
             raise ValueError("Custom alias too long (max 10 chars)")
+        if is_generated_code(custom_alias):
+            raise ValueError(RESERVED_ALIAS_ERROR)
 
-        alias_obj = ShortURL.objects.filter(short_code=custom_alias).first()
-        if alias_obj:
-            if alias_obj.original_url == original_url and alias_obj.user == user:
-                return alias_obj, False
-            raise ValueError("Custom alias already in use")
-
-        obj = ShortURL.objects.create(
-            original_url=original_url,
-            short_code=custom_alias,
-            user=user,
-        )
-        return obj, True
+    url_hash = compute_url_hash(original_url)
+    if is_sharded():
+        # The (user, url_hash) constraint only covers one shard.
+        existing = find_short_url(user, url_hash)
+        if existing:
+            if not custom_alias or existing.short_code == custom_alias:
+                return existing, False
+            raise ValueError(f"URL already shortened as '{existing.short_code}'")
 
-    short_code = generate_short_code(original_url)
-
-    obj = ShortURL.objects.create(
-        original_url=original_url,
-        short_code=short_code,
+    obj = ShortURL(
         user=user,
+        original_url=original_url,
+        url_hash=url_hash,
+        short_code=custom_alias or generate_short_code(original_url),
+        expires_at=expires_at,
+        max_clicks=max_clicks,
     )
-    return obj, True
+    if _insert_ignoring_conflicts(obj):
+        # Keep cache and other post_save hooks in step with ORM creates.
+        post_save.send(sender=ShortURL, instance=obj, created=True, update_fields=None, raw=False, using=obj._state.db)
+        return obj, True
+
+    # Conflict: this user already shortened the URL, or the alias is taken.
+    lookup = Q(user=user, url_hash=url_hash)
+    if custom_alias:
+        lookup |= Q(short_code=custom_alias)
+    rows = list(ShortURL.objects.using(router.db_for_write(ShortURL, instance=obj)).filter(lookup))
+    existing = next((row for row in rows if row.user_id == user.pk and row.url_hash == url_hash), None)
+    if existing:
+        if not custom_alias or existing.short_code == custom_alias:
+            return existing, False
+        raise ValueError(f"URL already shortened as '{existing.short_code}'")
+    if rows:
+        raise ValueError("Custom alias already in use")
+    # The conflicting row was deleted between the two statements.
+    raise ValueError(CONCURRENT_CHANGE_ERROR)
+
+
+def find_short_url(user, url_hash):
+    for queryset in fan_out(ShortURL.objects.filter(user=user, url_hash=url_hash), primary=True):
+        obj = queryset.first()
+        if obj is not None:
+            return obj
+    return None
+
+
+class InvalidShortenInput(ValueError):
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
 
 
-def get_or_create_short_url_alias(original_url: str, user, custom_alias: str | None = None):
+def is_valid_url(url):
     """
-    - Idempotent per-user for same URL.
-    - Optional custom alias (with collision checks).
-    - Retries on collisions for generated codes.
+    Cheap precompiled check for plain http(s) URLs, which is nearly all of
+    them; anything it does not recognise goes through Django's URLValidator.
+    """
+    if FAST_URL_RE.match(url):
+        return True
+    try:
+        validate_url(url)
+    except DjangoValidationError:
+        return False
+    return True
+
+
+def clean_shorten_item(item):
+    """
+    Validate one shorten payload, returning (original_url, custom_alias, limits)
+    where limits holds the optional expires_at and max_clicks.
+    Replaces the ModelSerializer on the hot path; raises InvalidShortenInput.
     """
-    existing = ShortURL.objects.filter(original_url=original_url, user=user).first()
-    if existing and not custom_alias:
-        return existing, False
+    if not isinstance(item, dict):
+        raise InvalidShortenInput("non_field_errors", "Each item must be an object")
+    original_url = item.get("original_url")
+    if not isinstance(original_url, str) or not original_url.strip():
+        raise InvalidShortenInput("original_url", "This field is required.")
+    original_url = original_url.strip()
+    if len(original_url) > MAX_URL_LENGTH:
+        raise InvalidShortenInput("original_url", f"Ensure this field has no more than {MAX_URL_LENGTH} characters.")
+    if not is_valid_url(original_url):
+        raise InvalidShortenInput("original_url", "Enter a valid URL.")
 
+    custom_alias = item.get("custom_alias") or None
+    if custom_alias is not None:
+        if not isinstance(custom_alias, str):
+            raise InvalidShortenInput("custom_alias", "Not a valid string.")
+        custom_alias = custom_alias.strip() or None
     if custom_alias:
-        custom_alias = custom_alias.strip()
         if len(custom_alias) > MAX_CODE_LENGTH:
-            raise ValueError("Custom alias too long (max 10 chars)")
-        alias_obj = ShortURL.objects.filter(short_code=custom_alias).first()
-        if alias_obj:
-            if alias_obj.original_url == original_url and alias_obj.user == user:
-                return alias_obj, False
-            raise ValueError("Custom alias already in use")
-        obj = ShortURL.objects.create(
-            original_url=original_url,
-            short_code=custom_alias,
-            user=user,
-        )
-        return obj, True
+            raise InvalidShortenInput("custom_alias", "Custom alias too long (max 10 chars)")
+        if is_generated_code(custom_alias):
+            raise InvalidShortenInput("custom_alias", RESERVED_ALIAS_ERROR)
+
+    expires_at = item.get("expires_at") or None
+    if expires_at is not None:
+        try:
+            expires_at = parse_datetime(expires_at) if isinstance(expires_at, str) else None
+        except ValueError:
+            expires_at = None
+        if expires_at is None:
+            raise InvalidShortenInput("expires_at", "Enter a valid ISO 8601 datetime.")
+        if timezone.is_naive(expires_at):
+            expires_at = timezone.make_aware(expires_at, timezone.get_current_timezone())
+        if expires_at <= timezone.now():
+            raise InvalidShortenInput("expires_at", "Must be in the future.")
 
-    for _ in range(5):
-        short_code = generate_short_code(original_url)
+    max_clicks = item.get("max_clicks")
+    if isinstance(max_clicks, str):
+        # Numbers sent as strings ("1000") are accepted, as DRF's IntegerField does.
         try:
-            obj = ShortURL.objects.create(
-                original_url=original_url,
-                short_code=short_code,
-                user=user,
-            )
-            return obj, True
-        except IntegrityError:
+            max_clicks = int(max_clicks) if max_clicks.strip() else None
+        except ValueError:
+            raise InvalidShortenInput("max_clicks", "Must be a positive integer.")
+    if max_clicks is not None and (isinstance(max_clicks, bool) or not isinstance(max_clicks, int) or max_clicks < 1):
+        raise InvalidShortenInput("max_clicks", "Must be a positive integer.")
+    return original_url, custom_alias, {"expires_at": expires_at, "max_clicks": max_clicks}
+
+
+def bulk_get_or_create_short_urls(items, user):
+    """
+    Shorten many URLs for one user with a fixed number of queries:
+    - duplicates in the batch are resolved in memory
+    - existing (user, url_hash) pairs come from one IN query
+    - taken aliases come from one IN query
+    - new rows go in through bulk_create
+    Returns one result dict per input item, in order.
+    """
+    results = [None] * len(items)
+    wanted = {}  # url_hash -> (original_url, custom_alias, [item indexes])
+    limits = {}  # url_hash -> expires_at/max_clicks of the first item
+    for index, item in enumerate(items):
+        try:
+            original_url, custom_alias, item_limits = clean_shorten_item(item)
+        except ValueError as e:
+            results[index] = {"error": str(e)}
             continue
+        url_hash = compute_url_hash(original_url)
+        if url_hash in wanted:
+            _, first_alias, indexes = wanted[url_hash]
+            if custom_alias and custom_alias != first_alias:
+                results[index] = {"original_url": original_url, "error": "Duplicate URL with a different alias"}
+                continue
+            indexes.append(index)
+        else:
+            wanted[url_hash] = (original_url, custom_alias, [index])
+            limits[url_hash] = item_limits
+
+    def resolve(url_hash, **result):
+        original_url, _, indexes = wanted.pop(url_hash)
+        for index in indexes:
+            results[index] = {"original_url": original_url, **result}
+
+    existing = fan_out(ShortURL.objects.filter(user=user, url_hash__in=list(wanted)).only("url_hash", "short_code"), primary=True)
+    for obj in (obj for queryset in existing for obj in queryset):
+        if obj.url_hash not in wanted:
+            continue  # Same URL on two shards; the first one wins.
+        custom_alias = wanted[obj.url_hash][1]
+        if custom_alias and custom_alias != obj.short_code:
+            resolve(obj.url_hash, error=f"URL already shortened as '{obj.short_code}'")
+        else:
+            resolve(obj.url_hash, short_code=obj.short_code, created=False)
+
+    aliases = [(url_hash, alias) for url_hash, (_, alias, _) in wanted.items() if alias]
+    taken = set()
+    for queryset in fan_out(ShortURL.objects.filter(short_code__in=[alias for _, alias in aliases]), primary=True):
+        taken.update(queryset.values_list("short_code", flat=True))
+    for url_hash, alias in aliases:
+        if alias in taken:
+            resolve(url_hash, error="Custom alias already in use")
+        taken.add(alias)
+
+    new_objs = [
+        ShortURL(user=user, original_url=url, url_hash=url_hash, short_code=alias or generate_short_code(url), **limits[url_hash])
+        for url_hash, (url, alias, _) in wanted.items()
+    ]
+    for alias, objs in group_by_shard(new_objs, lambda obj: obj.short_code).items():
+        ShortURL.objects.using(alias).bulk_create(objs, batch_size=BULK_INSERT_BATCH_SIZE, ignore_conflicts=True)
 
-    raise ValueError("Unable to generate unique short code after multiple attempts")
+    # ignore_conflicts hides which rows lost a race, so read the batch back.
+    stored = {}
+    for queryset in fan_out(ShortURL.objects.filter(user=user, url_hash__in=list(wanted)).only("url_hash", *RECORD_FIELDS), primary=True):
+        for obj in queryset:
+            stored.setdefault(obj.url_hash, obj)
+    created = []
+    for obj in new_objs:
+        row = stored.get(obj.url_hash)
+        if row is None and wanted[obj.url_hash][1]:
+            resolve(obj.url_hash, error="Custom alias already in use")
+        elif row is None:
+            # Generated codes never collide, so the user's row for this URL
+            # was deleted between the insert and the read-back.
+            resolve(obj.url_hash, error=CONCURRENT_CHANGE_ERROR, retryable=True)
+        elif row.short_code == obj.short_code:
+            created.append(row)
+            resolve(obj.url_hash, short_code=row.short_code, created=True)
+        else:
+            resolve(obj.url_hash, short_code=row.short_code, created=False)
+    cache_short_urls(created)
+    code_filter.publish(obj.short_code for obj in created)
+    if created:
+        adjust_link_count(user.pk, len(created))
+    return results
 
 
-def record_click(short_url_obj):
+def record_click(short_code, referrer="", country="", user_agent=""):
     """
-    Update metadata whenever redirect occurs
+    Update metadata whenever redirect occurs.
+    Clicks are buffered in-process and flushed to the DB in bulk, together
+    with the click event used for the analytics rollups.
     """
-    short_url_obj.click_count += 1
-    short_url_obj.last_accessed_at = timezone.now()
-    short_url_obj.save(update_fields=["click_count", "last_accessed_at"])
\ No newline at end of file
+    click_buffer.add(short_code, timezone.now(), referrer, country, user_agent)
+    metrics.inc("shorturl_clicks_recorded_total")
\ No newline at end of file
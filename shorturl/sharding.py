@@ -0,0 +1,151 @@
+import hashlib
+import struct
+from bisect import bisect
+from functools import lru_cache
+
+from django.conf import settings
+
+from .routers import PRIMARY_DB, read_database, replica_aliases
+
+# Points per shard on the ring; more points, more even spread.
+RING_POINTS = 128
+
+
+def ring_hash(value):
+    return struct.unpack("<Q", hashlib.blake2b(value.encode(), digest_size=8).digest())[0]
+
+
+class HashRing:
+    """
+    Consistent hashing of short codes onto database aliases.
+
+    Adding a shard to N others only moves about 1/(N+1) of the codes, all
+    of them onto the new shard.
+    """
+
+    def __init__(self, nodes, points=RING_POINTS):
+        ring = sorted((ring_hash(f"{node}:{i}"), node) for node in nodes for i in range(points))
+        self._hashes = [h for h, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def node_for(self, key):
+        index = bisect(self._hashes, ring_hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+@lru_cache(maxsize=8)
+def _ring(nodes):
+    return HashRing(nodes)
+
+
+def shard_aliases():
+    return getattr(settings, "SHORTURL_SHARDS", None) or [PRIMARY_DB]
+
+
+def previous_shard_aliases():
+    """
+    The shard list before the last change, kept while rebalance_shards runs.
+    """
+    return getattr(settings, "SHORTURL_PREVIOUS_SHARDS", None) or []
+
+
+def all_shard_aliases():
+    return list(dict.fromkeys([*shard_aliases(), *previous_shard_aliases()]))
+
+
+def is_sharded():
+    return len(all_shard_aliases()) > 1
+
+
+def shard_for_code(short_code, aliases=None):
+    aliases = aliases or shard_aliases()
+    if len(aliases) == 1:
+        return aliases[0]
+    return _ring(tuple(aliases)).node_for(short_code)
+
+
+def owner_shards(short_code):
+    """
+    The shard that owns a code, then (while rebalancing) the one that used to.
+    """
+    owner = shard_for_code(short_code)
+    previous = previous_shard_aliases()
+    if previous:
+        old_owner = shard_for_code(short_code, previous)
+        if old_owner != owner:
+            return [owner, old_owner]
+    return [owner]
+
+
+def read_alias(alias):
+    # Replicas follow the default database only.
+    return read_database() if alias == PRIMARY_DB else alias
+
+
+def lookup_aliases(short_code):
+    """
+    Databases to try, in order, for one code: a replica of its shard if
+    there is one, then the shard itself, then the previous owner.
+    """
+    owners = owner_shards(short_code)
+    first = read_alias(owners[0])
+    return [first, *(alias for alias in owners if alias != first)]
+
+
+def fan_out(queryset, primary=False):
+    """
+    One queryset per shard. Without sharding the queryset is returned as is,
+    as is a queryset already bound to a database with using().
+    """
+    if queryset._db is not None or not is_sharded():
+        return [queryset.using(PRIMARY_DB) if primary and queryset._db is None else queryset]
+    return [queryset.using(alias if primary else read_alias(alias)) for alias in all_shard_aliases()]
+
+
+def group_by_shard(items, code=lambda item: item):
+    groups = {}
+    for item in items:
+        groups.setdefault(shard_for_code(code(item)), []).append(item)
+    return groups
+
+
+class ShardRouter:
+    """
+    Keeps shorturl rows on the shard that owns their short code.
+
+    - Saving a new ShortURL goes to shard_for_code(short_code); saving or
+      deleting a loaded row, and its related managers, use the database
+      it was read from.
+    - Querysets carry no instance, so code paths pick the shard with
+      using() (see lookup_aliases and fan_out); anything else falls through
+      to ReplicaRouter.
+    - Every shard gets the full schema; on shards other than the default
+      database ShortURL.user has no FK constraint (migration 0012), since
+      users only live on the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_instance(model, hints.get("instance"))
+
+    def db_for_write(self, model, **hints):
+        db = self._db_for_instance(model, hints.get("instance"))
+        return PRIMARY_DB if db in replica_aliases() else db
+
+    def _db_for_instance(self, model, instance):
+        if instance is None or model._meta.app_label != "shorturl" or not is_sharded():
+            return None
+        if instance._state.adding and getattr(instance, "short_code", None):
+            # A new link; its _state.db may just be the database of its user.
+            return shard_for_code(instance.short_code)
+        if instance._meta.app_label == "shorturl":
+            # A row read from a shard, or a new click row attached to one.
+            return instance._state.db
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not is_sharded():
+            return None
+        databases = {PRIMARY_DB, *replica_aliases(), *all_shard_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .bloom import code_filter
+from .models import ShortURL
+from .sharding import all_shard_aliases, is_sharded
+from .services import adjust_link_count, cache_short_url, invalidate_cache, local_url_cache
+from .user_cache import forget_cached_user
+
+CLICK_FIELDS = {"click_count", "last_accessed_at"}
+
+
+@receiver(pre_save, sender=ShortURL)
+def drop_renamed_short_code(sender, instance, update_fields=None, **kwargs):
+    """
+    If an existing link gets a new short code, forget the old one; if it
+    moves to another user, move it between their link counts.
+    """
+    if instance.pk is None or (update_fields and set(update_fields) <= CLICK_FIELDS):
+        return
+    # Ids are per shard: ask the database this row is saved to.
+    db = router.db_for_write(ShortURL, instance=instance)
+    old = ShortURL.objects.using(db).filter(pk=instance.pk).values_list("short_code", "user_id").first()
+    if old is None:
+        return
+    old_code, old_user_id = old
+    if old_code != instance.short_code:
+        invalidate_cache(old_code)
+        new_code = instance.short_code
+        transaction.on_commit(lambda: code_filter.publish([new_code]), using=db)
+    if old_user_id != instance.user_id:
+        adjust_link_count(old_user_id, -1)
+        adjust_link_count(instance.user_id, 1)
+
+
+@receiver(post_save, sender=ShortURL)
+def refresh_cached_short_url(sender, instance, created, using, update_fields=None, **kwargs):
+    """
+    Overwrite the cached record (including a negative entry) after a change,
+    once it is committed: a save that is rolled back is neither cached nor
+    published to the code filters.
+    """
+    if update_fields and set(update_fields) <= CLICK_FIELDS:
+        return
+
+    def refresh():
+        cache_short_url(instance)
+        if created:
+            code_filter.publish([instance.short_code])
+            adjust_link_count(instance.user_id, 1)
+        else:
+            local_url_cache.bump_version()
+
+    transaction.on_commit(refresh, using=using)
+
+
+@receiver(post_delete, sender=ShortURL)
+def forget_deleted_short_url(sender, instance, **kwargs):
+    invalidate_cache(instance.short_code)
+    adjust_link_count(instance.user_id, -1)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def delete_sharded_links(sender, instance, using, **kwargs):
+    """
+    The user's cascade only reaches links on its own database; clear the
+    other shards by hand.
+    """
+    if not is_sharded():
+        return
+    for alias in all_shard_aliases():
+        if alias != using:
+            ShortURL.objects.using(alias).filter(user_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user(sender, instance, **kwargs):
+    """
+    Drop the user cached by JWT authentication (is_active, is_staff, ...).
+    """
+    forget_cached_user(instance.pk)
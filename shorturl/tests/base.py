@@ -0,0 +1,78 @@
+from unittest import mock
+
+import fakeredis
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_redis.pool import ConnectionFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from shorturl.async_cache import async_cache
+from shorturl.bloom import code_filter
+from shorturl.clicks import ClickBuffer, click_buffer
+from shorturl.models import ShortURL
+from shorturl.services import local_url_cache
+from shorturl.ratelimit import redirect_rate_limiter
+from shorturl.user_cache import local_user_cache
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ShortURLTestCase(TestCase):
+    """
+    - Redis is replaced by a per-process locmem cache.
+    - No background threads: clicks are flushed by the test itself and the
+      short code filter is off unless a test turns it on.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for patcher in (
+            mock.patch.object(ClickBuffer, "_ensure_flusher"),
+            mock.patch.object(code_filter, "enabled", False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        cache.clear()
+        local_url_cache.clear()
+        local_user_cache.clear()
+        click_buffer.drain()
+        redirect_rate_limiter._buckets.clear()
+        self.addCleanup(click_buffer.drain)
+
+    def create_user(self, username="alice", **kwargs):
+        return get_user_model().objects.create_user(username=username, password="pw-12345678", **kwargs)
+
+    def authenticate(self, user):
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+
+    def create_link(self, user, short_code, original_url=None, **kwargs):
+        original_url = original_url or f"https://example.com/{short_code}"
+        return ShortURL.objects.create(user=user, short_code=short_code, original_url=original_url, **kwargs)
+
+
+class FakeRedisTestCase(ShortURLTestCase):
+    """
+    For code that only runs against Redis: django-redis and AsyncCache's
+    redis.asyncio client share one in-process fakeredis server (Lua through
+    lupa).
+    """
+
+    def setUp(self):
+        self.redis_server = fakeredis.FakeServer()
+        override = override_settings(CACHES={"default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://fakeredis:6379/0",
+            "OPTIONS": {"CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeConnection, "server": self.redis_server}},
+        }})
+        override.enable()
+        self.addCleanup(override.disable)
+        for patcher in (
+            # django-redis keeps its pools per URL for the whole process.
+            mock.patch.object(ConnectionFactory, "_pools", {}),
+            mock.patch.object(async_cache, "_client", lambda: fakeredis.aioredis.FakeRedis(server=self.redis_server)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        super().setUp()
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from shorturl.clicks import ClickBuffer
+
+from .base import ShortURLTestCase
+
+
+def at(day, hour=12):
+    return datetime(2025, 11, day, hour, tzinfo=dt_timezone.utc)
+
+
+class AnalyticsTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.link = self.create_link(self.user, "abc")
+        buffer = ClickBuffer()
+        buffer.add("abc", when=at(1, 9), referrer="t.co", country="IN", user_agent="chrome")
+        buffer.add("abc", when=at(1, 10), referrer="t.co", country="IN", user_agent="chrome")
+        buffer.add("abc", when=at(2, 10), country="US", user_agent="firefox")
+        buffer.flush()
+        self.authenticate(self.user)
+
+    def get(self, **params):
+        return self.client.get("/api/analytics/abc/", params)
+
+    def test_daily_timeseries_and_breakdowns(self):
+        data = self.get(start="2025-11-01", end="2025-11-02").json()
+
+        self.assertEqual(data["click_count"], 3)
+        self.assertEqual(data["clicks"], 3)
+        self.assertEqual([point["count"] for point in data["timeseries"]], [2, 1])
+        self.assertEqual(data["breakdowns"]["country"], [{"value": "IN", "count": 2}, {"value": "US", "count": 1}])
+        self.assertIn({"value": "unknown", "count": 1}, data["breakdowns"]["referrer"])
+
+    def test_hourly_timeseries_is_limited_to_the_range(self):
+        data = self.get(start="2025-11-01T10:00:00Z", end="2025-11-01T11:00:00Z", granularity="hour").json()
+
+        self.assertEqual(data["timeseries"], [{"bucket": "2025-11-01T10:00:00Z", "count": 1}])
+
+    def test_reads_rollups_not_raw_events(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get(start="2025-11-01", end="2025-11-30")
+
+        self.assertFalse([q for q in context.captured_queries if "shorturl_clickevent" in q["sql"]])
+
+    def test_invalid_ranges_are_rejected(self):
+        for params in ({"granularity": "week"}, {"start": "2025-11-05", "end": "2025-11-01"}, {"start": "yesterday"},
+                       {"start": "2025-01-01", "end": "2025-11-01", "granularity": "hour"}):
+            self.assertEqual(self.get(**params).status_code, 400, params)
+
+    def test_other_users_links_are_hidden(self):
+        self.authenticate(self.create_user("bob"))
+
+        self.assertEqual(self.get().status_code, 404)
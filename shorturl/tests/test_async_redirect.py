@@ -0,0 +1,96 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, override_settings
+
+from shorturl.async_cache import AsyncCache, async_cache
+from shorturl.clicks import click_buffer
+from shorturl.redirect_views import AsyncRedirectURLView
+from shorturl.services import MISSING_RECORD, local_url_cache, url_cache_key
+
+from .base import FakeRedisTestCase, ShortURLTestCase
+
+
+class AsyncRedirectTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.view = AsyncRedirectURLView.as_view()
+        self.factory = AsyncRequestFactory()
+
+    async def get(self, short_code):
+        return await self.view(self.factory.get(f"/api/redirect/{short_code}/"), short_code=short_code)
+
+    async def test_redirects_and_buffers_the_click(self):
+        await sync_to_async(self.create_link)(self.user, "abc", "https://example.com/async")
+        local_url_cache.clear()
+
+        response = await self.get("abc")
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "https://example.com/async")
+        pending, _ = click_buffer.drain()
+        self.assertEqual(pending["abc"][0], 1)
+
+    async def test_unknown_code_is_404(self):
+        self.assertEqual((await self.get("nope")).status_code, 404)
+        self.assertEqual((await self.get("nope")).status_code, 404)
+
+    def test_uses_redis_asyncio_with_django_redis(self):
+        redis_cache = {"default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": "redis://localhost:6379/0"}}
+        async_cache = AsyncCache()
+
+        self.assertFalse(async_cache.is_redis)
+        with override_settings(CACHES=redis_cache):
+            self.assertTrue(async_cache.is_redis)
+
+
+class AsyncCacheRedisTests(FakeRedisTestCase):
+    """
+    AsyncCache's redis.asyncio path, sharing entries with django-redis.
+    """
+
+    async def test_get_reads_what_django_redis_wrote(self):
+        cache.set("record", {"original_url": "https://example.com"})
+        cache.set("count", 7)
+
+        self.assertTrue(async_cache.is_redis)
+        self.assertEqual(await async_cache.get("record"), {"original_url": "https://example.com"})
+        self.assertEqual(await async_cache.get("count"), 7)
+
+    async def test_get_many_skips_missing_keys(self):
+        cache.set("a", 1)
+        cache.set("c", {"x": 3})
+
+        self.assertEqual(await async_cache.get_many(["a", "b", "c"]), {"a": 1, "c": {"x": 3}})
+        self.assertEqual(await async_cache.get_many(["b"]), {})
+
+    async def test_miss_returns_the_default(self):
+        self.assertIsNone(await async_cache.get("nope"))
+        self.assertEqual(await async_cache.get("nope", "fallback"), "fallback")
+
+    async def test_writes_are_visible_to_django_redis(self):
+        await async_cache.set("a", {"x": 1}, timeout=60)
+        self.assertTrue(await async_cache.add("n", 1, timeout=60))
+        self.assertFalse(await async_cache.add("n", 5, timeout=60))
+        self.assertEqual(await async_cache.incr("n"), 2)
+        await async_cache.delete("a")
+
+        self.assertEqual(cache.get_many(["a", "n"]), {"n": 2})
+        with self.assertRaises(ValueError):
+            await async_cache.incr("missing")
+
+    async def test_redirect_fills_and_negatively_caches_through_redis(self):
+        view = AsyncRedirectURLView.as_view()
+        factory = AsyncRequestFactory()
+        user = await sync_to_async(self.create_user)()
+        await sync_to_async(self.create_link)(user, "abc", "https://example.com/async")
+        cache.delete(url_cache_key("abc"))
+        local_url_cache.clear()
+
+        found = await view(factory.get("/api/redirect/abc/"), short_code="abc")
+        missing = await view(factory.get("/api/redirect/nope/"), short_code="nope")
+
+        self.assertEqual((found.status_code, found["Location"]), (302, "https://example.com/async"))
+        self.assertEqual(cache.get(url_cache_key("abc"))["original_url"], "https://example.com/async")
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(cache.get(url_cache_key("nope")), MISSING_RECORD)
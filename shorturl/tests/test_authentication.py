@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from drf_spectacular.drainage import GENERATOR_STATS
+from drf_spectacular.generators import SchemaGenerator
+
+from shorturl.user_cache import local_user_cache
+
+from .base import ShortURLTestCase
+
+
+class JWTAuthenticationTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def login(self):
+        response = self.client.post(
+            "/api/auth/login/", {"username": "alice", "password": "pw-12345678"}, content_type="application/json",
+        )
+        tokens = response.json()
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {tokens['access']}"
+        return tokens
+
+    def test_cached_user_needs_no_sql(self):
+        self.authenticate(self.user)
+        self.client.get("/api/links/")
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get("/api/links/").status_code, 200)
+
+        self.assertFalse([q for q in context.captured_queries if "auth_user" in q["sql"]])
+
+    def test_logout_revokes_the_access_token_at_once(self):
+        tokens = self.login()
+        self.assertEqual(self.client.get("/api/links/").status_code, 200)
+
+        response = self.client.post("/api/auth/logout/", {"refresh": tokens["refresh"]}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get("/api/links/").status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate(self.user)
+        self.client.get("/api/links/")
+
+        self.user.is_active = False
+        self.user.save()
+        local_user_cache.clear()  # Another worker, or AUTH_USER_LOCAL_CACHE_SECONDS later.
+
+        self.assertEqual(self.client.get("/api/links/").status_code, 401)
+
+    def test_schema_documents_the_bearer_scheme(self):
+        with GENERATOR_STATS.silence():
+            schema = SchemaGenerator().get_schema(request=None, public=True)
+
+        self.assertEqual(
+            schema["components"]["securitySchemes"]["jwtAuth"],
+            {"type": "http", "scheme": "bearer", "bearerFormat": "JWT"},
+        )
+        self.assertIn({"jwtAuth": []}, schema["paths"]["/api/shorten/"]["post"]["security"])
+
+
+class SchemaExtensionImportTests(SimpleTestCase):
+    def test_authentication_does_not_load_openapi_extensions(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "urlshortener.settings"}
+        env.setdefault("SECRET_KEY", settings.SECRET_KEY)
+        code = (
+            "import sys, django; django.setup(); import shorturl.authentication; "
+            "print(sorted(name for name in sys.modules if name.startswith(('drf_spectacular.contrib', 'shorturl.schema'))))"
+        )
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+
+        self.assertEqual(result.stdout.strip().splitlines()[-1:], ["[]"], result.stderr)
@@ -0,0 +1,49 @@
+import json
+from collections import Counter
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from rest_framework.views import APIView
+
+from shorturl.models import ShortURL
+from shorturl.ratelimit import redirect_rate_limiter
+
+from .base import ShortURLTestCase
+
+
+class BenchmarkTests(ShortURLTestCase):
+    def bench(self, *args):
+        out = StringIO()
+        call_command("benchmark", "--requests", "30", "--warmup", "5", "--links", "20", "--json", *args, stdout=out)
+        return json.loads(out.getvalue())
+
+    def test_reports_every_endpoint_and_cleans_up(self):
+        report = self.bench()
+
+        self.assertEqual(report["requests"], 30)
+        self.assertIn("redirect", report["endpoints"])
+        self.assertFalse(get_user_model().objects.filter(username="benchmark").exists())
+        self.assertFalse(ShortURL.objects.exists())
+
+    def test_rate_limits_are_off_for_the_run(self):
+        throttle_classes = APIView.throttle_classes
+        # Well past the test settings' 20/min per IP and the redirect burst.
+        report = self.bench("--mix", "redirect=1,shorten=1,analytics=1", "--requests", "300", "--missing", "0")
+
+        statuses = Counter()
+        for stats in report["endpoints"].values():
+            statuses.update(stats["status"])
+        self.assertNotIn("429", statuses)
+        self.assertEqual(APIView.throttle_classes, throttle_classes)
+        self.assertTrue(redirect_rate_limiter.rate)
+
+    def test_never_deletes_an_existing_user(self):
+        user = self.create_user("benchmark")
+        self.create_link(user, "real")
+
+        with self.assertRaises(CommandError):
+            self.bench()
+        self.bench("--keep")
+
+        self.assertTrue(ShortURL.objects.filter(short_code="real").exists())
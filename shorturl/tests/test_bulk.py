@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from shorturl.codegen import get_code_generator
+from shorturl.models import ShortURL
+
+from .base import ShortURLTestCase
+
+
+class BulkShortenTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.authenticate(self.user)
+
+    def post(self, items, content_type="application/json"):
+        body = json.dumps(items) if content_type == "application/json" else items
+        return self.client.post("/api/shorten/bulk/", body, content_type=content_type)
+
+    def test_creates_new_links_and_reuses_existing_ones(self):
+        existing = self.create_link(self.user, "old", "https://example.com/old")
+
+        response = self.post([
+            {"original_url": "https://example.com/a"},
+            {"original_url": "https://example.com/old"},
+            {"original_url": "https://example.com/b", "custom_alias": "mine"},
+            {"original_url": "https://example.com/a"},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertTrue(results[0]["created"])
+        self.assertEqual(results[1], {"original_url": "https://example.com/old", "short_code": existing.short_code, "created": False})
+        self.assertEqual(results[2]["short_code"], "mine")
+        self.assertEqual(results[3]["short_code"], results[0]["short_code"])
+        self.assertEqual(ShortURL.objects.filter(user=self.user).count(), 3)
+
+    def test_reports_errors_per_item(self):
+        self.create_link(self.create_user("bob"), "taken")
+
+        results = self.post([
+            {"original_url": "not a url"},
+            {"original_url": "https://example.com/x", "custom_alias": "taken"},
+            {"original_url": "https://example.com/y"},
+        ]).json()["results"]
+
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["error"], "Custom alias already in use")
+        self.assertTrue(results[2]["created"])
+
+    def test_rows_missing_after_the_insert_are_told_apart(self):
+        # As if each row was deleted again before the batch was read back.
+        with mock.patch("django.db.models.query.QuerySet.bulk_create", return_value=[]):
+            results = self.post([
+                {"original_url": "https://example.com/x", "custom_alias": "mine"},
+                {"original_url": "https://example.com/y"},
+            ]).json()["results"]
+
+        self.assertEqual(results[0], {"original_url": "https://example.com/x", "error": "Custom alias already in use"})
+        self.assertEqual(results[1], {
+            "original_url": "https://example.com/y",
+            "error": "Short URL changed concurrently, please retry",
+            "retryable": True,
+        })
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        def queries_for(n, start):
+            items = [{"original_url": f"https://example.com/{i}"} for i in range(start, start + n)]
+            with CaptureQueriesContext(connection) as context:
+                self.post(items)
+            return len(context.captured_queries)
+
+        # One fresh block for every code below: a refill would land in either batch.
+        generator = get_code_generator()
+        with mock.patch.object(generator, "block_size", 1000), mock.patch.object(generator, "_block", []):
+            self.post([{"original_url": "https://example.com/warmup"}])
+            self.assertEqual(queries_for(5, 0), queries_for(50, 100))
+
+    def test_accepts_ndjson(self):
+        body = '{"original_url": "https://example.com/1"}\n{"original_url": "https://example.com/2"}\n'
+
+        response = self.post(body, content_type="application/x-ndjson")
+
+        self.assertEqual([r["created"] for r in response.json()["results"]], [True, True])
+
+    @override_settings(BULK_SHORTEN_MAX_ITEMS=2)
+    def test_rejects_oversized_batches(self):
+        response = self.post([{"original_url": f"https://example.com/{i}"} for i in range(3)])
+
+        self.assertEqual(response.status_code, 400)
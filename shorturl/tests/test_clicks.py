@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from shorturl.clicks import ClickBuffer, click_buffer
+from shorturl.models import ClickEvent, ClickRollup
+
+from .base import ShortURLTestCase
+
+
+class ClickBufferTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.link = self.create_link(self.user, "abc")
+
+    def test_redirect_buffers_the_click_instead_of_writing_it(self):
+        response = self.client.get("/api/redirect/abc/", HTTP_REFERER="https://news.example.org/post")
+
+        self.assertEqual(response.status_code, 302)
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.click_count, 0)
+        self.assertFalse(ClickEvent.objects.exists())
+
+        self.assertEqual(click_buffer.flush(), 1)
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.click_count, 1)
+        self.assertIsNotNone(self.link.last_accessed_at)
+        event = ClickEvent.objects.get()
+        self.assertEqual(event.referrer, "news.example.org")
+
+    def test_flush_applies_all_counts_at_once(self):
+        other = self.create_link(self.user, "def")
+        buffer = ClickBuffer()
+        for _ in range(3):
+            buffer.add("abc")
+        buffer.add("def")
+
+        self.assertEqual(buffer.flush(), 2)
+
+        self.link.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.link.click_count, other.click_count), (3, 1))
+        self.assertEqual(ClickEvent.objects.count(), 4)
+        self.assertEqual(buffer.drain(), ({}, []))
+
+    def test_flush_keeps_the_latest_access_time(self):
+        later = timezone.now()
+        self.link.last_accessed_at = later
+        self.link.save()
+        buffer = ClickBuffer()
+        buffer.add("abc", when=later - timedelta(hours=1))
+        buffer.flush()
+
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.last_accessed_at, later)
+
+    def test_rollups_count_totals_and_breakdowns(self):
+        buffer = ClickBuffer()
+        buffer.add("abc", country="de", user_agent="chrome")
+        buffer.add("abc", country="DE", user_agent="chrome")
+        buffer.add("abc", country="FR", user_agent="firefox")
+        buffer.flush()
+        buffer.add("abc", country="FR", user_agent="firefox")
+        buffer.flush()
+
+        rollups = ClickRollup.objects.filter(short_url=self.link)
+        self.assertEqual(rollups.get(granularity=ClickRollup.DAY, dimension="").count, 4)
+        self.assertEqual(rollups.get(granularity=ClickRollup.HOUR, dimension="").count, 4)
+        self.assertEqual(rollups.get(dimension="country", value="FR").count, 2)
+        self.assertEqual(rollups.get(dimension="user_agent", value="chrome").count, 2)
+
+    def test_failed_flush_puts_the_clicks_back(self):
+        buffer = ClickBuffer()
+        buffer.add("abc")
+        with self.assertRaises(RuntimeError):
+            with mock.patch("shorturl.clicks.apply_clicks", side_effect=RuntimeError("db down")):
+                buffer.flush()
+
+        pending, events = buffer.drain()
+        self.assertEqual(pending["abc"][0], 1)
+        self.assertEqual(len(events), 1)
+
+    def test_flusher_logs_failures_and_recycles_connections(self):
+        buffer = ClickBuffer()
+        buffer.add("abc")
+        # The test's own connection must survive; only check the calls.
+        with (
+            mock.patch("shorturl.clicks.close_old_connections") as close_old,
+            mock.patch("shorturl.clicks.connections") as connections,
+            mock.patch("shorturl.clicks.metrics") as metrics,
+            mock.patch("shorturl.clicks.apply_clicks", side_effect=RuntimeError("db down")),
+            self.assertLogs("shorturl.clicks", "ERROR"),
+        ):
+            buffer._flush_quietly()
+
+        close_old.assert_called_once_with()
+        connections.close_all.assert_called_once_with()
+        metrics.inc.assert_called_once_with("shorturl_click_flush_failures_total")
+        self.assertEqual(buffer.drain()[0]["abc"][0], 1)
+
+        with mock.patch("shorturl.clicks.close_old_connections"), mock.patch("shorturl.clicks.connections") as connections:
+            buffer.add("abc")
+            buffer._flush_quietly()
+        connections.close_all.assert_called_once_with()
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.click_count, 1)
@@ -0,0 +1,138 @@
+import os
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+
+from shorturl.async_cache import async_cache
+from shorturl.bloom import EPOCH_KEY, LOG_KEYS, SEQ_KEY, BloomFilter, CodeFilter, code_filter
+from shorturl.services import aresolve_short_url, local_url_cache, resolve_short_url, url_cache_key
+
+from .base import ShortURLTestCase
+
+
+class CodeFilterTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        for patcher in (
+            mock.patch.object(code_filter, "enabled", True),
+            mock.patch.object(code_filter, "min_capacity", 1_000),
+            mock.patch.object(code_filter, "_ensure_started"),
+            mock.patch.object(code_filter, "_filter", None),
+            mock.patch.object(code_filter, "_seq", 0),
+            mock.patch.object(code_filter, "_epoch", ""),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = self.create_user()
+
+    def publish_from_another_worker(self, short_code):
+        other = CodeFilter()
+        other.enabled = True
+        other.publish([short_code])
+
+    def forget_cached(self, short_code):
+        cache.delete(url_cache_key(short_code))
+        local_url_cache.clear()
+
+    def test_unknown_code_is_rejected_without_sql(self):
+        self.create_link(self.user, "abc")
+        code_filter.load()
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolve_short_url("nope"))
+        self.assertIsNone(async_to_sync(aresolve_short_url)("nope"))
+        self.assertIsNone(cache.get(url_cache_key("nope")))
+
+    def test_rejected_miss_takes_one_cache_round_trip(self):
+        code_filter.load()
+        backend = caches[DEFAULT_CACHE_ALIAS]
+        expected_keys = [url_cache_key("nope"), *LOG_KEYS]
+
+        with mock.patch.object(backend, "get_many", wraps=backend.get_many) as get_many:
+            self.assertIsNone(resolve_short_url("nope"))
+        get_many.assert_called_once_with(expected_keys)
+
+        with (
+            mock.patch.object(async_cache, "get_many", wraps=async_cache.get_many) as aget_many,
+            mock.patch.object(async_cache, "get") as aget,
+        ):
+            self.assertIsNone(async_to_sync(aresolve_short_url)("nope"))
+        aget_many.assert_called_once_with(expected_keys)
+        aget.assert_not_called()
+
+    def test_publish_only_creates_the_log_when_missing(self):
+        self.publish_from_another_worker("abc")
+        backend = caches[DEFAULT_CACHE_ALIAS]
+
+        with mock.patch.object(backend, "add", wraps=backend.add) as add:
+            self.publish_from_another_worker("def")
+        add.assert_not_called()
+        self.assertEqual(cache.get(SEQ_KEY), 2)
+
+    def test_cache_is_asked_before_the_filter(self):
+        code_filter.load()
+        # Cached by post_save; the filter never hears of it.
+        with mock.patch.object(code_filter, "publish"), self.captureOnCommitCallbacks(execute=True):
+            self.create_link(self.user, "abc")
+
+        self.assertEqual(resolve_short_url("abc")["original_url"], "https://example.com/abc")
+
+    def test_code_newer_than_the_filter_falls_back_to_the_database(self):
+        code_filter.load()
+        with mock.patch.object(code_filter, "publish"):
+            self.create_link(self.user, "abc")
+        self.publish_from_another_worker("abc")
+        self.forget_cached("abc")
+
+        self.assertFalse(code_filter.rejects("abc"))
+        self.assertEqual(resolve_short_url("abc")["original_url"], "https://example.com/abc")
+        self.forget_cached("abc")
+        self.assertEqual(async_to_sync(aresolve_short_url)("abc")["original_url"], "https://example.com/abc")
+
+        self.assertTrue(code_filter.sync())
+        self.assertFalse(code_filter.rejects("abc"))
+        self.assertTrue(code_filter.rejects("nope"))
+
+    def test_redis_restart_is_detected_by_the_epoch(self):
+        code_filter.load()
+        self.assertTrue(code_filter.rejects("nope"))
+        self.assertTrue(code_filter.sync())
+
+        cache.clear()
+        self.assertFalse(code_filter.rejects("nope"))
+        self.assertFalse(code_filter.sync())
+
+        # Replayed from seq 1 again, but the log was restarted under a new epoch.
+        self.publish_from_another_worker("abc")
+        self.assertEqual(cache.get(SEQ_KEY), 1)
+        self.assertFalse(code_filter.sync())
+
+        code_filter.load(rebuild=True)
+        self.assertEqual(code_filter._epoch, cache.get(EPOCH_KEY))
+        self.assertTrue(code_filter.sync())
+        self.assertTrue(code_filter.rejects("nope"))
+
+    def test_evicted_epoch_is_replaced(self):
+        code_filter.load()
+        cache.delete(EPOCH_KEY)
+        self.publish_from_another_worker("abc")
+
+        self.assertFalse(code_filter.rejects("nope"))
+        self.assertFalse(code_filter.sync())
+        code_filter.load(rebuild=True)
+        self.assertNotEqual(code_filter._epoch, "")
+        self.assertEqual(code_filter._epoch, cache.get(EPOCH_KEY))
+        self.assertTrue(code_filter.rejects("nope"))
+
+    def test_snapshot_keeps_seq_and_epoch(self):
+        self.create_link(self.user, "abc")
+        code_filter.load()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "codes.filter")
+            code_filter._filter.save(path, 7, code_filter._epoch)
+            bloom, seq, epoch = BloomFilter.load(path)
+            self.assertIn("abc", bloom)
+
+        self.assertEqual((seq, epoch), (7, cache.get(EPOCH_KEY)))
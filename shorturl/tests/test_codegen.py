@@ -0,0 +1,46 @@
+from shorturl.codegen import (
+    CODE_SPACE, GENERATED_CODE_LENGTH, SequenceCodeGenerator, encode_id, is_generated_code,
+)
+
+from .base import ShortURLTestCase
+
+
+class CodegenTests(ShortURLTestCase):
+    def test_encode_id_is_fixed_width_and_unique(self):
+        codes = {encode_id(n) for n in range(1, 5001)}
+
+        self.assertEqual(len(codes), 5000)
+        self.assertTrue(all(len(code) == GENERATED_CODE_LENGTH and is_generated_code(code) for code in codes))
+
+    def test_consecutive_ids_do_not_give_consecutive_codes(self):
+        self.assertNotEqual(encode_id(1)[:-1], encode_id(2)[:-1])
+
+    def test_encode_id_rejects_values_outside_the_code_space(self):
+        for number in (0, CODE_SPACE):
+            with self.assertRaises(ValueError):
+                encode_id(number)
+
+    def test_generator_hands_out_unique_codes_across_blocks(self):
+        generator = SequenceCodeGenerator(block_size=3)
+        other = SequenceCodeGenerator(block_size=3)
+
+        codes = [generator.next_code() for _ in range(7)] + [other.next_code() for _ in range(4)]
+
+        self.assertEqual(len(set(codes)), len(codes))
+
+    def test_custom_alias_of_generated_shape_is_reserved(self):
+        self.authenticate(self.create_user())
+
+        response = self.client.post(
+            "/api/shorten/",
+            {"original_url": "https://example.com", "custom_alias": "abcdefghi"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("reserved for generated codes", response.json()["custom_alias"][0])
+        self.assertEqual(self.client.post(
+            "/api/shorten/",
+            {"original_url": "https://example.com", "custom_alias": "abcd-fghi"},
+            content_type="application/json",
+        ).status_code, 201)
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from shorturl.clicks import ClickBuffer, click_buffer
+from shorturl.models import ClickEvent, ClickRollup, ShortURL
+from shorturl.services import (
+    aclaim_click, claim_click, click_limit_key, link_count_key, local_url_cache, short_url_record, url_cache_key,
+    user_link_count,
+)
+
+from .base import FakeRedisTestCase, ShortURLTestCase
+
+
+class ExpiryTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_click_limit_answers_410_once_used_up(self):
+        self.authenticate(self.user)
+        response = self.client.post(
+            "/api/shorten/", {"original_url": "https://example.com", "custom_alias": "twice", "max_clicks": "2"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+        statuses = [self.client.get("/api/redirect/twice/").status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [302, 302, 410])
+
+    def test_click_counter_is_seeded_from_the_database_and_the_buffer(self):
+        link = self.create_link(self.user, "thrice", max_clicks=3)
+        record = short_url_record(link)
+        # One click was flushed since the record was cached, one is buffered here.
+        ShortURL.objects.filter(pk=link.pk).update(click_count=1)
+        click_buffer.add("thrice")
+
+        self.assertTrue(claim_click("thrice", record))
+        self.assertFalse(claim_click("thrice", record))
+        self.assertEqual(cache.get(click_limit_key("thrice")), 4)
+
+    def test_existing_click_counter_is_never_reseeded(self):
+        record = short_url_record(self.create_link(self.user, "twice", max_clicks=2, click_count=1))
+        cache.set(click_limit_key("twice"), 2)
+
+        self.assertFalse(claim_click("twice", record))
+        self.assertEqual(cache.get(click_limit_key("twice")), 3)
+
+    def test_expired_link_answers_410(self):
+        link = self.create_link(self.user, "soon", expires_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(self.client.get("/api/redirect/soon/").status_code, 302)
+
+        ShortURL.objects.filter(pk=link.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        cache.clear()
+        local_url_cache.clear()
+
+        self.assertEqual(self.client.get("/api/redirect/soon/").status_code, 410)
+
+    def test_rejects_bad_limits(self):
+        self.authenticate(self.user)
+        for limits in ({"max_clicks": "many"}, {"max_clicks": 0}, {"expires_at": "2001-01-01T00:00:00Z"}):
+            response = self.client.post(
+                "/api/shorten/", {"original_url": "https://example.com", **limits}, content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400, limits)
+
+
+class RedisClickLimitTests(FakeRedisTestCase):
+    def test_async_counter_is_seeded_once_and_shared_with_sync(self):
+        user = self.create_user()
+        record = short_url_record(self.create_link(user, "thrice", max_clicks=3, click_count=1))
+
+        claims = [async_to_sync(aclaim_click)("thrice", record), claim_click("thrice", record),
+                  async_to_sync(aclaim_click)("thrice", record)]
+
+        self.assertEqual(claims, [True, True, False])
+        self.assertEqual(cache.get(click_limit_key("thrice")), 4)
+
+
+class PurgeExpiredTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        long_ago = timezone.now() - timedelta(days=30)
+        for code in ("old1", "old2", "old3"):
+            self.create_link(self.user, code, expires_at=long_ago)
+        self.create_link(self.user, "used", max_clicks=1, click_count=1, last_accessed_at=long_ago)
+        self.create_link(self.user, "recent", expires_at=timezone.now() - timedelta(days=1))
+        self.create_link(self.user, "live")
+        buffer = ClickBuffer()
+        buffer.add("old1")
+        buffer.flush()
+
+    def purge(self, *args):
+        out = StringIO()
+        call_command("purge_expired", "--sleep", "0", *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_deletes_links_past_the_grace_period_with_their_clicks(self):
+        self.assertIn("Purged 4 links", self.purge("--chunk-size", "2"))
+
+        self.assertEqual(set(ShortURL.objects.values_list("short_code", flat=True)), {"recent", "live"})
+        self.assertFalse(ClickEvent.objects.exists())
+        self.assertFalse(ClickRollup.objects.exists())
+
+    def test_invalidates_caches_once_per_chunk(self):
+        user_link_count(self.user.pk)
+
+        with mock.patch.object(local_url_cache, "bump_version") as bump_version:
+            self.purge("--chunk-size", "10")
+
+        self.assertEqual(bump_version.call_count, 2)  # One chunk per candidate query.
+        self.assertIsNone(cache.get(url_cache_key("old1")))
+        self.assertEqual(cache.get(link_count_key(self.user.pk)), 2)
+
+    def test_dry_run_only_counts(self):
+        self.assertIn("Would purge 4 links", self.purge("--dry-run"))
+        self.assertEqual(ShortURL.objects.count(), 6)
+
+    def test_deletes_click_events_past_retention_and_keeps_rollups(self):
+        buffer = ClickBuffer()
+        now = timezone.now()
+        for days_ago in (100, 95, 91, 10, 0):
+            buffer.add("live", when=now - timedelta(days=days_ago))
+        buffer.flush()
+        rollups = ClickRollup.objects.filter(short_url__short_code="live").count()
+
+        with override_settings(CLICK_EVENT_RETENTION_DAYS=90):
+            self.assertIn("and 3 old click events", self.purge("--chunk-size", "2", "--dry-run"))
+            self.assertIn("and 3 old click events", self.purge("--chunk-size", "2"))
+
+        kept = ClickEvent.objects.filter(short_url__short_code="live").values_list("clicked_at", flat=True)
+        self.assertEqual(sorted(kept), [now - timedelta(days=10), now])
+        self.assertEqual(ClickRollup.objects.filter(short_url__short_code="live").count(), rollups)
+
+    def test_click_events_can_be_kept_forever(self):
+        buffer = ClickBuffer()
+        buffer.add("live", when=timezone.now() - timedelta(days=1000))
+        buffer.flush()
+
+        self.assertIn("and 0 old click events", self.purge("--click-event-days", "0"))
+        self.assertTrue(ClickEvent.objects.filter(short_url__short_code="live").exists())
@@ -0,0 +1,56 @@
+import csv
+import json
+from io import StringIO
+
+from shorturl.export import EXPORT_FIELDS, export_lines, export_queryset
+
+from .base import ShortURLTestCase
+
+
+class ExportTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.alice = self.create_user()
+        self.bob = self.create_user("bob")
+        self.create_link(self.alice, "a1", max_clicks=10)
+        self.create_link(self.alice, "a2")
+        self.create_link(self.bob, "b1")
+
+    def get(self, requester, **params):
+        self.authenticate(requester)
+        response = self.client.get("/api/export/", params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_streams_the_users_own_links(self):
+        response, body = self.get(self.alice)
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([row["short_code"] for row in rows], ["a1", "a2"])
+        self.assertEqual(rows[0]["user"], "alice")
+        self.assertEqual((rows[0]["max_clicks"], rows[1]["max_clicks"]), ("10", ""))
+
+    def test_ndjson(self):
+        _, body = self.get(self.alice, output="ndjson")
+
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(set(rows[0]), set(EXPORT_FIELDS))
+        self.assertEqual(rows[1]["short_code"], "a2")
+
+    def test_admins_export_everything_or_one_user(self):
+        admin = self.create_user("admin", is_staff=True)
+
+        self.assertEqual(self.get(admin)[1].count("\n"), 4)
+        self.assertNotIn("alice", self.get(admin, user=self.bob.pk)[1])
+
+    def test_rejects_unknown_formats(self):
+        self.authenticate(self.alice)
+
+        self.assertEqual(self.client.get("/api/export/", {"output": "xml"}).status_code, 400)
+
+    def test_usernames_are_looked_up_once_per_chunk(self):
+        lines = export_lines("ndjson", export_queryset(), chunk_size=2)
+
+        # One streamed SELECT, then one user lookup for each of the two chunks.
+        with self.assertNumQueries(3):
+            self.assertEqual(len(list(lines)), 3)
@@ -0,0 +1,64 @@
+from shorturl.models import ShortURL, compute_url_hash
+
+from .base import ShortURLTestCase
+
+
+class IdempotentShortenTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.authenticate(self.user)
+
+    def shorten(self, original_url, **extra):
+        return self.client.post("/api/shorten/", {"original_url": original_url, **extra}, content_type="application/json")
+
+    def test_same_url_returns_the_same_link(self):
+        first = self.shorten("https://example.com/a")
+        second = self.shorten("HTTPS://Example.COM/a")
+
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(first.json()["short_code"], second.json()["short_code"])
+        self.assertEqual(ShortURL.objects.count(), 1)
+
+    def test_path_case_is_significant(self):
+        first = self.shorten("https://example.com/a").json()
+        second = self.shorten("https://example.com/A").json()
+
+        self.assertNotEqual(first["short_code"], second["short_code"])
+
+    def test_each_user_gets_their_own_link(self):
+        first = self.shorten("https://example.com/a").json()
+        self.authenticate(self.create_user("bob"))
+        second = self.shorten("https://example.com/a").json()
+
+        self.assertNotEqual(first["short_code"], second["short_code"])
+
+    def test_alias_conflicts(self):
+        self.shorten("https://example.com/a", custom_alias="mine")
+
+        self.assertEqual(self.shorten("https://example.com/a", custom_alias="mine").status_code, 200)
+        other_alias = self.shorten("https://example.com/a", custom_alias="other")
+        self.assertEqual(other_alias.json(), {"error": "URL already shortened as 'mine'"})
+        taken = self.shorten("https://example.com/b", custom_alias="mine")
+        self.assertEqual(taken.json(), {"error": "Custom alias already in use"})
+
+    def test_hash_is_stored_on_create_and_edit(self):
+        link = self.create_link(self.user, "abc", "https://example.com/a")
+        self.assertEqual(link.url_hash, compute_url_hash("https://example.com/a"))
+
+        link.original_url = "https://example.com/b"
+        link.save()
+        self.assertEqual(link.url_hash, compute_url_hash("https://example.com/b"))
+
+    def test_legacy_duplicate_keeps_its_null_hash(self):
+        # What the 0007 backfill leaves behind for a case-only duplicate.
+        self.create_link(self.user, "old", "https://example.com/a")
+        duplicate = self.create_link(self.user, "dup", "https://EXAMPLE.com/other")
+        ShortURL.objects.filter(pk=duplicate.pk).update(original_url="https://EXAMPLE.com/a", url_hash=None)
+        duplicate.refresh_from_db()
+
+        duplicate.click_count = 5
+        duplicate.save()
+
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.url_hash)
@@ -0,0 +1,149 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+
+from shorturl.codegen import SequenceCodeGenerator, decode_code, encode_id
+from shorturl.importer import LinkImporter, clean_import_row
+from shorturl.models import ShortURL
+from shorturl.services import MISSING_RECORD, resolve_short_url, url_cache_key
+
+from .base import ShortURLTestCase
+
+
+class ImportTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "links.csv")
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command("import_links", self.path, "--workers", "0", *args, stdout=out, stderr=StringIO())
+        with open(f"{self.path}.conflicts.csv", newline="") as f:
+            return out.getvalue(), list(csv.DictReader(f))
+
+    def write_rows(self, *rows):
+        with open(self.path, "w", newline="") as f:
+            writer = csv.DictWriter(f, ["user", "original_url", "short_code", "click_count", "created_at"])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def unissued_id(self):
+        # Above anything the code sequence has handed out so far.
+        return decode_code(SequenceCodeGenerator(block_size=1).next_code()) + 1_000
+
+    def test_export_import_round_trip_keeps_generated_codes(self):
+        # Codes generated by another deployment, which this sequence never reached.
+        first = self.unissued_id()
+        for n in range(3):
+            self.create_link(self.user, encode_id(first + n))
+        self.create_link(self.user, "custom", click_count=7)
+        before = list(ShortURL.objects.order_by("short_code").values_list(
+            "short_code", "original_url", "click_count", "created_at"))
+        call_command("export_links", "--file", self.path, stderr=StringIO())
+        ShortURL.objects.all().delete()
+
+        out, conflicts = self.run_import()
+
+        self.assertIn("Imported 4 links, rejected 0", out)
+        self.assertEqual(conflicts, [])
+        after = list(ShortURL.objects.order_by("short_code").values_list(
+            "short_code", "original_url", "click_count", "created_at"))
+        self.assertEqual(after, before)
+
+    def test_sequence_moves_past_imported_generated_codes(self):
+        sequence_id = self.unissued_id()
+        self.write_rows({"user": "alice", "original_url": "https://example.com/a", "short_code": encode_id(sequence_id)})
+
+        self.run_import()
+
+        fresh = SequenceCodeGenerator(block_size=1).next_code()
+        self.assertGreater(decode_code(fresh), sequence_id)
+
+    def test_codes_the_sequence_already_issued_are_rejected(self):
+        generator = SequenceCodeGenerator(block_size=5)
+        first = decode_code(generator.next_code())
+        # Still waiting in the generator's reserved block.
+        held = encode_id(first + 1)
+        later = encode_id(self.unissued_id())
+        self.write_rows(
+            {"user": "alice", "original_url": "https://example.com/a", "short_code": held},
+            {"user": "alice", "original_url": "https://example.com/b", "short_code": later},
+        )
+
+        out, conflicts = self.run_import()
+
+        self.assertIn("Imported 1 links, rejected 1", out)
+        self.assertEqual(
+            [(row["short_code"], row["reason"]) for row in conflicts],
+            [(held, "short_code already issued by the code sequence")],
+        )
+        remaining = [generator.next_code() for _ in range(4)]
+        self.assertIn(held, remaining)
+        self.assertFalse(ShortURL.objects.filter(short_code__in=remaining).exists())
+        self.assertGreater(decode_code(generator.next_code()), decode_code(later))
+
+    def test_random_codes_of_the_generated_shape_are_conflicts(self):
+        self.write_rows(
+            {"user": "alice", "original_url": "https://example.com/a", "short_code": "zzzzzzzzz"},
+            {"user": "alice", "original_url": "https://example.com/b", "short_code": "ok"},
+        )
+
+        out, conflicts = self.run_import()
+
+        self.assertIn("Imported 1 links, rejected 1", out)
+        self.assertEqual(
+            [(row["line"], row["short_code"], row["reason"]) for row in conflicts],
+            [("2", "zzzzzzzzz", "short_code reserved for generated codes")],
+        )
+
+    def test_cached_misses_are_dropped_for_imported_codes(self):
+        self.assertIsNone(resolve_short_url("fresh"))
+        self.assertEqual(cache.get(url_cache_key("fresh")), MISSING_RECORD)
+        self.write_rows({"user": "alice", "original_url": "https://example.com/a", "short_code": "fresh"})
+
+        self.run_import()
+
+        self.assertIsNone(cache.get(url_cache_key("fresh")))
+        self.assertEqual(resolve_short_url("fresh")["original_url"], "https://example.com/a")
+
+    def test_rejected_rows_go_to_the_conflicts_file(self):
+        self.create_link(self.user, "taken")
+        self.write_rows(
+            {"user": "alice", "original_url": "https://example.com/a", "short_code": "ok"},
+            {"user": "nobody", "original_url": "https://example.com/b", "short_code": "ghost"},
+            {"user": "alice", "original_url": "https://example.com/c", "short_code": "taken"},
+            {"user": "alice", "original_url": "not a url", "short_code": "bad"},
+        )
+
+        out, conflicts = self.run_import()
+
+        self.assertIn("Imported 1 links, rejected 3", out)
+        self.assertEqual(
+            [(row["line"], row["short_code"], row["reason"]) for row in conflicts],
+            [
+                ("5", "bad", "original_url: Enter a valid URL."),
+                ("3", "ghost", "Unknown user: nobody"),
+                ("4", "taken", "short_code already in use"),
+            ],
+        )
+
+    def test_rows_that_lose_a_race_are_reported(self):
+        rows = [clean_import_row((n, {"user": "alice", "original_url": f"https://example.com/{code}", "short_code": code}))[:2]
+                for n, code in ((2, "mine"), (3, "raced"))]
+        importer = LinkImporter()
+        # Live traffic takes "raced" after the importer checked it.
+        with mock.patch("shorturl.importer.fan_out", return_value=[]):
+            self.create_link(self.create_user("bob"), "raced")
+            created, conflicts = importer.load(rows)
+
+        self.assertEqual(created, 1)
+        self.assertEqual(conflicts, [(3, "raced", "short_code or URL taken during import")])
+        self.assertEqual(ShortURL.objects.get(short_code="raced").user.username, "bob")
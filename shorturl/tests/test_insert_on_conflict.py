@@ -0,0 +1,40 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from shorturl.models import ShortURL, compute_url_hash
+from shorturl.services import _insert_ignoring_conflicts, generate_short_code, get_or_create_short_url
+
+from .base import ShortURLTestCase
+
+
+class InsertOnConflictTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        generate_short_code("https://example.com/warmup")  # Reserve a block of codes.
+
+    def test_new_link_is_a_single_insert(self):
+        with CaptureQueriesContext(connection) as context:
+            obj, created = get_or_create_short_url("https://example.com/a", self.user)
+
+        self.assertTrue(created)
+        self.assertEqual([q["sql"].split()[0] for q in context.captured_queries], ["INSERT"])
+        self.assertEqual(ShortURL.objects.get().pk, obj.pk)
+
+    def test_existing_link_costs_one_insert_and_one_select(self):
+        first, _ = get_or_create_short_url("https://example.com/a", self.user)
+
+        with self.assertNumQueries(2):
+            again, created = get_or_create_short_url("https://example.com/a", self.user)
+
+        self.assertFalse(created)
+        self.assertEqual(again.pk, first.pk)
+
+    def test_insert_reports_conflicts_instead_of_raising(self):
+        self.create_link(self.user, "abc", "https://example.com/a")
+        duplicate = ShortURL(user=self.user, short_code="abc", original_url="https://example.com/b",
+                             url_hash=compute_url_hash("https://example.com/b"))
+
+        self.assertFalse(_insert_ignoring_conflicts(duplicate))
+        self.assertIsNone(duplicate.pk)
+        self.assertEqual(ShortURL.objects.count(), 1)
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from shorturl.models import ShortURL
+from shorturl.services import link_count_key, user_link_count
+
+from .base import ShortURLTestCase
+
+START = datetime(2025, 11, 1, tzinfo=dt_timezone.utc)
+
+
+class UserLinksTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.other = self.create_user("bob")
+        # Two links per timestamp, so the id breaks ties.
+        for n in range(5):
+            self.create_link(self.user, f"code{n}", f"https://Example.com/page{n}", created_at=START + timedelta(hours=n // 2))
+        self.create_link(self.other, "theirs", "https://example.com/page0")
+        self.authenticate(self.user)
+
+    def get(self, url="/api/links/", **params):
+        return self.client.get(url, params).json()
+
+    def test_cursor_walks_own_links_newest_first(self):
+        codes = []
+        page = self.get(page_size=2)
+        self.assertEqual(
+            set(page["results"][0]),
+            {"short_code", "original_url", "click_count", "created_at", "last_accessed_at", "expires_at", "max_clicks"},
+        )
+        while True:
+            codes += [row["short_code"] for row in page["results"]]
+            if not page["next"]:
+                break
+            page = self.get(page["next"])
+
+        self.assertEqual(codes, [f"code{n}" for n in reversed(range(5))])
+
+    def test_search_matches_url_or_code_case_insensitively(self):
+        by_url = self.get(q="example.com/PAGE3")
+        by_code = self.get(q="CODE1")
+
+        self.assertEqual([row["short_code"] for row in by_url["results"]], ["code3"])
+        self.assertEqual([row["short_code"] for row in by_code["results"]], ["code1"])
+        self.assertIsNone(by_url["count"])
+
+    def test_search_term_is_bounded(self):
+        self.assertEqual(self.client.get("/api/links/", {"q": "x" * 201}).status_code, 400)
+
+    def test_count_is_cached_and_kept_current(self):
+        self.assertEqual(self.get()["count"], 5)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get()["count"], 5)
+        self.assertFalse([q for q in context.captured_queries if "COUNT(" in q["sql"]])
+
+        self.assertEqual(user_link_count(self.other.pk), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_link(self.user, "code5")
+        ShortURL.objects.get(short_code="code0").delete()
+        moved = ShortURL.objects.get(short_code="code1")
+        moved.user = self.other
+        moved.save()
+        self.client.post("/api/shorten/bulk/", [{"original_url": "https://example.com/bulk"}], content_type="application/json")
+
+        self.assertEqual(cache.get(link_count_key(self.user.pk)), 5)
+        self.assertEqual(cache.get(link_count_key(self.other.pk)), 2)
+        self.assertEqual(self.get()["count"], 5)
+
+    def test_requires_authentication(self):
+        self.client.defaults.pop("HTTP_AUTHORIZATION")
+
+        self.assertEqual(self.client.get("/api/links/").status_code, 401)
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.core.cache import cache
+
+from shorturl.local_cache import LocalCache
+from shorturl.services import local_url_cache
+
+from .base import ShortURLTestCase
+
+
+class LocalCacheTests(ShortURLTestCase):
+    def test_evicts_the_least_recently_used_entry(self):
+        local = LocalCache(max_entries=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        self.assertEqual((local.get("a"), local.get("b"), local.get("c")), (1, None, 3))
+
+    def test_entries_expire_after_their_ttl(self):
+        local = LocalCache(max_entries=10, ttl=60)
+        with mock.patch("shorturl.local_cache.time.monotonic", return_value=100.0):
+            local.set("a", 1, ttl=5)
+        with mock.patch("shorturl.local_cache.time.monotonic", return_value=104.0):
+            self.assertEqual(local.get("a"), 1)
+        with mock.patch("shorturl.local_cache.time.monotonic", return_value=105.0):
+            self.assertIsNone(local.get("a"))
+
+    def test_version_bump_drops_every_worker_copy(self):
+        writer = LocalCache(max_entries=10, ttl=60, version_key="test:version", version_check=0)
+        reader = LocalCache(max_entries=10, ttl=60, version_key="test:version", version_check=0)
+        reader.get("a")
+        reader.set("a", 1)
+        self.assertEqual(reader.get("a"), 1)
+
+        writer.bump_version()
+
+        self.assertIsNone(reader.get("a"))
+
+    def test_zero_entries_disables_the_tier(self):
+        local = LocalCache(max_entries=0, ttl=60)
+        local.set("a", 1)
+        self.assertIsNone(local.get("a"))
+
+    def test_local_hit_skips_redis(self):
+        user = self.create_user()
+        self.create_link(user, "abc", "https://example.com/hot")
+        self.client.get("/api/redirect/abc/")
+
+        with mock.patch.object(local_url_cache, "_version_due", return_value=False), \
+                mock.patch.object(cache, "get", side_effect=AssertionError("Redis was queried")):
+            response = self.client.get("/api/redirect/abc/")
+
+        self.assertEqual(response["Location"], "https://example.com/hot")
@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from shorturl.metrics import Metrics, merge_snapshots, render_prometheus
+
+from .base import ShortURLTestCase
+
+
+class MetricsTests(SimpleTestCase):
+    def test_renders_counters_and_cumulative_histograms(self):
+        recorder = Metrics(directory="")
+        recorder.inc("shorturl_cache_fills_total")
+        recorder.inc("shorturl_cache_fills_total")
+        recorder.observe("db_query_duration_seconds", 0.003, buckets=(0.001, 0.01))
+        recorder.observe("db_query_duration_seconds", 0.5, buckets=(0.001, 0.01))
+
+        text = recorder.render()
+
+        self.assertIn("# TYPE shorturl_cache_fills_total counter\nshorturl_cache_fills_total 2\n", text)
+        self.assertIn('db_query_duration_seconds_bucket{le="0.01"} 1\n', text)
+        self.assertIn('db_query_duration_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("db_query_duration_seconds_count 2\n", text)
+
+    def test_sums_the_snapshots_of_every_worker(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = Metrics(directory=directory), Metrics(directory=directory)
+            first._pid = second._pid = os.getpid()  # No writer threads.
+            first.inc("shorturl_throttled_total", scope="ip")
+            second.inc("shorturl_throttled_total", scope="ip")
+            first.write_snapshot()
+            os.replace(os.path.join(directory, f"{os.getpid()}.json"), os.path.join(directory, "1.json"))
+
+            text = second.render()
+
+        self.assertIn('shorturl_throttled_total{scope="ip"} 2\n', text)
+
+    def test_escapes_label_values(self):
+        merged = merge_snapshots([{"counters": [["x_total", [["path", 'a"b']], 1]], "histograms": []}])
+
+        self.assertIn('x_total{path="a\\"b"} 1', render_prometheus(merged))
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsViewTests(ShortURLTestCase):
+    def scrape(self):
+        return self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+
+    def test_counts_redirect_cache_lookups(self):
+        self.create_link(self.create_user(), "abc")
+        self.client.get("/api/redirect/abc/")
+
+        text = self.scrape().content.decode()
+
+        self.assertIn('shorturl_cache_lookups_total{result="hit",tier="local"}', text)
+        self.assertIn('http_request_duration_seconds_count{', text)
+
+    def test_token_protects_the_endpoint(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+        self.assertEqual(self.scrape().status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_not_served_without_a_token_unless_debug(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_can_be_turned_off(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from .base import ShortURLTestCase
+
+START = datetime(2025, 11, 1, tzinfo=dt_timezone.utc)
+
+
+class AdminListTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user("admin", is_staff=True)
+        self.user = self.create_user()
+        # Two links per timestamp, so the id breaks ties.
+        for n in range(7):
+            self.create_link(self.user, f"code{n}", created_at=START + timedelta(hours=n // 2))
+        self.authenticate(self.admin)
+
+    def get(self, url="/api/admin/list/", **params):
+        return self.client.get(url, params).json()
+
+    def test_cursor_walks_every_row_once_newest_first(self):
+        codes = []
+        page = self.get(page_size=3)
+        while True:
+            codes += [row["short_code"] for row in page["results"]]
+            if not page["next"]:
+                break
+            page = self.get(page["next"])
+
+        self.assertEqual(codes, [f"code{n}" for n in reversed(range(7))])
+
+    def test_filters(self):
+        self.create_link(self.admin, "other")
+
+        self.assertEqual(len(self.get(user=self.admin.pk)["results"]), 1)
+        self.assertEqual(len(self.get(code_prefix="code")["results"]), 7)
+        after = self.get(created_after="2025-11-01T02:00:00Z", created_before="2025-11-01T03:00:00Z")
+        self.assertEqual([row["short_code"] for row in after["results"]], ["code5", "code4"])
+
+    def test_approximate_count_is_opt_in(self):
+        self.assertIsNone(self.get()["count"])
+        self.assertEqual(self.get(user=self.user.pk, count="approx")["count"], 7)
+
+    def test_page_numbers_still_work(self):
+        page = self.get(page=2, page_size=5)
+
+        self.assertEqual(page["count"], 7)
+        self.assertEqual(len(page["results"]), 2)
+
+    def test_bad_cursor_and_filters(self):
+        self.assertEqual(self.client.get("/api/admin/list/", {"cursor": "garbage"}).status_code, 404)
+        self.assertEqual(self.client.get("/api/admin/list/", {"created_after": "soon"}).status_code, 400)
+
+    def test_admins_only(self):
+        self.authenticate(self.user)
+
+        self.assertEqual(self.client.get("/api/admin/list/").status_code, 403)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+
+from shorturl.bloom import code_filter
+from shorturl.services import MISSING_RECORD, local_url_cache, url_cache_key
+
+from .base import ShortURLTestCase
+
+
+class RedirectTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_cached_redirect_runs_no_sql(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_link(self.user, "abc", "https://example.com/landing")
+        local_url_cache.clear()
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/redirect/abc/")
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], "https://example.com/landing")
+
+    def test_cache_miss_is_filled_from_the_db(self):
+        self.create_link(self.user, "abc")
+        cache.clear()
+        local_url_cache.clear()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/redirect/abc/").status_code, 302)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/redirect/abc/").status_code, 302)
+
+    def test_unknown_code_is_negatively_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get("/api/redirect/nope/").status_code, 404)
+        self.assertEqual(cache.get(url_cache_key("nope")), MISSING_RECORD)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/redirect/nope/").status_code, 404)
+
+    def test_creating_a_code_replaces_its_negative_entry(self):
+        self.client.get("/api/redirect/abc/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_link(self.user, "abc")
+
+        self.assertEqual(self.client.get("/api/redirect/abc/").status_code, 302)
+
+    def test_rolled_back_link_is_neither_cached_nor_published(self):
+        with (
+            mock.patch.object(code_filter, "publish") as publish,
+            self.captureOnCommitCallbacks(execute=True) as callbacks,
+            self.assertRaises(RuntimeError),
+            transaction.atomic(),
+        ):
+            self.create_link(self.user, "abc")
+            raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertIsNone(cache.get(url_cache_key("abc")))
+        publish.assert_not_called()
+
+    def test_deleted_link_stops_redirecting(self):
+        link = self.create_link(self.user, "abc")
+        self.client.get("/api/redirect/abc/")
+        link.delete()
+
+        self.assertEqual(self.client.get("/api/redirect/abc/").status_code, 404)
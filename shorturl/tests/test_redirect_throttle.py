@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.throttling import BaseThrottle
+
+from shorturl.ratelimit import LocalTokenBucket, client_ip, redirect_rate_limiter
+
+from .base import ShortURLTestCase
+
+
+class LocalTokenBucketTests(ShortURLTestCase):
+    def test_allows_a_burst_then_refills_at_the_rate(self):
+        bucket = LocalTokenBucket(rate=2, burst=3)
+        with mock.patch("shorturl.ratelimit.time.monotonic", return_value=100.0):
+            self.assertEqual([bucket.allow("a") for _ in range(4)], [True, True, True, False])
+            self.assertTrue(bucket.allow("b"))
+        with mock.patch("shorturl.ratelimit.time.monotonic", return_value=100.5):
+            self.assertEqual([bucket.allow("a") for _ in range(2)], [True, False])
+
+    def test_forgets_the_least_recently_seen_client(self):
+        bucket = LocalTokenBucket(rate=1, burst=1, max_clients=2)
+        with mock.patch("shorturl.ratelimit.time.monotonic", return_value=100.0):
+            bucket.allow("a")
+            bucket.allow("b")
+            bucket.allow("c")
+            self.assertTrue(bucket.allow("a"))
+
+    def test_zero_rate_disables_the_limit(self):
+        bucket = LocalTokenBucket(rate=0, burst=0)
+        self.assertTrue(all(bucket.allow("a") for _ in range(5)))
+
+
+class RedirectThrottleTests(ShortURLTestCase):
+    def test_redirects_answer_429_past_the_burst(self):
+        self.create_link(self.create_user(), "abc")
+
+        with mock.patch.object(redirect_rate_limiter, "burst", 2):
+            statuses = [self.client.get("/api/redirect/abc/").status_code for _ in range(3)]
+            response = self.client.get("/api/redirect/abc/", REMOTE_ADDR="10.0.0.9")
+
+        self.assertEqual(statuses, [302, 302, 429])
+        self.assertEqual(response.status_code, 302)
+
+    def test_redirects_skip_the_drf_throttles(self):
+        self.create_link(self.create_user(), "abc")
+
+        statuses = {self.client.get("/api/redirect/abc/").status_code for _ in range(25)}
+
+        self.assertEqual(statuses, {302})
+
+
+class ClientIpTests(SimpleTestCase):
+    def test_matches_the_drf_throttles(self):
+        factory = RequestFactory()
+        requests = [
+            factory.get("/", REMOTE_ADDR="10.0.0.1"),
+            factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1"),
+            factory.get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2, 3.3.3.3"),
+        ]
+        for num_proxies in (None, 0, 1, 2, 5):
+            with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": num_proxies}):
+                for request in requests:
+                    self.assertEqual(client_ip(request), BaseThrottle().get_ident(request), num_proxies)
+
+
+class RedirectProfileTests(SimpleTestCase):
+    def test_redirect_urlconf_does_not_import_drf(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "urlshortener.settings_redirect"}
+        env.setdefault("SECRET_KEY", settings.SECRET_KEY)
+        code = (
+            "import sys, django; django.setup(); "
+            "from django.urls import get_resolver; get_resolver().url_patterns; "
+            "print(sorted(name for name in sys.modules if name.split('.')[0] == 'rest_framework'))"
+        )
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+
+        self.assertEqual(result.stdout.strip().splitlines()[-1:], ["[]"], result.stderr)
@@ -0,0 +1,202 @@
+import contextvars
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.migrations.state import ProjectState
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from shorturl.authentication import JWTAuthentication
+from shorturl.db_operations import DropForeignKeyConstraintOnShards
+from shorturl.middleware import ReplicaPinMiddleware
+from shorturl.models import ClickRollup, ShortURL
+from shorturl.routers import ReplicaRouter, is_pinned, primary_pin_key, read_database, use_primary
+from shorturl.sharding import ShardRouter, fan_out, lookup_aliases, owner_shards, shard_for_code
+
+from .base import ShortURLTestCase
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_shorturl_reads_go_to_a_replica(self):
+        self.assertEqual(self.router.db_for_read(ShortURL), "replica_1")
+        self.assertEqual(self.router.db_for_write(ShortURL), "default")
+
+    def test_auth_reads_stay_on_the_primary(self):
+        self.assertEqual(self.router.db_for_read(get_user_model()), "default")
+
+    def test_pinned_reads_go_to_the_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(ShortURL), "default")
+        self.assertEqual(self.router.db_for_read(ShortURL), "replica_1")
+
+    def test_never_migrates_replicas(self):
+        self.assertIs(self.router.allow_migrate("replica_1", "shorturl"), False)
+        self.assertIsNone(self.router.allow_migrate("default", "shorturl"))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.router.db_for_read(ShortURL), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaPinMiddlewareTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.factory = RequestFactory()
+        self.read_from = None
+
+    def handle(self, request, status=200):
+        def view(request):
+            self.read_from = read_database()
+            return HttpResponse(status=status)
+
+        request.user = self.user
+        return ReplicaPinMiddleware(view)(request)
+
+    def test_reads_use_a_replica(self):
+        self.handle(self.factory.get("/"))
+
+        self.assertEqual(self.read_from, "replica_1")
+        self.assertEqual(read_database(), "replica_1")
+
+    def test_writes_use_the_primary_and_pin_the_user(self):
+        self.handle(self.factory.post("/"))
+
+        self.assertEqual(self.read_from, "default")
+        self.assertEqual(cache.get(primary_pin_key(self.user.pk)), 1)
+        self.assertEqual(read_database(), "replica_1")  # Only for that request.
+
+    def test_failed_writes_do_not_pin(self):
+        self.handle(self.factory.post("/"), status=400)
+
+        self.assertIsNone(cache.get(primary_pin_key(self.user.pk)))
+
+    def test_jwt_authentication_applies_the_pin(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+        def authenticate():
+            JWTAuthentication().authenticate(Request(request))
+            return is_pinned()
+
+        self.assertFalse(contextvars.copy_context().run(authenticate))
+        cache.set(primary_pin_key(self.user.pk), 1)
+        self.assertTrue(contextvars.copy_context().run(authenticate))
+
+
+def loaded(instance, db):
+    instance._state.adding = False
+    instance._state.db = db
+    return instance
+
+
+@override_settings(SHORTURL_SHARDS=["default", "shard_1"], DATABASE_REPLICAS=[])
+class ShardRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ShardRouter()
+        self.codes = [f"code{n}" for n in range(200)]
+
+    def test_new_links_go_to_the_shard_of_their_code(self):
+        for code in self.codes[:20]:
+            link = ShortURL(short_code=code)
+            self.assertEqual(self.router.db_for_write(ShortURL, instance=link), shard_for_code(code))
+        self.assertEqual({shard_for_code(code) for code in self.codes}, {"default", "shard_1"})
+
+    def test_loaded_rows_stay_on_their_database(self):
+        link = loaded(ShortURL(short_code=self.codes[0]), "shard_1")
+        rollup = ClickRollup(short_url=link)
+        rollup._state.db = "shard_1"
+
+        self.assertEqual(self.router.db_for_read(ShortURL, instance=link), "shard_1")
+        self.assertEqual(self.router.db_for_write(ShortURL, instance=link), "shard_1")
+        self.assertEqual(self.router.db_for_write(ClickRollup, instance=rollup), "shard_1")
+
+    @override_settings(DATABASE_REPLICAS=["replica_1"])
+    def test_rows_read_from_a_replica_are_written_to_the_primary(self):
+        link = loaded(ShortURL(short_code=self.codes[0]), "replica_1")
+
+        self.assertEqual(self.router.db_for_write(ShortURL, instance=link), "default")
+
+    def test_other_models_and_querysets_fall_through(self):
+        user = loaded(get_user_model()(), "default")
+
+        self.assertIsNone(self.router.db_for_read(get_user_model(), instance=user))
+        self.assertIsNone(self.router.db_for_read(ShortURL))
+        self.assertTrue(self.router.allow_relation(user, loaded(ShortURL(), "shard_1")))
+
+    @override_settings(SHORTURL_SHARDS=["default"])
+    def test_unsharded_routing_is_unchanged(self):
+        self.assertIsNone(self.router.db_for_write(ShortURL, instance=ShortURL(short_code="abc")))
+        self.assertEqual(fan_out(ShortURL.objects.all()), [mock.ANY])
+        self.assertEqual(lookup_aliases("abc"), ["default"])
+
+    def test_fan_out_covers_every_shard(self):
+        self.assertEqual([qs.db for qs in fan_out(ShortURL.objects.all())], ["default", "shard_1"])
+        self.assertEqual([qs.db for qs in fan_out(ShortURL.objects.using("shard_1"))], ["shard_1"])
+
+    def test_adding_a_shard_only_moves_codes_onto_it(self):
+        before = {code: shard_for_code(code) for code in self.codes}
+        with override_settings(SHORTURL_SHARDS=["default", "shard_1", "shard_2"], SHORTURL_PREVIOUS_SHARDS=["default", "shard_1"]):
+            moved = [code for code in self.codes if shard_for_code(code) != before[code]]
+
+            self.assertTrue(moved)
+            self.assertLess(len(moved), len(self.codes) / 2)
+            self.assertEqual({shard_for_code(code) for code in moved}, {"shard_2"})
+            # Lookups try the new owner, then the shard the code used to live on.
+            self.assertEqual(owner_shards(moved[0]), ["shard_2", before[moved[0]]])
+            self.assertEqual(lookup_aliases(moved[0]), ["shard_2", before[moved[0]]])
+
+
+@override_settings(SHORTURL_SHARDS=["default", "shard_1"])
+class DropForeignKeyConstraintOnShardsTests(SimpleTestCase):
+    def migrate(self, alias, backwards=False):
+        operation = DropForeignKeyConstraintOnShards(model_name="shorturl", name="user")
+        schema_editor = mock.Mock()
+        schema_editor.connection.alias = alias
+        state = ProjectState.from_apps(apps)
+        with mock.patch.object(operation, "allow_migrate_model", return_value=True):
+            if backwards:
+                operation.database_backwards("shorturl", schema_editor, state, state)
+            else:
+                operation.database_forwards("shorturl", schema_editor, state, state)
+        return schema_editor.alter_field.call_args_list
+
+    def test_drops_the_constraint_on_shards_only(self):
+        (call,) = self.migrate("shard_1")
+        _, old, new = call.args
+
+        self.assertEqual((old.name, old.db_constraint, new.db_constraint), ("user", True, False))
+        self.assertEqual(self.migrate("default"), [])
+        self.assertEqual(self.migrate("replica_1"), [])
+
+    def test_backwards_restores_it(self):
+        (call,) = self.migrate("shard_1", backwards=True)
+        _, old, new = call.args
+
+        self.assertEqual((old.db_constraint, new.db_constraint), (False, True))
+
+    def test_model_state_keeps_the_constraint(self):
+        self.assertTrue(ShortURL._meta.get_field("user").db_constraint)
+
+
+class AsgiConnectionTests(SimpleTestCase):
+    def test_asgi_disables_persistent_connections(self):
+        env = {key: value for key, value in os.environ.items() if key != "DB_CONN_MAX_AGE"}
+        env["DJANGO_SETTINGS_MODULE"] = "urlshortener.settings"
+        code = "import urlshortener.asgi; from django.conf import settings; print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+
+        result = subprocess.run([sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "0", result.stderr)
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
+
+from shorturl.throttling import IPRateThrottle
+
+from .base import FakeRedisTestCase, ShortURLTestCase
+
+
+class ThreePerMinute(IPRateThrottle):
+    rate = "3/min"
+
+
+class SlidingWindowThrottleTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+        self.now = 6000.0  # Start of a window.
+
+    def allow(self, ip="10.0.0.1"):
+        throttle = ThreePerMinute()
+        throttle.timer = lambda: self.now
+        self.request.META["REMOTE_ADDR"] = ip
+        return throttle.allow_request(self.request, None)
+
+    def test_allows_the_rate_then_blocks(self):
+        self.assertEqual([self.allow() for _ in range(4)], [True, True, True, False])
+        self.assertTrue(self.allow("10.0.0.2"))
+
+    def test_previous_window_is_weighted_by_its_overlap(self):
+        for _ in range(3):
+            self.allow()
+
+        self.now += 60 + 30  # Halfway into the next window: 1.5 of 3 still count.
+        self.assertEqual([self.allow() for _ in range(3)], [True, True, False])
+
+        self.now += 30  # Only the 2 of the second window overlap now.
+        self.assertEqual([self.allow() for _ in range(2)], [True, False])
+
+    def test_blocked_requests_are_not_counted(self):
+        for _ in range(10):
+            self.allow()
+
+        self.now += 60 + 59
+        self.assertTrue(self.allow())
+
+    def test_uses_the_lua_script_with_django_redis(self):
+        redis_cache = {"default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": "redis://localhost:6379/0"}}
+        with override_settings(CACHES=redis_cache), \
+                mock.patch.object(ThreePerMinute, "_allow_redis", return_value=True) as allow_redis:
+            self.assertTrue(self.allow())
+
+        allow_redis.assert_called_once()
+
+    def test_api_answers_429_with_retry_after(self):
+        with mock.patch.object(IPRateThrottle, "rate", "2/min", create=True):
+            responses = [self.client.post("/api/auth/register/", {}) for _ in range(3)]
+
+        self.assertEqual([response.status_code for response in responses], [400, 400, 429])
+        self.assertTrue(0 < int(responses[-1]["Retry-After"]) <= 60)
+
+
+class LuaSlidingWindowThrottleTests(FakeRedisTestCase, SlidingWindowThrottleTests):
+    """
+    The same scenarios through the Lua script, run by fakeredis.
+    """
+
+    def allow(self, ip="10.0.0.1"):
+        with mock.patch.object(ThreePerMinute, "_allow_cache", side_effect=AssertionError("Lua script not used")):
+            return super().allow(ip)
+
+    def test_counter_outlives_the_next_window_only(self):
+        self.allow()
+
+        self.assertEqual(cache.get("throttle_ip_10.0.0.1:100"), 1)
+        self.assertEqual(cache.ttl("throttle_ip_10.0.0.1:100"), 120)
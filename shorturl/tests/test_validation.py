@@ -0,0 +1,63 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.test import SimpleTestCase
+
+from shorturl.services import InvalidShortenInput, clean_shorten_item, is_valid_url
+
+from .base import ShortURLTestCase
+
+
+class CleanShortenItemTests(SimpleTestCase):
+    def assertInvalid(self, item, field):
+        with self.assertRaises(InvalidShortenInput) as context:
+            clean_shorten_item(item)
+        self.assertEqual(context.exception.field, field)
+
+    def test_strips_and_returns_the_cleaned_item(self):
+        url, alias, limits = clean_shorten_item({"original_url": " https://example.com/a ", "custom_alias": " mine "})
+
+        self.assertEqual((url, alias), ("https://example.com/a", "mine"))
+        self.assertEqual(limits, {"expires_at": None, "max_clicks": None})
+
+    def test_rejects_bad_items(self):
+        self.assertInvalid([], "non_field_errors")
+        self.assertInvalid({}, "original_url")
+        self.assertInvalid({"original_url": "not a url"}, "original_url")
+        self.assertInvalid({"original_url": "https://example.com/" + "a" * 200}, "original_url")
+        self.assertInvalid({"original_url": "https://example.com", "custom_alias": 5}, "custom_alias")
+        self.assertInvalid({"original_url": "https://example.com", "custom_alias": "a" * 11}, "custom_alias")
+        self.assertInvalid({"original_url": "https://example.com", "expires_at": "tomorrow"}, "expires_at")
+        self.assertInvalid({"original_url": "https://example.com", "expires_at": "2000-01-01T00:00:00Z"}, "expires_at")
+        self.assertInvalid({"original_url": "https://example.com", "max_clicks": 0}, "max_clicks")
+
+    def test_fast_url_check_agrees_with_django(self):
+        validate = URLValidator()
+        for url in (
+            "https://example.com", "http://EXAMPLE.com:8080/a?b=c#d", "https://sub.example.co.uk/path/",
+            "https://user:pw@example.com/", "ftp://example.com/file", "http://localhost/", "http://[::1]/",
+            "https://exa mple.com", "https://", "example.com", "javascript:alert(1)", "http://-bad-.com/",
+        ):
+            try:
+                validate(url)
+                expected = True
+            except ValidationError:
+                expected = False
+            self.assertEqual(is_valid_url(url), expected, url)
+
+
+class ShortenValidationTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate(self.create_user())
+
+    def test_errors_are_keyed_by_field(self):
+        response = self.client.post("/api/shorten/", {"original_url": "nope"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"original_url": ["Enter a valid URL."]})
+
+    def test_response_has_the_serializer_shape(self):
+        response = self.client.post("/api/shorten/", {"original_url": "https://example.com"}, content_type="application/json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(response.json()), {"short_code", "original_url"})
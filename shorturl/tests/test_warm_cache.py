@@ -0,0 +1,54 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from shorturl.services import fill_short_url, url_cache_key
+
+from .base import ShortURLTestCase
+
+
+class WarmCacheTests(ShortURLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+
+    def test_loads_the_hottest_codes(self):
+        now = timezone.now()
+        for code, clicks in (("hot", 50), ("warm", 10), ("cold", 1)):
+            self.create_link(self.user, code, click_count=clicks, last_accessed_at=now)
+        self.create_link(self.user, "never")
+        cache.clear()
+
+        out = StringIO()
+        call_command("warm_cache", "--top", "2", "--chunk-size", "1", stdout=out)
+
+        self.assertIn("Warmed 2 short codes", out.getvalue())
+        cached = cache.get_many([url_cache_key(code) for code in ("hot", "warm", "cold", "never")])
+        self.assertEqual(set(cached), {url_cache_key("hot"), url_cache_key("warm")})
+
+
+class SingleFlightFillTests(ShortURLTestCase):
+    def test_waits_for_the_worker_holding_the_fill_lock(self):
+        cache.add(f"lock:{url_cache_key('abc')}", 1)
+
+        def other_worker_fills(delay):
+            cache.set(url_cache_key("abc"), {"original_url": "https://example.com/abc"})
+
+        with mock.patch("shorturl.services.time.sleep", side_effect=other_worker_fills), \
+                self.assertNumQueries(0):
+            record = fill_short_url("abc")
+
+        self.assertEqual(record, {"original_url": "https://example.com/abc"})
+
+    def test_falls_back_to_the_db_when_the_lock_holder_is_slow(self):
+        self.create_link(self.create_user(), "abc")
+        cache.clear()
+        cache.add(f"lock:{url_cache_key('abc')}", 1)
+
+        with mock.patch("shorturl.services.FILL_WAIT_SECONDS", 0):
+            record = fill_short_url("abc")
+
+        self.assertEqual(record["original_url"], "https://example.com/abc")
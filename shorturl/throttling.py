@@ -1,7 +1,107 @@
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache as default_cache, caches
+from rest_framework import throttling
 from rest_framework.throttling import SimpleRateThrottle
 
+from .metrics import metrics
+
+# Sliding-window counter: the previous fixed window's count, weighted by how
+# much of it still overlaps the sliding window, plus the current count.
+# Runs atomically in Redis and only counts requests that are let through.
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+_scripts = {}
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Drop-in replacement for SimpleRateThrottle's timestamp-list storage.
+
+    - Two integer counters per identity (current and previous window), so
+      memory is O(1) whatever the rate.
+    - With django-redis the check-and-increment is one Lua script call,
+      atomic across all workers; other cache backends use get_many/incr.
+    """
+
+    def allow_request(self, request, view):
+        started = time.perf_counter()
+        allowed = self._allow_request(request, view)
+        metrics.observe("shorturl_throttle_duration_seconds", time.perf_counter() - started, scope=self.scope)
+        if not allowed:
+            metrics.inc("shorturl_throttled_total", scope=self.scope)
+        return allowed
+
+    def _allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        window = int(window)
+        weight = 1 - offset / self.duration
+        self.remaining = self.duration - offset
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        if type(self.backend).__module__.startswith("django_redis"):
+            return self._allow_redis(current_key, previous_key, weight)
+        return self._allow_cache(current_key, previous_key, weight)
 
-class IPRateThrottle(SimpleRateThrottle):
+    @property
+    def backend(self):
+        # DRF's default is the django.core.cache.cache proxy, whose type
+        # would never be django-redis's.
+        if self.cache is default_cache:
+            return caches[DEFAULT_CACHE_ALIAS]
+        return self.cache
+
+    def _allow_redis(self, current_key, previous_key, weight):
+        redis_client = self.backend.client
+        client = redis_client.get_client(write=True)
+        script = _scripts.get(id(client))
+        if script is None:
+            script = _scripts[id(client)] = client.register_script(SLIDING_WINDOW_SCRIPT)
+        keys = [str(redis_client.make_key(current_key)), str(redis_client.make_key(previous_key))]
+        return bool(script(keys=keys, args=[self.num_requests, weight, self.duration * 2]))
+
+    def _allow_cache(self, current_key, previous_key, weight):
+        counts = self.cache.get_many([current_key, previous_key])
+        if counts.get(previous_key, 0) * weight + counts.get(current_key, 0) >= self.num_requests:
+            return False
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            self.cache.set(current_key, 1, self.duration * 2)
+        return True
+
+    def wait(self):
+        return self.remaining
+
+
+class AnonRateThrottle(SlidingWindowRateThrottle, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(SlidingWindowRateThrottle, throttling.UserRateThrottle):
+    pass
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
     scope = "ip"
 
     def get_cache_key(self, request, view):
@@ -9,3 +109,4 @@ class IPRateThrottle(SimpleRateThrottle):
         if not ip:
             return None
         return self.cache_format % {"scope": self.scope, "ident": ip}
+
@@ -1,11 +1,17 @@
 from .views import *
+from django.conf import settings
 from django.urls import path
 
+redirect_view = AsyncRedirectURLView if settings.ASYNC_REDIRECT else RedirectURLView
+
 urlpatterns = [
     path("auth/register/", RegisterView.as_view(), name="register"),
     path("auth/logout/", LogoutView.as_view(), name="logout"),
     path("shorten/", ShortenURLView.as_view(), name="shorten-url"),
+    path("shorten/bulk/", BulkShortenURLView.as_view(), name="bulk-shorten-url"),
+    path("links/", UserLinksView.as_view(), name="user-links"),
+    path("export/", ExportURLsView.as_view(), name="export-urls"),
     path("admin/list/", AdminURLListView.as_view(), name="admin-url-list"),
-    path("redirect/<str:short_code>/", RedirectURLView.as_view(), name="redirect"),
+    path("redirect/<str:short_code>/", redirect_view.as_view(), name="redirect"),
     path("analytics/<str:short_code>/", URLAnalyticsView.as_view(), name="analytics"),
 ]
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""
+Cached users for JWTAuthentication, kept free of DRF/simplejwt imports so
+the signal handlers that invalidate them load in redirect-only workers too.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .local_cache import LocalCache
+
+# Short-lived per-worker copy of cached users. User changes delete the
+# Redis entry at once; workers catch up within the local TTL.
+local_user_cache = LocalCache(
+    max_entries=getattr(settings, "AUTH_USER_LOCAL_CACHE_MAX_ENTRIES", 10_000),
+    ttl=getattr(settings, "AUTH_USER_LOCAL_CACHE_SECONDS", 5),
+)
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def forget_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+    local_user_cache.delete(user_id)
@@ -1,19 +1,28 @@
-from django.shortcuts import get_object_or_404, redirect
-from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from .models import ShortURL
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.permissions import IsAuthenticated,IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .serializers import ShortURLSerializer, RegisterSerializer
+from rest_framework.parsers import JSONParser
+from django.conf import settings
+from .serializers import LINK_FIELDS, LinkSerializer, ShortURLSerializer, RegisterSerializer, link_data, short_url_data
+from .parsers import NDJSONParser
+from .analytics import click_breakdowns, click_timeseries, parse_bound, parse_range
+from .pagination import KeysetPagination
+from .export import EXPORT_FORMATS, export_lines, export_queryset
+from .authentication import revoke_token
+from .sharding import lookup_aliases
 from .services import *
-from drf_spectacular.utils import extend_schema, OpenApiExample
+from .redirect_views import AsyncRedirectURLView, MetricsView, RedirectURLView
+from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParameter
 
 
 class RegisterView(APIView):
@@ -38,6 +47,8 @@ class LogoutView(APIView):
             refresh_token = request.data.get("refresh")
             token = RefreshToken(refresh_token)
             token.blacklist()
+            # The access token used for this call stops working right away too.
+            revoke_token(request.auth)
             return Response({"message": "Logout successful"})
         except Exception:
             return Response({"error": "Invalid refresh token"}, status=400)
@@ -63,77 +74,195 @@ class ShortenURLView(APIView):
                     "custom_alias": "mybrand",
                 },
             ),
+            OpenApiExample(
+                "Shorten with expiry",
+                summary="Expiring link",
+                value={
+                    "original_url": "https://example.com/sale",
+                    "expires_at": "2025-12-31T23:59:59Z",
+                    "max_clicks": 1000,
+                },
+            ),
         ],
     )
     def post(self, request):
-        serializer = ShortURLSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        original_url = serializer.validated_data["original_url"]
-        custom_alias = serializer.validated_data.get("custom_alias")
+        # ShortURLSerializer documents the payload; validation uses the lean path.
+        try:
+            original_url, custom_alias, limits = clean_shorten_item(request.data)
+        except InvalidShortenInput as e:
+            return Response({e.field: [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             short_obj, created = get_or_create_short_url(
                 original_url=original_url,
                 user=request.user,
                 custom_alias=custom_alias,
+                **limits,
             )
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         status_code = status.HTTP_201_CREATED if created else status.HTTP_200_OK
-        return Response(ShortURLSerializer(short_obj).data, status=status_code)
+        return Response(short_url_data(short_obj), status=status_code)
 
 
-class RedirectURLView(APIView):
-    permission_classes = []
+class BulkShortenURLView(APIView):
+    """
+    Shorten many URLs in one request (JSON array or NDJSON stream).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
 
     @extend_schema(
-        responses={302: None, 404: {"example": {"error": "Short URL not found"}}},
+        request=ShortURLSerializer(many=True),
+        responses={200: {"example": {"results": [{"original_url": "https://google.com", "short_code": "abc123", "created": True}]}}},
     )
-    def get(self, request, short_code):
-        original_url = get_cached_url(short_code)
-        if original_url:
-            try:
-                short_obj = ShortURL.objects.get(short_code=short_code)
-                record_click(short_obj)
-            except ShortURL.DoesNotExist:
-                return Response({"error": "Short URL not found"}, status=status.HTTP_404_NOT_FOUND)
-            return redirect(original_url)
+    def post(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            return Response({"error": "Expected a list of items"}, status=status.HTTP_400_BAD_REQUEST)
+        max_items = settings.BULK_SHORTEN_MAX_ITEMS
+        if len(items) > max_items:
+            return Response({"error": f"Too many items (max {max_items})"}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = bulk_get_or_create_short_urls(items, request.user)
+        return Response({"results": results})
+
 
+class AdminURLListView(ListAPIView):
+    """
+    Admin listing of all URLs with cursor pagination.
+    Filters: user (id), code_prefix, created_after, created_before.
+    """
+    permission_classes = [IsAdminUser]
+    serializer_class = ShortURLSerializer
+    pagination_class = KeysetPagination
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("cursor", str, description="Opaque cursor from the previous page's 'next' link"),
+            OpenApiParameter("page_size", int, description="Rows per page (max 100)"),
+            OpenApiParameter("count", str, enum=["approx"], description="Include an approximate total count"),
+            OpenApiParameter("user", int, description="Only links owned by this user id"),
+            OpenApiParameter("code_prefix", str, description="Only short codes starting with this prefix"),
+            OpenApiParameter("created_after", str, description="ISO date/datetime, inclusive"),
+            OpenApiParameter("created_before", str, description="ISO date/datetime, exclusive; a bare date includes that day"),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Plain .values() rows instead of model instances + ModelSerializer;
+        # id/created_at are only fetched for the pagination cursor.
+        queryset = self.get_queryset().values("id", "created_at", "short_code", "original_url")
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response([short_url_data(row) for row in page])
+
+    def get_queryset(self):
+        params = self.request.query_params
+        qs = ShortURL.objects.order_by("-created_at", "-id")
         try:
-            short_obj = ShortURL.objects.get(short_code=short_code)
-        except ShortURL.DoesNotExist:
-            return Response({"error": "Short URL not found"}, status=status.HTTP_404_NOT_FOUND)
+            if params.get("user"):
+                qs = qs.filter(user_id=int(params["user"]))
+            if params.get("code_prefix"):
+                qs = qs.filter(short_code__startswith=params["code_prefix"])
+            if params.get("created_after"):
+                qs = qs.filter(created_at__gte=parse_bound(params["created_after"]))
+            if params.get("created_before"):
+                qs = qs.filter(created_at__lt=parse_bound(params["created_before"], end=True))
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
+        return qs
 
-        cache_short_url(short_code, short_obj.original_url)
 
-        record_click(short_obj)
-        return redirect(short_obj.original_url)
+class UserLinksView(ListAPIView):
+    """
+    The current user's links, newest first, with cursor pagination.
+    - Pages are range scans on the (user, created_at DESC, id DESC) index.
+    - ?q= matches a substring of the URL or short code (trigram indexed on PostgreSQL).
+    - "count" is the user's cached link count, kept current by create/delete.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = LinkSerializer
+    pagination_class = KeysetPagination
+    max_query_length = 200
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("cursor", str, description="Opaque cursor from the previous page's 'next' link"),
+            OpenApiParameter("page_size", int, description="Rows per page (max 100)"),
+            OpenApiParameter("q", str, description="Only links whose URL or short code contains this text"),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset().values(*LINK_FIELDS))
+        if not request.query_params.get("q") and self.paginator.page_number_pagination is None:
+            self.paginator.count = user_link_count(request.user.pk)
+        return self.get_paginated_response([link_data(row) for row in page])
 
-class AdminShortURLPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+    def get_queryset(self):
+        qs = ShortURL.objects.filter(user=self.request.user).order_by("-created_at", "-id")
+        query = self.request.query_params.get("q", "").strip()
+        if len(query) > self.max_query_length:
+            raise ValidationError({"error": f"q is limited to {self.max_query_length} characters"})
+        if query:
+            qs = qs.filter(Q(original_url__icontains=query) | Q(short_code__icontains=query))
+        return qs
 
 
-class AdminURLListView(ListAPIView):
+class ExportURLsView(APIView):
     """
-    Admin listing of all URLs with pagination.
+    Stream every link as CSV or NDJSON in constant memory.
+    Users get their own links; admins get all links, or ?user=<id>.
     """
-    permission_classes = [IsAdminUser]
-    serializer_class = ShortURLSerializer
-    queryset = ShortURL.objects.select_related("user").order_by("-created_at")
-    pagination_class = AdminShortURLPagination
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("output", str, enum=list(EXPORT_FORMATS), description="csv (default) or ndjson"),
+            OpenApiParameter("user", int, description="Admins only: export a single user's links"),
+        ],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+    )
+    def get(self, request):
+        output = request.query_params.get("output", "csv")
+        if output not in EXPORT_FORMATS:
+            return Response({"error": f"output must be one of {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        owner = request.user
+        if request.user.is_staff:
+            owner = None
+            if request.query_params.get("user"):
+                try:
+                    owner = int(request.query_params["user"])
+                except ValueError:
+                    return Response({"error": "user must be an id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            export_lines(output, export_queryset(owner)),
+            content_type=EXPORT_FORMATS[output],
+        )
+        response["Content-Disposition"] = f'attachment; filename="links-{timezone.now():%Y%m%d}.{output}"'
+        return response
 
 
 class URLAnalyticsView(APIView):
     """
-    Simple analytics per short code.
+    Analytics per short code: lifetime counters plus clicks over time,
+    answered from the pre-aggregated rollups.
     """
     permission_classes = [IsAuthenticated]
 
     @extend_schema(
+        parameters=[
+            OpenApiParameter("start", str, description="ISO date/datetime, default 7 days before end"),
+            OpenApiParameter("end", str, description="ISO date/datetime, default now"),
+            OpenApiParameter("granularity", str, enum=["hour", "day"], description="Timeseries bucket size"),
+        ],
         responses={
             200: OpenApiExample(
                 "Analytics example",
@@ -143,25 +272,46 @@ class URLAnalyticsView(APIView):
                     "click_count": 42,
                     "created_at": "2025-11-29T18:13:56Z",
                     "last_accessed_at": "2025-11-29T19:00:00Z",
+                    "range": {"start": "2025-11-22T19:00:00Z", "end": "2025-11-29T19:00:00Z", "granularity": "day"},
+                    "clicks": 42,
+                    "timeseries": [{"bucket": "2025-11-29T00:00:00Z", "count": 42}],
+                    "breakdowns": {
+                        "referrer": [{"value": "t.co", "count": 30}],
+                        "country": [{"value": "IN", "count": 25}],
+                        "user_agent": [{"value": "chrome", "count": 40}],
+                    },
                 },
             )
         }
     )
     def get(self, request, short_code):
-        qs = ShortURL.objects
+        try:
+            start, end, granularity = parse_range(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = ShortURL.objects.filter(short_code=short_code)
         if not request.user.is_staff:
             qs = qs.filter(user=request.user)
 
-        try:
-            obj = qs.get(short_code=short_code)
-        except ShortURL.DoesNotExist:
+        obj = None
+        for alias in lookup_aliases(short_code):
+            obj = qs.using(alias).first()
+            if obj is not None:
+                break
+        if obj is None:
             return Response({"error": "Short URL not found"}, status=404)
 
+        timeseries = click_timeseries(obj, start, end, granularity)
         data = {
             "short_code": obj.short_code,
             "original_url": obj.original_url,
             "click_count": obj.click_count,
             "created_at": obj.created_at,
             "last_accessed_at": obj.last_accessed_at,
+            "range": {"start": start, "end": end, "granularity": granularity},
+            "clicks": sum(point["count"] for point in timeseries),
+            "timeseries": timeseries,
+            "breakdowns": click_breakdowns(obj, start, end),
         }
-        return Response(data)
\ No newline at end of file
+        return Response(data)
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urlshortener.settings')
+# Persistent connections are per thread, and async views run ORM calls in
+# threads that come and go, so connections would pile up instead of being
+# reused (Django's docs say to disable them under ASGI).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
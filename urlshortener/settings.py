@@ -42,15 +42,17 @@ INSTALLED_APPS = [
 
 SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
+    # Imported on schema generation only; registers shorturl's OpenAPI extensions.
+    "PREPROCESSING_HOOKS": ["shorturl.schema.register_extensions"],
 }
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'shorturl.authentication.JWTAuthentication',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'shorturl.throttling.AnonRateThrottle',
+        'shorturl.throttling.UserRateThrottle',
         'shorturl.throttling.IPRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
@@ -81,7 +83,61 @@ CACHES = {
     }
 }
 
+# Generated short codes: dotted path to a class with next_code(original_url).
+SHORT_CODE_GENERATOR = env("SHORT_CODE_GENERATOR", default="shorturl.codegen.SequenceCodeGenerator")
+SHORT_CODE_BLOCK_SIZE = env.int("SHORT_CODE_BLOCK_SIZE", default=100)
+
+# Serve /api/redirect/ from the async view (use with the ASGI deployment profile).
+ASYNC_REDIRECT = env.bool("ASYNC_REDIRECT", default=False)
+
+# Redirects skip the DRF throttles and use an in-process per-IP token bucket
+# (per worker). A rate of 0 disables it.
+REDIRECT_RATE_PER_SECOND = env.float("REDIRECT_RATE_PER_SECOND", default=20)
+REDIRECT_RATE_BURST = env.int("REDIRECT_RATE_BURST", default=100)
+REDIRECT_RATE_MAX_CLIENTS = env.int("REDIRECT_RATE_MAX_CLIENTS", default=100000)
+
+# Upper bound on items accepted by POST /api/shorten/bulk/.
+BULK_SHORTEN_MAX_ITEMS = env.int("BULK_SHORTEN_MAX_ITEMS", default=10000)
+
+# In-process LRU tier in front of Redis for hot short codes (0 disables it).
+LOCAL_URL_CACHE_MAX_ENTRIES = env.int("LOCAL_URL_CACHE_MAX_ENTRIES", default=10000)
+LOCAL_URL_CACHE_TTL_SECONDS = env.int("LOCAL_URL_CACHE_TTL_SECONDS", default=60)
+LOCAL_URL_CACHE_VERSION_CHECK_SECONDS = env.float("LOCAL_URL_CACHE_VERSION_CHECK_SECONDS", default=1)
+
+# Redirect clicks are buffered per worker and written to the DB in bulk.
+CLICK_FLUSH_INTERVAL_SECONDS = env.int("CLICK_FLUSH_INTERVAL_SECONDS", default=5)
+CLICK_BUFFER_MAX_CODES = env.int("CLICK_BUFFER_MAX_CODES", default=10000)
+CLICK_BUFFER_MAX_EVENTS = env.int("CLICK_BUFFER_MAX_EVENTS", default=50000)
+# request.META key holding the visitor's ISO country code (set by the CDN/proxy).
+CLICK_COUNTRY_HEADER = env("CLICK_COUNTRY_HEADER", default="HTTP_CF_IPCOUNTRY")
+# Raw click events older than this are deleted by purge_expired; the rollups
+# already hold their counts (0 keeps them forever).
+CLICK_EVENT_RETENTION_DAYS = env.int("CLICK_EVENT_RETENTION_DAYS", default=90)
+
+# Per-worker Bloom filter of every short code: unknown codes get a 404 with
+# no Redis or DB lookup. Workers map CODE_FILTER_SNAPSHOT if it exists
+# (see snapshot_code_filter), else stream the table at startup.
+CODE_FILTER_ENABLED = env.bool("CODE_FILTER_ENABLED", default=True)
+CODE_FILTER_SNAPSHOT = env("CODE_FILTER_SNAPSHOT", default="")
+CODE_FILTER_ERROR_RATE = env.float("CODE_FILTER_ERROR_RATE", default=0.001)
+CODE_FILTER_MIN_CAPACITY = env.int("CODE_FILTER_MIN_CAPACITY", default=1000000)
+# How often workers replay new codes from the delta log, and how long the
+# log is kept (snapshots must be refreshed more often than that).
+CODE_FILTER_SYNC_SECONDS = env.float("CODE_FILTER_SYNC_SECONDS", default=1)
+CODE_FILTER_DELTA_TTL_SECONDS = env.int("CODE_FILTER_DELTA_TTL_SECONDS", default=86400)
+
+# Prometheus metrics on /metrics. Workers write their totals to METRICS_DIR
+# (shared by all gunicorn workers, e.g. a tmpfs) so a scrape sees them all;
+# leave it empty to report only the worker that answers the scrape.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_DIR = env("METRICS_DIR", default="")
+METRICS_FLUSH_INTERVAL_SECONDS = env.float("METRICS_FLUSH_INTERVAL_SECONDS", default=5)
+# Bearer token for scrapes; without one /metrics answers 404 unless DEBUG is on.
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
 MIDDLEWARE = [
+    'shorturl.middleware.MetricsMiddleware',
+    'shorturl.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -125,9 +181,54 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD", default="123"),
         "HOST": env("POSTGRES_HOST", default="db"),
         "PORT": env("POSTGRES_PORT", default="5432"),
+        # Keep connections open between requests instead of reconnecting
+        # every time; health checks drop ones the server closed.
+        "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=60),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Streaming read replicas ("host" or "host:port", comma separated). Redirect,
+# analytics and listing reads go to them; see shorturl.routers.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(env.list("POSTGRES_REPLICA_HOSTS", default=[])):
+    host, _, port = replica.partition(":")
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Extra PostgreSQL databases ("host" or "host:port", comma separated) that
+# ShortURL rows and their clicks are spread over by short code, together
+# with the default database; see shorturl.sharding. Each one needs
+# "manage.py migrate --database shard_N".
+SHORTURL_SHARDS = ["default"]
+for index, shard in enumerate(env.list("POSTGRES_SHARD_HOSTS", default=[])):
+    host, _, port = shard.partition(":")
+    alias = f"shard_{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+    }
+    SHORTURL_SHARDS.append(alias)
+# While rebalance_shards runs after a shard was added, the previous shard
+# aliases (e.g. "default,shard_1"); lookups fall back to the old owner.
+SHORTURL_PREVIOUS_SHARDS = env.list("SHORTURL_PREVIOUS_SHARDS", default=[])
+
+DATABASE_ROUTERS = ["shorturl.sharding.ShardRouter", "shorturl.routers.ReplicaRouter"]
+# After a write, the user's reads stay on the primary this long (replication lag).
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=5)
+
+# JWT authentication caches the user row: in Redis (dropped on every User
+# save/delete) and per worker for a few seconds on top.
+AUTH_USER_CACHE_SECONDS = env.int("AUTH_USER_CACHE_SECONDS", default=300)
+AUTH_USER_LOCAL_CACHE_SECONDS = env.int("AUTH_USER_LOCAL_CACHE_SECONDS", default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
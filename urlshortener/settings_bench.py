@@ -0,0 +1,34 @@
+"""
+Benchmark profile: SQLite and an in-process cache as local stand-ins for
+PostgreSQL and Redis, with rate limits off.
+
+    DJANGO_SETTINGS_MODULE=urlshortener.settings_bench python manage.py migrate
+    DJANGO_SETTINGS_MODULE=urlshortener.settings_bench python manage.py benchmark
+
+To benchmark against a local Postgres/Redis, run the benchmark command with
+the regular settings instead.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark-only-not-a-real-secret-key-0000")
+
+from .settings import *  # noqa: E402,F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": env("BENCH_SQLITE_PATH", default=str(BASE_DIR / "bench.sqlite3")),
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 1_000_000},
+    }
+}
+
+REST_FRAMEWORK = {**REST_FRAMEWORK, "DEFAULT_THROTTLE_CLASSES": []}
+REDIRECT_RATE_PER_SECOND = 0
@@ -0,0 +1,27 @@
+"""
+Redirect-only profile for workers that serve nothing but
+/api/redirect/<code>/ and /metrics (e.g. behind a path-based load balancer
+rule). Leaves out the admin, DRF, simplejwt and drf-spectacular, so a worker
+starts faster and uses less memory.
+
+    DJANGO_SETTINGS_MODULE=urlshortener.settings_redirect gunicorn -c gunicorn.conf.py urlshortener.wsgi
+
+Migrations, collectstatic and every other endpoint still need the regular
+settings.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'shorturl',
+]
+
+# Redirects are anonymous GETs: no sessions, CSRF, auth or messages.
+MIDDLEWARE = [
+    'shorturl.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'urlshortener.urls_redirect'
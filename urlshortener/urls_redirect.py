@@ -0,0 +1,14 @@
+"""
+URLconf of the redirect-only profile (settings_redirect).
+"""
+from django.conf import settings
+from django.urls import path
+
+from shorturl.redirect_views import AsyncRedirectURLView, MetricsView, RedirectURLView
+
+redirect_view = AsyncRedirectURLView if settings.ASYNC_REDIRECT else RedirectURLView
+
+urlpatterns = [
+    path('api/redirect/<str:short_code>/', redirect_view.as_view(), name='redirect'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+]